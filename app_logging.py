@@ -1,19 +1,131 @@
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from pathlib import Path
-from constants import ASSETS_DIR
+from constants import ASSETS_DIR, LOG_ASYNC, LOG_QUEUE_SIZE, LOG_QUEUE_FULL_POLICY
 
 
-def handle_logging():
+# The listener writing the queued log records in asynchronous mode, once logging is set up
+log_listener = None
+
+
+class BoundedQueueHandler(QueueHandler):
     """
-    Set up logging configuration with RotatingFileHandler.
+    A QueueHandler for a bounded queue, which drops or waits when the queue is full.
+
+    Attributes:
+    - block (bool): Whether to wait for room in the queue instead of dropping the record.
+    - dropped (int): The number of records dropped because the queue was full.
+    """
+
+    def __init__(self, log_queue, block=False):
+        """
+        Initialize the BoundedQueueHandler object.
+
+        Args:
+            log_queue (queue.Queue): The bounded queue read by the QueueListener.
+            block (bool): Whether to wait for room in the queue instead of dropping the record.
+                Defaults to False.
+        """
+        super().__init__(log_queue)
+        self.block = block
+        self.dropped = 0
+
+    def prepare(self, record):
+        """
+        Prepare a record for the queue, leaving the formatting to the listener thread.
+
+        The default QueueHandler formats the whole record on the calling thread. Only the
+        message arguments are merged here (they may change after the call), the timestamp and
+        traceback are formatted by the file handler on the listener thread.
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        """
+        Put a record in the queue, dropping it (or waiting) if the queue is full.
+        """
+        if self.block:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class DrainingQueueListener(QueueListener):
+    """
+    A QueueListener which can be stopped while its bounded queue is full.
+    """
+
+    def enqueue_sentinel(self):
+        # The default put_nowait() raises queue.Full after a burst, wait for the listener to make room
+        self.queue.put(self._sentinel)
+
+
+def stop_log_listener(handler):
+    """
+    Write the log records still queued and stop the listener thread, at exit.
+
+    The root logger then writes to the file handlers directly, so the records logged after
+    the stop (e.g. by the exit handlers that run later) are still written, and a full queue
+    can no longer drop them or block the "block" policy's callers.
 
     Args:
+        handler (BoundedQueueHandler): The handler feeding the listener's queue.
+
+    Returns:
         None
+    """
+    global log_listener
+
+    if log_listener is None:
+        return
+    # Stopping the listener writes every record queued before the stop
+    log_listener.stop()
+    if handler.dropped:
+        # Reported directly to the file handlers, the queue is no longer read
+        record = logging.LogRecord("app_logging", logging.WARNING, __file__, 0,
+                                   f"{handler.dropped} log records dropped, the log queue was full",
+                                   None, None)
+        for file_handler in log_listener.handlers:
+            file_handler.handle(record)
+    # Nothing reads the queue any more, log synchronously (logging.shutdown closes the file handlers at exit)
+    root = logging.getLogger()
+    root.removeHandler(handler)
+    for file_handler in log_listener.handlers:
+        root.addHandler(file_handler)
+    log_listener = None
+
+
+def handle_logging(asynchronous=LOG_ASYNC, queue_size=LOG_QUEUE_SIZE, full_policy=LOG_QUEUE_FULL_POLICY):
+    """
+    Set up logging configuration with RotatingFileHandler.
+
+    In asynchronous mode the root logger only puts the records in a bounded queue, and a
+    QueueListener thread formats them and does the file I/O and rotation, so logging adds
+    no disk latency to the UI actions. The queued records are written when the application exits.
+
+    Args:
+        asynchronous (bool): Whether to write the log records from a background thread.
+            Defaults to LOG_ASYNC.
+        queue_size (int): The maximum number of records waiting to be written. Defaults to LOG_QUEUE_SIZE.
+        full_policy (str): "drop" the records when the queue is full, or "block" until there is room.
+            Defaults to LOG_QUEUE_FULL_POLICY.
 
     Returns:
         None
     """
+    global log_listener
+
+    if log_listener is not None:
+        # Already set up, the queue handler is on the root logger
+        return
+
     # Define the logging format
     log_format = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
 
@@ -41,6 +153,20 @@ def handle_logging():
     handler = RotatingFileHandler(
         log_file, maxBytes=max_bytes, backupCount=backup_count)
 
-    # Configure the root logger with the specified handler
-    logging.basicConfig(level=logging.INFO,
-                        format=log_format, handlers=[handler])
+    if not asynchronous:
+        # Configure the root logger with the specified handler
+        logging.basicConfig(level=logging.INFO,
+                            format=log_format, handlers=[handler])
+        return
+
+    # The file handler runs on the listener thread, the root logger only enqueues records
+    handler.setFormatter(logging.Formatter(log_format))
+    queue_handler = BoundedQueueHandler(queue.Queue(maxsize=queue_size),
+                                        block=full_policy == "block")
+    log_listener = DrainingQueueListener(queue_handler.queue, handler, respect_handler_level=True)
+    log_listener.start()
+    # Flush the queued records on exit (exit handlers run in reverse order, so after the ones registered later, which may still log)
+    atexit.register(stop_log_listener, queue_handler)
+
+    # Configure the root logger with the queue handler
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
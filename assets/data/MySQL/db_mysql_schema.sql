@@ -7,6 +7,7 @@ USE school;
 
 
 -- Create `students` Table
+-- (indexes and later schema changes are applied by the versioned migrations in migrations.py)
 CREATE TABLE students(
     id INT AUTO_INCREMENT PRIMARY KEY, 
     name VARCHAR(255), 
@@ -1,4 +1,5 @@
 -- Create `students` Table in the dbDB Browser (SQLite) software
+-- Indexes and later schema changes are applied by the versioned migrations in migrations.py
 CREATE TABLE students(
     id INTEGER PRIMARY KEY AUTOINCREMENT, 
     name TEXT, 
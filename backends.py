@@ -0,0 +1,65 @@
+"""
+Registry of the database backends the application can run on.
+
+The backend is picked by name, with the --backend option of main.py or the DB_BACKEND
+environment variable (MySQL by default):
+
+- sqlite: the local SQLite database (DB_FILE)
+- mysql: the MySQL database configured in the .env file
+- sqlite-snapshot: a read-only SQLite snapshot of the database (SQLITE_SNAPSHOT_FILE), for
+  fast local reporting next to a MySQL instance of the application:
+
+    python exporter.py assets/data/SQLite/snapshot.db --backend mysql
+    python main.py --backend sqlite-snapshot
+
+Only the driver of the selected backend is created, and drivers load their database
+library on first connection, so running on SQLite never imports mysql.connector.
+Other backends can be added with register_backend().
+"""
+from constants import SQLITE_BACKEND, MYSQL_BACKEND, SQLITE_SNAPSHOT_BACKEND, DB_BACKEND
+from repository import StudentRepository, SQLiteDriver, SQLiteSnapshotDriver, MySQLDriver
+
+
+# Registered backends: name -> (driver class or factory, description)
+BACKENDS = {}
+
+
+def register_backend(name, create_driver, description):
+    """
+    Register a backend.
+
+    Args:
+        name (str): The name of the backend, used by --backend and DB_BACKEND.
+        create_driver (callable): The driver class, or a function returning a driver. It is called
+            with the keyword options given to create_repository().
+        description (str): A short description, shown in the help of main.py.
+    """
+    BACKENDS[name] = (create_driver, description)
+
+
+def create_repository(backend=None, **options):
+    """
+    Return a StudentRepository on the driver of a backend.
+
+    Args:
+        backend (str): The name of the backend. Defaults to None (the DB_BACKEND setting).
+        **options: Keyword arguments passed to the driver, e.g. database_file for the SQLite backends.
+
+    Returns:
+        StudentRepository: The repository.
+
+    Raises:
+        ValueError: If the backend is not registered.
+    """
+    backend = backend or DB_BACKEND
+    try:
+        create_driver, _ = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown backend: {backend} (expected {', '.join(BACKENDS)})") from None
+    return StudentRepository(create_driver(**options))
+
+
+register_backend(SQLITE_BACKEND, SQLiteDriver, "the local SQLite database")
+register_backend(MYSQL_BACKEND, MySQLDriver, "the MySQL database configured in the .env file")
+register_backend(SQLITE_SNAPSHOT_BACKEND, SQLiteSnapshotDriver,
+                 "a read-only SQLite snapshot written by the exporter, for local reporting")
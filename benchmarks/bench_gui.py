@@ -0,0 +1,316 @@
+"""
+Headless benchmark of the user interface, under the offscreen Qt platform.
+
+For each data size, a fresh database is filled with synthetic students and the main
+window is created on it (no display needed: QT_QPA_PLATFORM=offscreen). The
+dialogs are then driven in code, message boxes answered automatically, and for each
+scenario the wall time, the peak RSS of the process and the event loop stalls (how
+late a 5 ms timer on the GUI thread fired) are recorded:
+
+- startup: creating the main window until the first page of the table is shown
+- table_population: scrolling the table to the end until every row is loaded
+- search_highlight: exact name searches through the search dialog, from a freshly
+  reloaded table (cold, rows fetched up to the last match) and on the loaded table (warm)
+- ranked_search: fuzzy searches through the search dialog, then highlighting a result
+- cell_click: selecting a cell (Edit/Delete buttons) then clearing the selection
+- edit_round_trip, delete_round_trip: saving an edit and deleting a record through
+  their dialogs, until the table shows the change
+
+The results are printed and saved as JSON in benchmarks/results/.
+
+Run from the repository root:
+    python -m benchmarks.bench_gui --sizes 10k 100k
+    python -m benchmarks.bench_gui --backend mysql --sizes 10k
+"""
+import os
+
+# Must be set before Qt is imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import random
+import resource
+import tempfile
+import time
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtWidgets import QApplication, QMessageBox
+from constants import SQLITE_BACKEND, MYSQL_BACKEND
+from search_engine import FUZZY_SEARCH
+from benchmarks.data_generator import random_name, parse_size, size_label
+from benchmarks.bench_repository import sqlite_repository, mysql_repository, fill_database, with_typo
+from benchmarks.common import summarize, save_results
+
+
+# Interval of the timer used to detect event loop stalls, in milliseconds
+STALL_TIMER_INTERVAL = 5
+# Stalls longer than this are counted as visible freezes, in milliseconds
+VISIBLE_STALL = 50
+# Longest wait for a scenario step, in seconds
+STEP_TIMEOUT = 600
+
+
+class StallMonitor:
+    """
+    Measures how long the GUI event loop is blocked, with a timer firing every few milliseconds.
+
+    The delay between two timer events beyond the interval is time during which the event
+    loop could not process events, i.e. the window was frozen.
+    """
+
+    def __init__(self):
+        self.timer = QTimer()
+        self.timer.setInterval(STALL_TIMER_INTERVAL)
+        self.timer.timeout.connect(self.tick)
+        self.last_tick = None
+        self.stalls = []
+
+    def start(self):
+        self.stalls = []
+        self.last_tick = time.perf_counter()
+        self.timer.start()
+
+    def tick(self):
+        now = time.perf_counter()
+        self.stalls.append(max(0.0, now - self.last_tick - STALL_TIMER_INTERVAL / 1000))
+        self.last_tick = now
+
+    def stop(self):
+        """
+        Stop monitoring and return the stall measures.
+        """
+        # Account for a stall still running at the end of the scenario
+        self.tick()
+        self.timer.stop()
+        return {
+            "max_stall_ms": round(max(self.stalls) * 1000, 3),
+            "total_stall_ms": round(sum(self.stalls) * 1000, 3),
+            "visible_stalls": sum(stall * 1000 > VISIBLE_STALL for stall in self.stalls),
+        }
+
+
+def peak_rss_mb():
+    """
+    Return the peak resident set size of the process so far, in megabytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if os.uname().sysname == "Darwin" else 1024), 1)
+
+
+def wait_until(condition, timeout=STEP_TIMEOUT):
+    """
+    Run the event loop until condition() is true (checked every millisecond).
+    """
+    deadline = time.perf_counter() + timeout
+    loop = QEventLoop()
+    checker = QTimer()
+    checker.setInterval(1)
+    checker.timeout.connect(lambda: (condition() or time.perf_counter() > deadline) and loop.quit())
+    checker.start()
+    if not condition():
+        loop.exec()
+    checker.stop()
+    if not condition():
+        raise TimeoutError("Benchmark step did not complete in time")
+
+
+def idle(window):
+    """
+    Return whether the window has no database call running and no page being fetched.
+    """
+    return not window.worker.running and not window.model.fetching
+
+
+def answer_message_boxes():
+    """
+    Make the message boxes return immediately, as if the user dismissed them.
+    """
+    for name in ("information", "warning", "critical"):
+        setattr(QMessageBox, name, staticmethod(lambda *args, **kwargs: QMessageBox.StandardButton.Ok))
+
+
+def scenario(monitor, steps):
+    """
+    Run the steps of a scenario while monitoring the event loop.
+
+    Args:
+        monitor (StallMonitor): The event loop monitor.
+        steps (list): The callables to time, each one running until its step is complete.
+
+    Returns:
+        dict: The wall time of the steps (a latency summary if there are several), the
+              event loop stalls and the peak RSS.
+    """
+    latencies = []
+    monitor.start()
+    for step in steps:
+        start = time.perf_counter()
+        step()
+        latencies.append(time.perf_counter() - start)
+    stalls = monitor.stop()
+
+    if len(latencies) == 1:
+        result = {"wall_ms": round(latencies[0] * 1000, 3)}
+    else:
+        result = summarize(latencies)
+    return {**result, **stalls, "peak_rss_mb": peak_rss_mb()}
+
+
+def run_size(ui, repository, ops, seed):
+    """
+    Create the main window on the repository's database and measure every scenario.
+
+    Returns:
+        dict: The measures, by scenario.
+    """
+    rng = random.Random(seed)
+    monitor = StallMonitor()
+    results = {}
+    window = None
+
+    def startup():
+        nonlocal window
+        window = ui.MainWindow(repository)
+        window.show()
+        wait_until(lambda: window.model.rowCount() > 0 and idle(window))
+
+    results["startup"] = scenario(monitor, [startup])
+    model = window.model
+    table = window.table
+
+    def scroll_to_end():
+        while not model.exhausted:
+            table.scrollToBottom()
+            # The view asks the model for the next page when it reaches the end of the loaded rows
+            wait_until(lambda: idle(window))
+            if not model.canFetchMore():
+                break
+
+    results["table_population"] = scenario(monitor, [scroll_to_end])
+    results["table_population"]["rows"] = model.rowCount()
+
+    def search(name, mode=None):
+        def step():
+            dialog = ui.SearchDialog(window)
+            dialog.student_name.setText(name)
+            if mode is not None:
+                dialog.search_mode.setCurrentText(mode)
+            dialog.search_student()
+            wait_until(lambda: idle(window))
+            if mode is not None and dialog.results_list.count():
+                # Highlight the best result
+                dialog.result_chosen(dialog.results_list.item(0))
+                wait_until(lambda: idle(window))
+            window.clear_selection()
+        return step
+
+    def reload():
+        window.load_table_data()
+        wait_until(lambda: idle(window))
+
+    # A cold search runs on a freshly reloaded table, it must fetch the rows up to the last match
+    cold_searches = []
+    for _ in range(max(1, ops // 10)):
+        reload()
+        cold_searches.append(scenario(monitor, [search(random_name(rng))]))
+    results["search_highlight_cold"] = {
+        key: max(result[key] for result in cold_searches) for key in cold_searches[0]}
+    results["search_highlight_warm"] = scenario(
+        monitor, [search(random_name(rng)) for _ in range(ops)])
+    results["ranked_search"] = scenario(
+        monitor, [search(with_typo(random_name(rng), rng), FUZZY_SEARCH) for _ in range(max(1, ops // 10))])
+
+    def click(row):
+        def step():
+            table.setCurrentIndex(model.index(row, 1))
+            window.cell_clicked()
+            window.clear_selection()
+            QApplication.processEvents()
+        return step
+
+    results["cell_click"] = scenario(
+        monitor, [click(rng.randrange(model.rowCount())) for _ in range(ops)])
+
+    def edit(row):
+        def step():
+            table.setCurrentIndex(model.index(row, 1))
+            dialog = ui.EditDialog(window)
+            dialog.confirm_update = lambda: True
+            dialog.student_name.setText(random_name(rng))
+            dialog.update_student()
+            wait_until(lambda: idle(window))
+        return step
+
+    results["edit_round_trip"] = scenario(
+        monitor, [edit(rng.randrange(model.rowCount())) for _ in range(ops)])
+
+    def delete():
+        table.setCurrentIndex(model.index(rng.randrange(model.rowCount()), 1))
+        dialog = ui.DeleteDialog(window)
+        dialog.delete_student()
+        wait_until(lambda: idle(window))
+
+    results["delete_round_trip"] = scenario(monitor, [delete for _ in range(ops)])
+
+    window.close()
+    window.deleteLater()
+    QApplication.processEvents()
+    return results
+
+
+def print_results(backend, label, results):
+    """
+    Print the measures of one backend and data size.
+    """
+    print(f"\n{backend}, {label} rows")
+    print(f"  {'scenario':<24}{'wall ms (p50)':>14}{'max stall ms':>14}{'stalls>50ms':>13}{'peak RSS MB':>13}")
+    for name, measure in results.items():
+        wall = measure.get("wall_ms", measure.get("p50_ms"))
+        print(f"  {name:<24}{wall:>14.1f}{measure['max_stall_ms']:>14.1f}"
+              f"{measure['visible_stalls']:>13}{measure['peak_rss_mb']:>13.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=(SQLITE_BACKEND, MYSQL_BACKEND), default=SQLITE_BACKEND,
+                        help="backend of the benchmarked user interface (default: sqlite)")
+    parser.add_argument("--sizes", type=parse_size, nargs="+", default=[10_000, 100_000],
+                        help="data sizes, numbers or 10k, 100k, 1M, 10M (default: 10k 100k)")
+    parser.add_argument("--ops", type=int, default=50,
+                        help="number of repetitions of the per-record scenarios (default: 50)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the data generator (default: 0)")
+    parser.add_argument("--mysql-database", default="school_bench",
+                        help="the MySQL database created and dropped by the benchmark (default: school_bench)")
+    parser.add_argument("--output", default=None,
+                        help="the JSON results file (default: benchmarks/results/bench_gui-<commit>-<time>.json)")
+    args = parser.parse_args()
+
+    app = QApplication([])
+    answer_message_boxes()
+    import ui
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in args.sizes:
+            if args.backend == SQLITE_BACKEND:
+                repository, cleanup = sqlite_repository(tmp_dir, rows)
+            else:
+                repository, cleanup = mysql_repository(args.mysql_database)
+            try:
+                fill_database(repository, rows, args.seed)
+                label = size_label(rows)
+                results[label] = run_size(ui, repository, args.ops, args.seed)
+            finally:
+                cleanup()
+            print_results(args.backend, label, results[label])
+
+    output = save_results("bench_gui",
+                          {"backend": args.backend, "sizes": args.sizes, "ops": args.ops, "seed": args.seed},
+                          {args.backend: results}, args.output)
+    print(f"\nResults saved to {output}")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
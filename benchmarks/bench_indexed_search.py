@@ -0,0 +1,71 @@
+"""
+Benchmark of student lookups by name with and without the indexes added by migration 2.
+
+For each table size, a SQLite database is created at schema version 1 (no indexes),
+lookups are timed, then the remaining migrations are applied and lookups are timed
+again. With the indexes the lookup time should stay flat as the row count grows.
+
+Run from the repository root:
+    python -m benchmarks.bench_indexed_search --sizes 10000 100000 1000000
+"""
+import argparse
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from constants import SQLITE_BACKEND, SEARCH_STUDENT_SQLITE_QUERY, INSERT_STUDENT_SQLITE_QUERY, COURSES
+from benchmarks.data_generator import FIRST_NAMES, LAST_NAMES
+import migrations
+
+
+def fill_database(connection, rows):
+    """
+    Insert `rows` random students, with unique names so lookups return a single row.
+    """
+    connection.executemany(INSERT_STUDENT_SQLITE_QUERY,
+                           ((f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}{i}",
+                             random.choice(COURSES[1:]),
+                             f"{random.randrange(10**8):08d}") for i in range(rows)))
+    connection.commit()
+
+
+def time_lookups(connection, rows, lookups):
+    """
+    Return the mean lookup time by name in milliseconds.
+    """
+    timings = []
+    for _ in range(lookups):
+        name = f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}{random.randrange(rows)}"
+        start = time.perf_counter()
+        connection.execute(SEARCH_STUDENT_SQLITE_QUERY, (name,)).fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.fmean(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000],
+                        help="table sizes to benchmark")
+    parser.add_argument("--lookups", type=int, default=200, help="number of lookups per measure")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}{'no index (ms)':>16}{'indexed (ms)':>16}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in args.sizes:
+            connection = sqlite3.connect(Path(tmp_dir) / f"students_{size}.db")
+            migrations.migrate(connection, SQLITE_BACKEND, target_version=1)
+            fill_database(connection, size)
+
+            unindexed = time_lookups(connection, size, args.lookups)
+            migrations.migrate(connection, SQLITE_BACKEND)
+            indexed = time_lookups(connection, size, args.lookups)
+            connection.close()
+
+            print(f"{size:>10}{unindexed:>16.3f}{indexed:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
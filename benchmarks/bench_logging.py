@@ -0,0 +1,84 @@
+"""
+Benchmark of the latency added by a logging call, with synchronous and asynchronous logging.
+
+In synchronous mode every logging.info() formats the record and writes it to the
+rotating log file on the calling thread (the GUI thread in the application). In
+asynchronous mode (app_logging.handle_logging with LOG_ASYNC) the call only puts
+the record in a queue. For each mode, bursts of records are logged to a temporary
+log directory and the latency of the calls is measured, as well as the time taken
+to flush everything to the file.
+
+Run from the repository root:
+    python -m benchmarks.bench_logging --records 100000
+"""
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+import app_logging
+from benchmarks.common import summarize, save_results
+
+
+def run_mode(asynchronous, records, full_policy, log_dir):
+    """
+    Set up logging in one mode, log `records` records and return the measures.
+    """
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+
+    # Log to the temporary directory instead of the application's log file
+    with mock.patch.object(app_logging, "ASSETS_DIR", Path(log_dir)):
+        app_logging.handle_logging(asynchronous=asynchronous, full_policy=full_policy)
+    queue_handler = root.handlers[0]
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(records):
+        call_start = time.perf_counter()
+        logging.info(f'Student record for "John Smith {i}" found and highlighted successfully.')
+        latencies.append(time.perf_counter() - call_start)
+    logged = time.perf_counter() - start
+
+    # Write everything still queued, like at exit
+    if asynchronous:
+        app_logging.stop_log_listener(queue_handler)
+    for handler in root.handlers[:]:
+        handler.close()
+        root.removeHandler(handler)
+    flushed = time.perf_counter() - start
+
+    result = summarize(latencies)
+    result["log_seconds"] = round(logged, 4)
+    result["flush_seconds"] = round(flushed, 4)
+    result["dropped"] = getattr(queue_handler, "dropped", 0)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100_000,
+                        help="number of records logged per mode (default: 100000)")
+    parser.add_argument("--output", default=None,
+                        help="the JSON results file (default: benchmarks/results/bench_logging-<commit>-<time>.json)")
+    args = parser.parse_args()
+
+    results = {}
+    modes = {"sync": (False, "drop"), "async_drop": (True, "drop"), "async_block": (True, "block")}
+    for name, (asynchronous, full_policy) in modes.items():
+        with tempfile.TemporaryDirectory() as log_dir:
+            results[name] = run_mode(asynchronous, args.records, full_policy, log_dir)
+        measure = results[name]
+        print(f"  {name:<12}{measure['p50_ms']:>10.4f} ms p50{measure['p95_ms']:>10.4f} ms p95"
+              f"{measure['log_seconds']:>9.3f} s logging{measure['flush_seconds']:>9.3f} s flushed"
+              f"{measure['dropped']:>9} dropped")
+
+    output = save_results("bench_logging", {"records": args.records}, results, args.output)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
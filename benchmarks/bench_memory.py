@@ -0,0 +1,108 @@
+"""
+Benchmark of the memory taken by the student records held by the table model.
+
+For each size, synthetic students are read back from a temporary SQLite database
+(so the records are made of the objects the database cursor creates) and kept in
+the two representations, whose allocations are measured with tracemalloc:
+
+- tuples: a list of the (id, name, course, mobile) tuples returned by the cursor,
+  with a dict of sets of ids by name (the table model before record_store.py)
+- store: a StudentStore (record_store.py), the records stored column by column
+
+The bytes per row are reported for each, as well as the time taken to fill them.
+
+Run from the repository root:
+    python -m benchmarks.bench_memory --sizes 10k 100k 1M
+"""
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from record_store import StudentStore
+from repository import StudentRepository, SQLiteDriver
+from query_cache import QueryCache
+from benchmarks.bench_repository import fill_database
+from benchmarks.common import save_results
+from benchmarks.data_generator import parse_size, size_label
+
+
+def tuples_model(chunks):
+    """
+    Keep the records as the cursor's tuples, with a name index of sets.
+    """
+    rows = []
+    name_index = {}
+    for chunk in chunks:
+        rows.extend(chunk)
+        for student in chunk:
+            name_index.setdefault(student[1], set()).add(student[0])
+    return rows, name_index
+
+
+def store_model(chunks):
+    """
+    Keep the records in a StudentStore.
+    """
+    store = StudentStore()
+    for chunk in chunks:
+        store.extend(chunk)
+    return store
+
+
+def measure(repository, rows, build):
+    """
+    Read every record from the repository into a representation and return its memory footprint.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    # Only the chunk being read is alive on top of the representation
+    kept = build(repository.stream(0, rows))
+    seconds = time.perf_counter() - start
+    gc.collect()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return {
+        "rows": rows,
+        "bytes": size,
+        "bytes_per_row": round(size / rows, 1),
+        "peak_bytes": peak,
+        "seconds": round(seconds, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=[10_000, 100_000],
+                        help="numbers of rows, e.g. 10k 100k 1M (default: 10k 100k)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the data generator (default: 0)")
+    parser.add_argument("--output", default=None,
+                        help="the JSON results file (default: benchmarks/results/bench_memory-<commit>-<time>.json)")
+    args = parser.parse_args()
+
+    results = {}
+    for rows in args.sizes:
+        label = size_label(rows)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "memory.db"
+            repository = StudentRepository(SQLiteDriver(path), QueryCache(max_entries=0))
+            fill_database(repository, rows, args.seed)
+            results[label] = {"tuples": measure(repository, rows, tuples_model),
+                              "store": measure(repository, rows, store_model)}
+            SQLiteDriver.managers.pop(str(path)).close_all()
+
+        tuples, store = results[label]["tuples"], results[label]["store"]
+        print(f"  {label:<6}tuples{tuples['bytes_per_row']:>8.1f} B/row{tuples['seconds']:>8.3f} s"
+              f"   store{store['bytes_per_row']:>8.1f} B/row{store['seconds']:>8.3f} s"
+              f"   ({tuples['bytes'] / store['bytes']:.2f}x smaller)")
+
+    output = save_results("bench_memory", {"sizes": args.sizes, "seed": args.seed}, results, args.output)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
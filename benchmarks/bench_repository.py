@@ -0,0 +1,261 @@
+"""
+Benchmark suite of the data access (StudentRepository) on SQLite and MySQL.
+
+For each backend and data size, a fresh database is filled with synthetic students
+(see data_generator.py) and the repository operations are measured:
+
+- bulk_insert: loading the synthetic students, in batches (rows per second)
+- full_load: reading the whole table page by page, like the table view scrolled to the end
+- page_first, page_deep, page_previous: latency of a page read with keyset pagination: the
+  first page, a page jumped to in the last tenth of the table, and the page before a random id
+- page_sorted: latency of a page of the students of a course sorted by name in decreasing order,
+  continuing after a random name (the table sorted and filtered on the server)
+- get, search_exact, search_prefix, search_substring, search_fuzzy, insert, update,
+  delete: latency of single operations
+- bulk_import, bulk_export: CSV import and export throughput
+- get_cached, search_cached: lookups and searches repeated over a small set of hot keys
+  with the query result cache enabled, with its hit rate (the other measures bypass the cache)
+
+The results are printed and saved as JSON in benchmarks/results/, to be compared
+between commits with benchmarks/compare_results.py.
+
+The MySQL benchmark needs a MySQL server (a local one is enough, for instance
+`docker run -e MYSQL_ROOT_PASSWORD=<password> -p 3306:3306 mysql:8`) reached with the
+HOST, PORT, USER and PASSWORD settings of the .env file. It creates, then drops, a
+dedicated database (--mysql-database, school_bench by default).
+
+Run from the repository root:
+    python -m benchmarks.bench_repository --sizes 10k 100k 1M
+    python -m benchmarks.bench_repository --backends sqlite mysql --sizes 10k 100k
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from constants import (SQLITE_BACKEND, MYSQL_BACKEND, TABLE_PAGE_SIZE, IMPORT_BATCH_SIZE, COURSES,
+                       HOST, PORT, USER, PASSWORD, DATABASE)
+from repository import StudentRepository, SQLiteDriver, MySQLDriver
+from query_cache import QueryCache
+from search_engine import EXACT_SEARCH, PREFIX_SEARCH, SUBSTRING_SEARCH, FUZZY_SEARCH
+from benchmarks.data_generator import (FIRST_NAMES, LAST_NAMES, generate_students, random_name,
+                                       batched, write_file, parse_size, size_label)
+from benchmarks.common import summarize, time_calls, throughput, save_results
+
+
+# Rows of the CSV file imported by the bulk_import measure (at most the data size)
+IMPORT_ROWS = 100_000
+# Number of distinct keys looked up by the cached measures
+HOT_KEYS = 20
+
+
+def sqlite_repository(tmp_dir, rows, cache=None, **driver_options):
+    """
+    Return a repository (with the given result cache) on a new SQLite database file, and a function deleting it.
+
+    The driver_options are passed to the SQLiteDriver.
+    """
+    path = Path(tmp_dir) / f"students_{rows}.db"
+    driver = SQLiteDriver(path, **driver_options)
+
+    def cleanup():
+        SQLiteDriver.managers.pop(str(path)).close_all()
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+    return StudentRepository(driver, cache), cleanup
+
+
+def mysql_repository(database, cache=None, **driver_options):
+    """
+    Return a repository (with the given result cache) on a new, empty MySQL database, and a function dropping it.
+
+    The driver_options are passed to the MySQLDriver.
+    """
+    import mysql.connector
+
+    if database == DATABASE:
+        raise SystemExit(f"Refusing to benchmark on the application database '{DATABASE}', "
+                         f"it would be dropped: use another --mysql-database")
+
+    def execute(statement):
+        connection = mysql.connector.connect(host=HOST, port=PORT, user=USER, password=PASSWORD)
+        try:
+            connection.cursor().execute(statement)
+        finally:
+            connection.close()
+
+    execute(f"DROP DATABASE IF EXISTS `{database}`")
+    execute(f"CREATE DATABASE `{database}`")
+    driver = MySQLDriver(database=database, **driver_options)
+
+    def cleanup():
+        MySQLDriver.close_pool(MySQLDriver.pools.pop((driver.host, driver.port, driver.user, database)))
+        execute(f"DROP DATABASE IF EXISTS `{database}`")
+
+    return StudentRepository(driver, cache), cleanup
+
+
+def fill_database(repository, rows, seed=0):
+    """
+    Bring the repository's database schema up to date and insert `rows` synthetic students, in batches.
+    """
+    repository.migrate()
+    for batch in batched(generate_students(rows, seed), IMPORT_BATCH_SIZE):
+        repository.bulk_insert(batch)
+
+
+def with_typo(name, rng):
+    """
+    Return the name with one letter replaced, as a mistyped fuzzy search term.
+    """
+    positions = [i for i, char in enumerate(name) if char != " "]
+    i = rng.choice(positions[1:])
+    return name[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + name[i + 1:]
+
+
+def full_load(repository):
+    """
+    Read the whole table page by page and return the number of rows read.
+    """
+    rows = 0
+    last_id = 0
+    while True:
+        page = repository.list(last_id, TABLE_PAGE_SIZE)
+        rows += len(page)
+        if len(page) < TABLE_PAGE_SIZE:
+            return rows
+        last_id = page[-1][0]
+
+
+def run_size(repository, rows, ops, tmp_dir, seed):
+    """
+    Fill the repository's (empty) database with `rows` students and measure every operation.
+
+    Returns:
+        dict: The measures, by operation.
+    """
+    rng = random.Random(seed)
+    results = {}
+
+    start = time.perf_counter()
+    fill_database(repository, rows, seed)
+    results["bulk_insert"] = throughput(rows, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    loaded = full_load(repository)
+    results["full_load"] = throughput(loaded, time.perf_counter() - start)
+
+    results["page_first"] = time_calls(repository.list_at, [(0.0,) for _ in range(ops)])
+    results["page_deep"] = time_calls(repository.list_at, [(rng.uniform(0.9, 1.0),) for _ in range(ops)])
+    results["page_previous"] = time_calls(
+        repository.list_before, [(rng.randint(1, rows),) for _ in range(ops)])
+    results["page_sorted"] = time_calls(
+        repository.list_view, [((random_name(rng), rows), TABLE_PAGE_SIZE, "name", True, rng.choice(COURSES[1:]))
+                               for _ in range(ops)])
+
+    results["get"] = time_calls(repository.get, [(rng.randint(1, rows),) for _ in range(ops)])
+    results["search_exact"] = time_calls(
+        repository.search, [(random_name(rng), EXACT_SEARCH) for _ in range(ops)])
+    results["search_prefix"] = time_calls(
+        repository.search, [(rng.choice(FIRST_NAMES)[:3], PREFIX_SEARCH) for _ in range(ops)])
+    results["search_substring"] = time_calls(
+        repository.search, [(rng.choice(LAST_NAMES)[1:5], SUBSTRING_SEARCH) for _ in range(ops)])
+    results["search_fuzzy"] = time_calls(
+        repository.search, [(with_typo(random_name(rng), rng), FUZZY_SEARCH) for _ in range(ops)])
+
+    new_students = list(generate_students(ops, seed + 1))
+    new_ids = []
+    latencies = []
+    for student in new_students:
+        start = time.perf_counter()
+        new_ids.append(repository.insert(*student))
+        latencies.append(time.perf_counter() - start)
+    results["insert"] = summarize(latencies)
+
+    results["update"] = time_calls(
+        repository.update, [(rng.randint(1, rows), *student) for student in new_students])
+    # Delete the inserted records, so the table keeps its size
+    results["delete"] = time_calls(repository.delete, [(student_id,) for student_id in new_ids])
+
+    import_rows = min(rows, IMPORT_ROWS)
+    import_file = Path(tmp_dir) / f"import_{import_rows}.csv"
+    write_file(import_file, import_rows, seed + 2)
+    import_result = repository.bulk_import(import_file)
+    results["bulk_import"] = throughput(import_result["rows"], import_result["seconds"])
+
+    export_result = repository.bulk_export(Path(tmp_dir) / "export.csv")
+    results["bulk_export"] = throughput(export_result["rows"], export_result["seconds"])
+
+    # The same database through repositories with the default result cache
+    cached_repository = StudentRepository(repository.driver)
+    hot_ids = [rng.randint(1, rows) for _ in range(HOT_KEYS)]
+    results["get_cached"] = time_calls(
+        cached_repository.get, [(rng.choice(hot_ids),) for _ in range(ops)])
+    results["get_cached"]["hit_rate"] = cached_repository.cache_stats()["hit_rate"]
+
+    cached_repository = StudentRepository(repository.driver)
+    hot_names = [random_name(rng) for _ in range(HOT_KEYS)]
+    results["search_cached"] = time_calls(
+        cached_repository.search, [(rng.choice(hot_names), EXACT_SEARCH) for _ in range(ops)])
+    results["search_cached"]["hit_rate"] = cached_repository.cache_stats()["hit_rate"]
+
+    return results
+
+
+def print_results(backend, label, results):
+    """
+    Print the measures of one backend and data size.
+    """
+    print(f"\n{backend}, {label} rows")
+    for operation, measure in results.items():
+        if "rows_per_second" in measure:
+            print(f"  {operation:<18}{measure['rows_per_second']:>12} rows/s"
+                  f"{measure['seconds']:>12.3f} s")
+        else:
+            print(f"  {operation:<18}{measure['p50_ms']:>12.3f} ms p50"
+                  f"{measure['p95_ms']:>12.3f} ms p95")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=(SQLITE_BACKEND, MYSQL_BACKEND),
+                        default=[SQLITE_BACKEND], help="backends to benchmark (default: sqlite)")
+    parser.add_argument("--sizes", type=parse_size, nargs="+", default=[10_000, 100_000],
+                        help="data sizes, numbers or 10k, 100k, 1M, 10M (default: 10k 100k)")
+    parser.add_argument("--ops", type=int, default=200,
+                        help="number of operations of each kind per size (default: 200)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the data generator (default: 0)")
+    parser.add_argument("--mysql-database", default="school_bench",
+                        help="the MySQL database created and dropped by the benchmark (default: school_bench)")
+    parser.add_argument("--output", default=None,
+                        help="the JSON results file (default: benchmarks/results/bench_repository-<commit>-<time>.json)")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for backend in args.backends:
+            results[backend] = {}
+            for rows in args.sizes:
+                # The uncached operations are measured without the result cache
+                uncached = QueryCache(max_entries=0)
+                if backend == SQLITE_BACKEND:
+                    repository, cleanup = sqlite_repository(tmp_dir, rows, uncached)
+                else:
+                    repository, cleanup = mysql_repository(args.mysql_database, uncached)
+                try:
+                    label = size_label(rows)
+                    results[backend][label] = run_size(repository, rows, args.ops, tmp_dir, args.seed)
+                finally:
+                    cleanup()
+                print_results(backend, label, results[backend][label])
+
+    output = save_results("bench_repository",
+                          {"backends": args.backends, "sizes": args.sizes, "ops": args.ops, "seed": args.seed},
+                          results, args.output)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark of the SQLite connection handling used by legacy_ui.
+
+Compares the previous behaviour (a new sqlite3 connection with default settings for
+every operation) with the long-lived, tuned connections of SQLiteConnectionManager.
+
+Run from the repository root:
+    python -m benchmarks.bench_sqlite_connection --rows 100000 --ops 2000
+"""
+import argparse
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from constants import (ASSETS_DIR, SQLITE_PRAGMAS, SQLITE_STATEMENT_CACHE_SIZE,
+                       SEARCH_STUDENT_SQLITE_QUERY, INSERT_STUDENT_SQLITE_QUERY,
+                       UPDATE_STUDENT_SQLITE_QUERY)
+from database import SQLiteConnectionManager
+from benchmarks.data_generator import generate_students, random_name
+
+
+SCHEMA_FILE = ASSETS_DIR / "data" / "SQLite" / "db_sqlite_schema.sql"
+
+
+def create_database(path, rows):
+    """
+    Create a students database at path filled with `rows` random students.
+    """
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA_FILE.read_text())
+    connection.executemany(INSERT_STUDENT_SQLITE_QUERY, generate_students(rows))
+    connection.commit()
+    connection.close()
+
+
+def per_operation_connect(path):
+    """
+    Return a connect function mimicking the previous behaviour: a new default connection per call.
+    """
+    return lambda: sqlite3.connect(path)
+
+
+def managed_connect(path):
+    """
+    Return a connect function handing out the manager's long-lived tuned connection.
+    """
+    manager = SQLiteConnectionManager(path, SQLITE_PRAGMAS, cached_statements=SQLITE_STATEMENT_CACHE_SIZE)
+    return manager.connection
+
+
+def run_operations(connect, ops, max_id):
+    """
+    Time `ops` search, insert and update operations, each one connecting like the UI does.
+
+    Returns:
+    - dict: Per operation kind, the list of latencies in seconds.
+    """
+    timings = {"startup": [], "search": [], "insert": [], "update": []}
+
+    # Startup: the first connection and query of the process
+    start = time.perf_counter()
+    with connect() as connection:
+        connection.execute(SEARCH_STUDENT_SQLITE_QUERY, ("John Smith",)).fetchall()
+    timings["startup"].append(time.perf_counter() - start)
+
+    for _ in range(ops):
+        name = random_name()
+
+        start = time.perf_counter()
+        with connect() as connection:
+            connection.execute(SEARCH_STUDENT_SQLITE_QUERY, (name,)).fetchall()
+        timings["search"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with connect() as connection:
+            connection.execute(INSERT_STUDENT_SQLITE_QUERY, (name, "Math", "12345678"))
+            connection.commit()
+        timings["insert"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with connect() as connection:
+            connection.execute(UPDATE_STUDENT_SQLITE_QUERY,
+                               (name, "Physics", "87654321", random.randint(1, max_id)))
+            connection.commit()
+        timings["update"].append(time.perf_counter() - start)
+
+    return timings
+
+
+def summarize(timings):
+    """
+    Return (mean, p95) in milliseconds of a list of latencies.
+    """
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return statistics.fmean(ordered) * 1000, p95 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="number of students in the database")
+    parser.add_argument("--ops", type=int, default=1000, help="number of operations of each kind")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = {}
+        for label, make_connect in (("before", per_operation_connect), ("after", managed_connect)):
+            # Each variant gets its own file since journal_mode=WAL is persistent
+            path = Path(tmp_dir) / f"{label}.db"
+            create_database(path, args.rows)
+            results[label] = run_operations(make_connect(path), args.ops, args.rows)
+
+    print(f"{args.rows} rows, {args.ops} operations of each kind (mean / p95 in ms)")
+    print(f"{'operation':<10}{'before':>20}{'after':>20}{'speedup':>10}")
+    for kind in ("startup", "search", "insert", "update"):
+        before_mean, before_p95 = summarize(results["before"][kind])
+        after_mean, after_p95 = summarize(results["after"][kind])
+        print(f"{kind:<10}{before_mean:>11.3f} / {before_p95:<6.3f}"
+              f"{after_mean:>11.3f} / {after_p95:<6.3f}{before_mean / after_mean:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark of the application's cold start, with a time budget.
+
+Each run starts a fresh Python interpreter (under the offscreen Qt platform) which
+imports the user interface module, creates the application and the main window,
+shows it and waits for the first page of the table. The median of the runs is
+reported for each phase:
+
+- interpreter: from the process launch to the first line of the script
+- import: importing the user interface module
+- window_shown: creating the QApplication and the main window, and showing it
+- first_page: from the window shown to the first page of rows in the table
+- total: from the process launch to the first page
+
+The SQLite run uses a temporary database filled with synthetic students (the schema
+migrations are applied beforehand, like on every start but the first one).
+
+The exit code is 1 if the median time to the shown window (or to the first page, or
+the import time) exceeds its budget, so the benchmark can guard the startup time in CI.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 20 --budget-window-ms 400
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from constants import SQLITE_BACKEND, MYSQL_BACKEND
+from benchmarks.common import save_results
+
+
+# Script run by each child interpreter. It prints the perf_counter() timestamps of the phases
+# (CLOCK_MONOTONIC on Linux and macOS, comparable between processes).
+CHILD_SCRIPT = """
+import time
+started = time.perf_counter()
+import json, sys
+from PyQt6.QtCore import QEventLoop, QTimer
+backend, database_file = sys.argv[1], sys.argv[2]
+
+import ui
+from backends import create_repository
+imported = time.perf_counter()
+repository = create_repository(backend, **({"database_file": database_file} if backend == "sqlite" else {}))
+
+from PyQt6.QtWidgets import QApplication
+app = QApplication([])
+window = ui.MainWindow(repository)
+window.show()
+app.processEvents()
+shown = time.perf_counter()
+
+loop = QEventLoop()
+checker = QTimer()
+checker.timeout.connect(lambda: window.model.rowCount() and loop.quit())
+checker.start(1)
+QTimer.singleShot(30000, loop.quit)
+loop.exec()
+first_page = time.perf_counter()
+
+print(json.dumps({"started": started, "imported": imported, "shown": shown,
+                  "first_page": first_page, "rows": window.model.rowCount()}))
+window.worker.shutdown()
+"""
+
+
+def prepare_database(path, rows, seed):
+    """
+    Create a SQLite database with `rows` synthetic students and an up to date schema.
+    """
+    from repository import StudentRepository, SQLiteDriver
+    from benchmarks.bench_repository import fill_database
+
+    repository = StudentRepository(SQLiteDriver(path))
+    fill_database(repository, rows, seed)
+    SQLiteDriver.managers.pop(str(path)).close_all()
+
+
+def run_once(backend, database_file):
+    """
+    Start the application in a fresh interpreter and return the duration of each phase, in milliseconds.
+    """
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    launched = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-c", CHILD_SCRIPT, backend, str(database_file)],
+                               capture_output=True, text=True, env=env, check=True)
+    timestamps = json.loads(completed.stdout.strip().splitlines()[-1])
+    if not timestamps["rows"]:
+        raise RuntimeError("The table was not loaded within 30 seconds")
+
+    def ms(start, end):
+        return (end - start) * 1000
+
+    return {
+        "interpreter_ms": ms(launched, timestamps["started"]),
+        "import_ms": ms(timestamps["started"], timestamps["imported"]),
+        "window_shown_ms": ms(timestamps["imported"], timestamps["shown"]),
+        "first_page_ms": ms(timestamps["shown"], timestamps["first_page"]),
+        "total_ms": ms(launched, timestamps["first_page"]),
+        # What the user waits for before seeing the window
+        "launch_to_window_ms": ms(launched, timestamps["shown"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=(SQLITE_BACKEND, MYSQL_BACKEND), default=SQLITE_BACKEND,
+                        help="backend of the started user interface, MySQL uses the configured database "
+                             "(default: sqlite)")
+    parser.add_argument("--rows", type=int, default=100_000,
+                        help="rows of the SQLite database (default: 100000)")
+    parser.add_argument("--runs", type=int, default=10, help="number of cold starts (default: 10)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the data generator (default: 0)")
+    parser.add_argument("--budget-import-ms", type=float, default=300,
+                        help="budget of the median import time (default: 300)")
+    parser.add_argument("--budget-window-ms", type=float, default=600,
+                        help="budget of the median time from the process launch to the shown window (default: 600)")
+    parser.add_argument("--budget-first-page-ms", type=float, default=1000,
+                        help="budget of the median time from the process launch to the first page (default: 1000)")
+    parser.add_argument("--output", default=None,
+                        help="the JSON results file (default: benchmarks/results/bench_startup-<commit>-<time>.json)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_file = Path(tmp_dir) / "startup.db"
+        if args.backend == SQLITE_BACKEND:
+            prepare_database(database_file, args.rows, args.seed)
+        # The first start warms the OS file cache, like the user's previous sessions
+        run_once(args.backend, database_file)
+        runs = [run_once(args.backend, database_file) for _ in range(args.runs)]
+
+    results = {phase: {"median_ms": round(statistics.median(run[phase] for run in runs), 3),
+                       "max_ms": round(max(run[phase] for run in runs), 3)}
+               for phase in runs[0]}
+    for phase, measure in results.items():
+        print(f"  {phase:<22}{measure['median_ms']:>10.1f} ms median{measure['max_ms']:>10.1f} ms max")
+
+    budgets = {"import_ms": args.budget_import_ms,
+               "launch_to_window_ms": args.budget_window_ms,
+               "total_ms": args.budget_first_page_ms}
+    over_budget = [phase for phase, budget in budgets.items() if results[phase]["median_ms"] > budget]
+
+    output = save_results("bench_startup",
+                          {"backend": args.backend, "rows": args.rows, "runs": args.runs, "budgets_ms": budgets},
+                          {args.backend: results}, args.output)
+    print(f"\nResults saved to {output}")
+
+    for phase in over_budget:
+        print(f"OVER BUDGET: {phase} median {results[phase]['median_ms']} ms > {budgets[phase]} ms")
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
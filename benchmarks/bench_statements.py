@@ -0,0 +1,129 @@
+"""
+Benchmark of single-row operations with and without statement reuse, on SQLite and MySQL.
+
+For each backend, a fresh database is filled with synthetic students, then single-row
+operations are run one at a time through the repository, like the edits made from
+the GUI:
+
+- insert: adding a student
+- update: changing a random student
+- get: reading a random student by id
+- delete: removing the students inserted
+
+Each backend is measured twice, on separate databases:
+
+- uncached: every query is compiled again (SQLite with cached_statements=0, MySQL with
+  the queries sent as text, without prepared statements)
+- cached: the statements are reused (the SQLite statement cache of each connection,
+  MySQL server-side prepared statements kept per pooled connection)
+
+The operations per second and the latencies are reported for each, with the speedup
+of the cached run.
+
+The MySQL run needs a MySQL server, see bench_repository.py.
+
+Run from the repository root:
+    python -m benchmarks.bench_statements --ops 2000
+    python -m benchmarks.bench_statements --backends sqlite mysql
+"""
+import argparse
+import random
+import tempfile
+from constants import (SQLITE_BACKEND, MYSQL_BACKEND, SQLITE_STATEMENT_CACHE_SIZE,
+                       MYSQL_STATEMENT_CACHE_SIZE)
+from query_cache import QueryCache
+from benchmarks.bench_repository import sqlite_repository, mysql_repository, fill_database
+from benchmarks.common import time_calls, save_results
+from benchmarks.data_generator import generate_students, parse_size, size_label
+
+
+def measure(function, arguments):
+    """
+    Time function(*args) for each args tuple of `arguments` and add the operations per second.
+    """
+    result = time_calls(function, arguments)
+    result["ops_per_second"] = round(1000 / result["mean_ms"]) if result["mean_ms"] else 0
+    return result
+
+
+def run_operations(repository, rows, ops, seed):
+    """
+    Fill the repository's (empty) database with `rows` students and measure the single-row operations.
+
+    Returns:
+        dict: The measures, by operation.
+    """
+    rng = random.Random(seed)
+    fill_database(repository, rows, seed)
+    new_students = list(generate_students(ops, seed + 1))
+    results = {}
+
+    new_ids = []
+
+    def insert(name, course, mobile):
+        new_ids.append(repository.insert(name, course, mobile))
+
+    results["insert"] = measure(insert, new_students)
+    results["update"] = measure(
+        repository.update, [(rng.randint(1, rows), *student) for student in new_students])
+    results["get"] = measure(repository.get, [(rng.randint(1, rows),) for _ in range(ops)])
+    # Delete the inserted records, so the table keeps its size
+    results["delete"] = measure(repository.delete, [(student_id,) for student_id in new_ids])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=(SQLITE_BACKEND, MYSQL_BACKEND),
+                        default=[SQLITE_BACKEND], help="backends to benchmark (default: sqlite)")
+    parser.add_argument("--rows", type=parse_size, default=10_000,
+                        help="number of students in the table, e.g. 10k (default: 10k)")
+    parser.add_argument("--ops", type=int, default=1000,
+                        help="number of operations of each kind per run (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the data generator (default: 0)")
+    parser.add_argument("--mysql-database", default="school_bench",
+                        help="the MySQL database created and dropped by the benchmark (default: school_bench)")
+    parser.add_argument("--output", default=None,
+                        help="the JSON results file (default: benchmarks/results/bench_statements-<commit>-<time>.json)")
+    args = parser.parse_args()
+
+    cache_sizes = {SQLITE_BACKEND: SQLITE_STATEMENT_CACHE_SIZE, MYSQL_BACKEND: MYSQL_STATEMENT_CACHE_SIZE}
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for backend in args.backends:
+            results[backend] = {}
+            for mode, statement_cache_size in (("uncached", 0), ("cached", cache_sizes[backend])):
+                # Only the statements are reused, the query results are not cached
+                uncached = QueryCache(max_entries=0)
+                if backend == SQLITE_BACKEND:
+                    repository, cleanup = sqlite_repository(tmp_dir, args.rows, uncached,
+                                                            statement_cache_size=statement_cache_size)
+                else:
+                    repository, cleanup = mysql_repository(args.mysql_database, uncached,
+                                                           statement_cache_size=statement_cache_size)
+                try:
+                    results[backend][mode] = run_operations(repository, args.rows, args.ops, args.seed)
+                    if backend == MYSQL_BACKEND:
+                        pool_stats = repository.driver.get_pool().stats()
+                        results[backend][mode]["statement_hits"] = pool_stats["statement_hits"]
+                        results[backend][mode]["statement_misses"] = pool_stats["statement_misses"]
+                finally:
+                    cleanup()
+
+            print(f"\n{backend}, {size_label(args.rows)} rows, {args.ops} operations each")
+            uncached, cached = results[backend]["uncached"], results[backend]["cached"]
+            for operation in ("insert", "update", "get", "delete"):
+                before, after = uncached[operation], cached[operation]
+                print(f"  {operation:<8}uncached{before['ops_per_second']:>9} ops/s{before['p50_ms']:>9.3f} ms p50"
+                      f"   cached{after['ops_per_second']:>9} ops/s{after['p50_ms']:>9.3f} ms p50"
+                      f"   ({before['mean_ms'] / after['mean_ms']:.2f}x)")
+
+    output = save_results("bench_statements",
+                          {"backends": args.backends, "rows": args.rows, "ops": args.ops, "seed": args.seed},
+                          results, args.output)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
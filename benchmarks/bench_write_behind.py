@@ -0,0 +1,118 @@
+"""
+Benchmark of student inserts and updates committed one by one, and through the write-behind queue.
+
+For each backend, a fresh database is filled with synthetic students, then the same
+inserts followed by updates are written:
+
+- direct: each write through StudentRepository.insert/update, in its own transaction
+- write_behind: every write queued in a WriteBehindQueue (write_queue.py), committed in
+  batches of --batch-size writes, the time including the wait for the last acknowledgement
+
+The writes per second of each are reported, with the number of batches committed.
+
+The MySQL run needs a MySQL server, see bench_repository.py.
+
+Run from the repository root:
+    python -m benchmarks.bench_write_behind --ops 5000
+    python -m benchmarks.bench_write_behind --backends sqlite mysql
+"""
+import argparse
+import random
+import tempfile
+import time
+from constants import SQLITE_BACKEND, MYSQL_BACKEND, WRITE_BEHIND_BATCH_SIZE, WRITE_BEHIND_MAX_DELAY
+from query_cache import QueryCache
+from write_queue import WriteBehindQueue
+from benchmarks.bench_repository import sqlite_repository, mysql_repository, fill_database
+from benchmarks.common import throughput, save_results
+from benchmarks.data_generator import generate_students, parse_size
+
+
+def direct_writes(repository, students, updates):
+    """
+    Write each insert and update in its own transaction.
+    """
+    for student in students:
+        repository.insert(*student)
+    for update in updates:
+        repository.update(*update)
+
+
+def queued_writes(repository, students, updates, batch_size):
+    """
+    Queue every insert and update and wait until they are all acknowledged.
+
+    Returns:
+        dict: The counters of the queue.
+    """
+    write_queue = WriteBehindQueue(repository, batch_size=batch_size, max_delay=WRITE_BEHIND_MAX_DELAY)
+    try:
+        acks = [write_queue.insert(*student) for student in students]
+        acks += [write_queue.update(*update) for update in updates]
+        for ack in acks:
+            ack.result()
+        return write_queue.stats()
+    finally:
+        write_queue.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=(SQLITE_BACKEND, MYSQL_BACKEND),
+                        default=[SQLITE_BACKEND], help="backends to benchmark (default: sqlite)")
+    parser.add_argument("--rows", type=parse_size, default=10_000,
+                        help="number of students in the table, e.g. 10k (default: 10k)")
+    parser.add_argument("--ops", type=int, default=2000,
+                        help="number of inserts, and of updates, per run (default: 2000)")
+    parser.add_argument("--batch-size", type=int, default=WRITE_BEHIND_BATCH_SIZE,
+                        help=f"writes per transaction of the queue (default: {WRITE_BEHIND_BATCH_SIZE})")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the data generator (default: 0)")
+    parser.add_argument("--mysql-database", default="school_bench",
+                        help="the MySQL database created and dropped by the benchmark (default: school_bench)")
+    parser.add_argument("--output", default=None,
+                        help="the JSON results file (default: benchmarks/results/bench_write_behind-<commit>-<time>.json)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    students = list(generate_students(args.ops, args.seed + 1))
+    updates = [(rng.randint(1, args.rows), *student) for student in generate_students(args.ops, args.seed + 2)]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for backend in args.backends:
+            results[backend] = {}
+            for mode in ("direct", "write_behind"):
+                if backend == SQLITE_BACKEND:
+                    repository, cleanup = sqlite_repository(tmp_dir, args.rows, QueryCache(max_entries=0))
+                else:
+                    repository, cleanup = mysql_repository(args.mysql_database, QueryCache(max_entries=0))
+                try:
+                    fill_database(repository, args.rows, args.seed)
+                    start = time.perf_counter()
+                    if mode == "direct":
+                        direct_writes(repository, students, updates)
+                        stats = {}
+                    else:
+                        stats = queued_writes(repository, students, updates, args.batch_size)
+                    results[backend][mode] = throughput(2 * args.ops, time.perf_counter() - start)
+                    results[backend][mode].update(stats)
+                finally:
+                    cleanup()
+
+            direct, queued = results[backend]["direct"], results[backend]["write_behind"]
+            print(f"\n{backend}, {args.ops} inserts and {args.ops} updates")
+            print(f"  direct      {direct['rows_per_second']:>9} writes/s{direct['seconds']:>9.3f} s")
+            print(f"  write_behind{queued['rows_per_second']:>9} writes/s{queued['seconds']:>9.3f} s"
+                  f"   {queued['batches']} batches"
+                  f"   ({direct['seconds'] / queued['seconds']:.2f}x)")
+
+    output = save_results("bench_write_behind",
+                          {"backends": args.backends, "rows": args.rows, "ops": args.ops,
+                           "batch_size": args.batch_size, "seed": args.seed},
+                          results, args.output)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Helpers shared by the benchmarks: latency statistics and JSON result files.
+
+Result files are written to benchmarks/results/ and named after the benchmark, the
+commit and the time of the run, so runs of different commits can be compared with
+`python -m benchmarks.compare_results <old.json> <new.json>`.
+"""
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def summarize(latencies):
+    """
+    Return the statistics of a list of latencies in seconds, in milliseconds.
+
+    Returns:
+        dict: The number of operations, and the mean, median, 95th percentile and maximum latency.
+    """
+    ordered = sorted(latencies)
+    return {
+        "ops": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
+
+
+def time_calls(function, arguments):
+    """
+    Call function(*args) for each args tuple of `arguments` and return the latency statistics.
+    """
+    latencies = []
+    for args in arguments:
+        start = time.perf_counter()
+        function(*args)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def throughput(rows, seconds):
+    """
+    Return the duration and the number of rows per second of an operation on `rows` rows.
+    """
+    return {
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_second": round(rows / seconds) if seconds else 0,
+    }
+
+
+def git_commit():
+    """
+    Return the current commit hash (suffixed with "-dirty" if there are uncommitted changes), or None.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+def environment():
+    """
+    Return a description of the machine and software the benchmark ran on.
+    """
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def save_results(benchmark, parameters, results, output=None):
+    """
+    Write the results of a benchmark run to a JSON file.
+
+    Args:
+        benchmark (str): The name of the benchmark.
+        parameters (dict): The parameters of the run (sizes, number of operations, ...).
+        results (dict): The measures.
+        output (str or Path): The file to write. Defaults to
+            benchmarks/results/<benchmark>-<commit>-<time>.json.
+
+    Returns:
+        Path: The written file.
+    """
+    env = environment()
+    if output is None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{benchmark}-{env['commit'] or 'nocommit'}-{stamp}.json"
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"benchmark": benchmark, "environment": env,
+                                  "parameters": parameters, "results": results}, indent=2))
+    return output
@@ -0,0 +1,93 @@
+"""
+Compare two JSON result files of a benchmark, for instance before and after a commit.
+
+Every measure present in both files is compared: latencies and durations (`*_ms`,
+`seconds`) are better when lower, throughputs (`rows_per_second`) and cache hit rates when higher. Changes
+beyond the threshold are reported, and the exit code is 1 if any measure regressed.
+
+Run from the repository root:
+    python -m benchmarks.compare_results benchmarks/results/old.json benchmarks/results/new.json
+"""
+import argparse
+import json
+import sys
+
+
+LOWER_IS_BETTER = ("_ms", "seconds", "_mb")
+HIGHER_IS_BETTER = ("rows_per_second", "hit_rate")
+
+
+def flatten(results, prefix=""):
+    """
+    Return the numeric measures of nested results as a {"a/b/c": value} dict.
+    """
+    measures = {}
+    for key, value in results.items():
+        path = f"{prefix}/{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            measures.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            measures[path] = value
+    return measures
+
+
+def compare(old, new, threshold):
+    """
+    Return the (measure, old value, new value, relative change, regressed) tuples of the
+    measures that changed by more than `threshold` (a fraction), in the better or worse direction.
+    """
+    old_measures = flatten(old["results"])
+    new_measures = flatten(new["results"])
+    changes = []
+
+    for path in sorted(old_measures.keys() & new_measures.keys()):
+        if path.endswith(HIGHER_IS_BETTER):
+            lower_is_better = False
+        elif path.endswith(LOWER_IS_BETTER):
+            lower_is_better = True
+        else:
+            # Counts (rows, ops) are not performance measures
+            continue
+        if path.endswith("max_ms"):
+            # A single outlier, too noisy to compare
+            continue
+
+        old_value, new_value = old_measures[path], new_measures[path]
+        if not old_value:
+            continue
+        change = (new_value - old_value) / old_value
+        if abs(change) > threshold:
+            regressed = change > 0 if lower_is_better else change < 0
+            changes.append((path, old_value, new_value, change, regressed))
+
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("old", help="the reference results file")
+    parser.add_argument("new", help="the results file to check")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative change ignored as noise (default: 0.10, i.e. 10%%)")
+    args = parser.parse_args()
+
+    with open(args.old) as file:
+        old = json.load(file)
+    with open(args.new) as file:
+        new = json.load(file)
+
+    print(f"{old['benchmark']}: {old['environment']['commit']} -> {new['environment']['commit']}")
+    changes = compare(old, new, args.threshold)
+    if not changes:
+        print(f"No change beyond {args.threshold:.0%}")
+
+    for path, old_value, new_value, change, regressed in changes:
+        print(f"{'REGRESSION' if regressed else 'improvement':<12}{path:<50}"
+              f"{old_value:>14}{new_value:>14}{change:>+9.1%}")
+
+    sys.exit(1 if any(regressed for *_, regressed in changes) else 0)
+
+
+if __name__ == "__main__":
+    main()
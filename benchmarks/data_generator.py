@@ -0,0 +1,124 @@
+"""
+Synthetic student records for the benchmarks.
+
+The records look like the ones entered through the insert dialog: names match
+NAME_PATTERN (a first and a last name made of letters), phone numbers match
+PHONE_NUMBER_PATTERN (8 digits) and courses are spread evenly over COURSES (without
+the 'Select Course' placeholder). Generation is seeded, so a given size always
+produces the same records.
+
+Generate a file for the importer (CSV or JSONL, from the extension):
+    python -m benchmarks.data_generator students.csv --rows 1M
+"""
+import argparse
+import csv
+import json
+import random
+from itertools import islice
+from constants import COURSES
+
+
+FIRST_NAMES = [
+    "John", "Asha", "Lokesh", "Andy", "Kasia", "Paula", "Sami", "Rami", "Sara", "Lora",
+    "Maria", "David", "Fatima", "Chen", "Olga", "Pedro", "Amira", "Lucas", "Nina", "Omar",
+    "Elena", "Tariq", "Hana", "Ivan", "Leila", "Mateo", "Yara", "Noah", "Zeina", "Karim",
+    "Emma", "Liam", "Mia", "Ali", "Sofia", "Ravi", "Aya", "Jonas", "Lina", "Hugo",
+]
+LAST_NAMES = [
+    "Smith", "Patel", "Rana", "Johnson", "Popescu", "Zephyr", "Daher", "Naser", "Hani", "Mhanna",
+    "Garcia", "Kim", "Nguyen", "Muller", "Rossi", "Silva", "Haddad", "Khan", "Ivanova", "Cohen",
+    "Brown", "Tanaka", "Novak", "Dubois", "Yilmaz", "Santos", "Jansen", "Costa", "Okafor", "Lindqvist",
+    "Wilson", "Moreau", "Kowalski", "Hansen", "Farah", "Sato", "Lopez", "Fischer", "Aziz", "Murphy",
+]
+REAL_COURSES = COURSES[1:]
+
+# The data sizes of the benchmarks, by label
+SIZES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+
+
+def parse_size(value):
+    """
+    Return the number of rows of a size given as a label of SIZES (e.g. "1M") or a number.
+    """
+    if value in SIZES:
+        return SIZES[value]
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid size: {value} (use a number or one of {', '.join(SIZES)})") from None
+
+
+def size_label(rows):
+    """
+    Return the label of a number of rows (e.g. 1000000 -> "1M").
+    """
+    for label, size in SIZES.items():
+        if size == rows:
+            return label
+    return str(rows)
+
+
+def random_name(rng=random):
+    """
+    Return a random student name matching NAME_PATTERN.
+    """
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def generate_students(rows, seed=0):
+    """
+    Yield `rows` random (name, course, mobile) student records.
+
+    Args:
+        rows (int): The number of records.
+        seed (int): The seed of the random generator. Defaults to 0.
+    """
+    rng = random.Random(seed)
+    choice = rng.choice
+    randrange = rng.randrange
+    for _ in range(rows):
+        yield (f"{choice(FIRST_NAMES)} {choice(LAST_NAMES)}",
+               choice(REAL_COURSES),
+               f"{randrange(10**8):08d}")
+
+
+def batched(records, size):
+    """
+    Yield lists of up to `size` records, so large data sets are never held in memory at once.
+    """
+    records = iter(records)
+    while batch := list(islice(records, size)):
+        yield batch
+
+
+def write_file(path, rows, seed=0):
+    """
+    Write `rows` random student records to a CSV or JSONL file, as read by the importer.
+    """
+    path = str(path)
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        if path.endswith(".csv"):
+            writer = csv.writer(file)
+            writer.writerow(("name", "course", "mobile"))
+            writer.writerows(generate_students(rows, seed))
+        else:
+            file.writelines(json.dumps({"name": name, "course": course, "mobile": mobile}) + "\n"
+                            for name, course, mobile in generate_students(rows, seed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help="the CSV or JSONL file to write")
+    parser.add_argument("--rows", type=parse_size, default=SIZES["10k"],
+                        help=f"number of students, a number or one of {', '.join(SIZES)} (default: 10k)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random generator (default: 0)")
+    args = parser.parse_args()
+
+    write_file(args.file, args.rows, args.seed)
+    print(f"{args.rows} students written to {args.file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 from pathlib import Path
-from dotenv import load_dotenv
 import os
 
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from the .env file found in this directory or one of its parents, like
+# load_dotenv() does, but only import python-dotenv (slow to import) when there is such a file
+ENV_FILE = next((directory / ".env" for directory in Path(__file__).resolve().parents
+                 if (directory / ".env").is_file()), None)
+if ENV_FILE is not None:
+    from dotenv import load_dotenv
+    load_dotenv(ENV_FILE)
 
 
 ASSETS_DIR = Path("./assets")
@@ -12,8 +16,42 @@ ADD_ICON = ASSETS_DIR / "icons" / "add.png"
 SEARCH_ICON = ASSETS_DIR / "icons" / "search.png"
 CLEAR_ICON = ASSETS_DIR / "icons" / "clear.png"
 
+# Database backends
+SQLITE_BACKEND = "sqlite"
+MYSQL_BACKEND = "mysql"
+# read-only SQLite snapshot of the database (SQLite dialect), for local reporting
+SQLITE_SNAPSHOT_BACKEND = "sqlite-snapshot"
+# backend the application runs on, unless the --backend option of main.py is given (see backends.py)
+DB_BACKEND = os.environ.get("DB_BACKEND", MYSQL_BACKEND)
+
 # SQLITE data
 DB_FILE = ASSETS_DIR / "data" / "SQLite" / "database.db"
+# PRAGMA settings applied to every SQLite connection
+SQLITE_PRAGMAS = {
+    # write-ahead logging: readers do not block on the writer (and vice versa)
+    "journal_mode": "WAL",
+    # in WAL mode NORMAL only fsyncs at checkpoints, which is still safe against corruption
+    "synchronous": "NORMAL",
+    # negative value means KiB: keep up to 64 MB of database pages in memory
+    "cache_size": -64000,
+    # memory-map up to 256 MB of the database file instead of read() calls
+    "mmap_size": 256 * 1024 * 1024,
+    # keep temporary tables and indexes in memory
+    "temp_store": "MEMORY",
+}
+# number of prepared statements cached per SQLite connection (sqlite3 reuses the compiled statement of a
+# query run again with the same SQL text on the same long-lived connection)
+SQLITE_STATEMENT_CACHE_SIZE = int(os.environ.get("SQLITE_STATEMENT_CACHE_SIZE", 128))
+# read-only snapshot written by `python exporter.py <file>.db --backend mysql`
+SQLITE_SNAPSHOT_FILE = Path(os.environ.get("SQLITE_SNAPSHOT_FILE", ASSETS_DIR / "data" / "SQLite" / "snapshot.db"))
+# PRAGMA settings applied to the read-only snapshot connections (no journal settings, nothing is written)
+SQLITE_SNAPSHOT_PRAGMAS = {
+    # refuse any write, even if the file could be opened for writing
+    "query_only": "ON",
+    "cache_size": -64000,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
 
 # MYSQL data
 HOST = os.environ.get("HOST")
@@ -21,13 +59,91 @@ PORT = os.environ.get("PORT")
 USER = os.environ.get("USER")
 PASSWORD = os.environ.get("PASSWORD")
 DATABASE = "school"
+# MYSQL connection pool settings
+MYSQL_POOL_SIZE = int(os.environ.get("MYSQL_POOL_SIZE", 5))
+# seconds to wait for a free connection before giving up
+MYSQL_POOL_TIMEOUT = float(os.environ.get("MYSQL_POOL_TIMEOUT", 10))
+# seconds after which an idle connection is closed
+MYSQL_POOL_MAX_IDLE_TIME = float(os.environ.get("MYSQL_POOL_MAX_IDLE_TIME", 300))
+# seconds of idleness after which a connection is pinged before being reused
+MYSQL_POOL_HEALTH_CHECK_INTERVAL = float(os.environ.get("MYSQL_POOL_HEALTH_CHECK_INTERVAL", 5))
+# number of server-side prepared statements kept per pooled connection (0 sends every query as text,
+# parsed by the server on every execution)
+MYSQL_STATEMENT_CACHE_SIZE = int(os.environ.get("MYSQL_STATEMENT_CACHE_SIZE", 64))
+
+# Write-behind settings (see write_queue.py)
+# queue the inserts and updates made from the GUI and commit them in batches (opt-in, or main.py --write-behind)
+WRITE_BEHIND = os.environ.get("WRITE_BEHIND", "0") == "1"
+# number of queued writes committed in a single transaction
+WRITE_BEHIND_BATCH_SIZE = int(os.environ.get("WRITE_BEHIND_BATCH_SIZE", 100))
+# seconds a queued write waits at most before its batch is committed
+WRITE_BEHIND_MAX_DELAY = float(os.environ.get("WRITE_BEHIND_MAX_DELAY", 0.5))
+
+# Query result cache settings
+# maximum number of cached read query results (0 disables the cache)
+QUERY_CACHE_MAX_ENTRIES = int(os.environ.get("QUERY_CACHE_MAX_ENTRIES", 1024))
+# maximum estimated memory taken by the cached results, in MB
+QUERY_CACHE_MAX_MB = float(os.environ.get("QUERY_CACHE_MAX_MB", 32))
+# seconds a cached result stays valid, bounding staleness when another process writes to the database
+QUERY_CACHE_TTL = float(os.environ.get("QUERY_CACHE_TTL", 30))
+
+# Logging
+# write log records from a background thread, so logging never does file I/O on the GUI thread
+LOG_ASYNC = os.environ.get("LOG_ASYNC", "1") != "0"
+# maximum number of log records waiting to be written
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+# what to do with a record when the queue is full: "drop" it (never blocks) or "block" until there is room
+LOG_QUEUE_FULL_POLICY = os.environ.get("LOG_QUEUE_FULL_POLICY", "drop")
+
+# Latency instrumentation
+# database calls slower than this (milliseconds) are written to the slow query log
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 100))
+# UI actions (table population, dialog opening, ...) slower than this (milliseconds) are logged too
+SLOW_UI_ACTION_THRESHOLD_MS = float(os.environ.get("SLOW_UI_ACTION_THRESHOLD_MS", 50))
 
 # GUI table data
 TABLE_HEADERS = ("Id", "Names", "Course", "Mobile")
 COURSES = ['Select Course', 'Math', 'Astronomy', 'Biology', 'Physics']
+# number of rows fetched from the database each time the table needs more rows
+TABLE_PAGE_SIZE = 200
+# number of rows read from the database, and appended to the table, at a time when the table
+# needs many rows at once (e.g. to show a search result far down the table)
+STREAM_CHUNK_SIZE = 1000
+# number of threads running database calls in the background
+DB_WORKER_THREADS = 2
+# columns the table can be sorted by (server side), in TABLE_HEADERS order, each one is indexed
+SORT_COLUMNS = ("id", "name", "course", "mobile")
+# course filter choice of the table showing the students of every course
+ALL_COURSES = "All Courses"
+
+# Page of the table sorted by a column (SORT_COLUMNS) and filtered by course, in either dialect,
+# the id breaks ties. The {where} clause filters by course and, for the id order, continues after
+# the last fetched id.
+GET_STUDENTS_VIEW_PAGE_QUERY = "SELECT * FROM students{where} ORDER BY {column} {direction}, id {direction} LIMIT {placeholder}"
+# Page of the table sorted by another column, continuing after the (sort value, id) of the last fetched
+# row: the rest of the rows with that value, then the next values. Each part reads a single range of
+# the column's index (the id is part of every index), a single OR condition would read the index from its
+# start and make the deep pages slow.
+GET_STUDENTS_VIEW_NEXT_PAGE_QUERY = (
+    "SELECT * FROM (SELECT * FROM students WHERE {course}{column} = {placeholder} AND id {operator} {placeholder} "
+    "ORDER BY id {direction} LIMIT {placeholder}) AS same_value "
+    "UNION ALL SELECT * FROM (SELECT * FROM students WHERE {course}{column} {operator} {placeholder} "
+    "ORDER BY {column} {direction}, id {direction} LIMIT {placeholder}) AS next_values "
+    "ORDER BY {column} {direction}, id {direction} LIMIT {placeholder}")
+STUDENTS_COURSE_CONDITION = "course = {placeholder}"
+STUDENTS_AFTER_ID_CONDITION = "id {operator} {placeholder}"
 
 # SQLITE Queries
-GET_ALL_STUDENTS_SQLITE_QUERY = "SELECT * FROM students"
+COUNT_STUDENTS_SQLITE_QUERY = "SELECT COUNT(*) FROM students"
+EXPORT_STUDENTS_SQLITE_QUERY = "SELECT id, name, course, mobile FROM students ORDER BY id"
+# keyset pagination: fetch the next page of rows after the last fetched id
+GET_STUDENTS_PAGE_SQLITE_QUERY = "SELECT * FROM students WHERE id > ? ORDER BY id LIMIT ?"
+# and the previous page, before the first fetched id (read backwards, the repository reverses it)
+GET_STUDENTS_PAGE_BEFORE_SQLITE_QUERY = "SELECT * FROM students WHERE id < ? ORDER BY id DESC LIMIT ?"
+# smallest and largest ids, to jump to an approximate position (as two subqueries, each one
+# reads a single end of the primary key index, SQLite scans the table for MIN(id), MAX(id))
+GET_STUDENT_ID_RANGE_SQLITE_QUERY = "SELECT (SELECT MIN(id) FROM students), (SELECT MAX(id) FROM students)"
+GET_STUDENT_SQLITE_QUERY = "SELECT * FROM students WHERE id = ?"
 # id field is defined as AUTOINCREMENT when defining the table in database
 INSERT_STUDENT_SQLITE_QUERY = "INSERT INTO students (name, course, mobile) VALUES(?, ?, ?)"
 SEARCH_STUDENT_SQLITE_QUERY = "SELECT * FROM students WHERE name = ?"
@@ -35,13 +151,43 @@ UPDATE_STUDENT_SQLITE_QUERY = "UPDATE students SET name = ?, course = ?, mobile
 DELETE_STUDENT_SQLITE_QUERY = "DELETE FROM students WHERE id = ?"
 
 # MYSQL Queries
-GET_ALL_STUDENTS_MYSQL_QUERY = "SELECT * FROM students"
+COUNT_STUDENTS_MYSQL_QUERY = "SELECT COUNT(*) FROM students"
+EXPORT_STUDENTS_MYSQL_QUERY = "SELECT id, name, course, mobile FROM students ORDER BY id"
+# keyset pagination: fetch the next page of rows after the last fetched id
+GET_STUDENTS_PAGE_MYSQL_QUERY = "SELECT * FROM students WHERE id > %s ORDER BY id LIMIT %s"
+# and the previous page, before the first fetched id (read backwards, the repository reverses it)
+GET_STUDENTS_PAGE_BEFORE_MYSQL_QUERY = "SELECT * FROM students WHERE id < %s ORDER BY id DESC LIMIT %s"
+# smallest and largest ids, to jump to an approximate position (each subquery reads one end of the primary key index)
+GET_STUDENT_ID_RANGE_MYSQL_QUERY = "SELECT (SELECT MIN(id) FROM students), (SELECT MAX(id) FROM students)"
+GET_STUDENT_MYSQL_QUERY = "SELECT * FROM students WHERE id = %s"
 # id field is defined as AUTOINCREMENT when defining the table in database
 INSERT_STUDENT_MYSQL_QUERY = "INSERT INTO students (name, course, mobile) VALUES(%s, %s, %s)"
 SEARCH_STUDENT_MYSQL_QUERY = "SELECT * FROM students WHERE name = %s"
 UPDATE_STUDENT_MYSQL_QUERY = "UPDATE students SET name = %s, course = %s, mobile = %s WHERE id = %s"
 DELETE_STUDENT_MYSQL_QUERY = "DELETE FROM students WHERE id = %s"
 
+# Student search
+# maximum number of ranked results returned by a prefix, substring or fuzzy search
+SEARCH_RESULTS_LIMIT = 50
+# maximum number of candidates fetched from the index before ranking
+SEARCH_CANDIDATES_LIMIT = 500
+# minimum similarity (0 to 1) for a fuzzy search candidate to be kept
+SEARCH_FUZZY_MIN_SCORE = 0.6
+
+# Bulk import
+# number of rows inserted per executemany() call and transaction
+IMPORT_BATCH_SIZE = 20000
+
+# Export
+# number of rows fetched from the database, and written, at a time
+EXPORT_FETCH_SIZE = 10000
+
+# Data migration between backends (see data_migration.py)
+# number of rows copied, verified and committed at a time
+MIGRATE_CHUNK_SIZE = 10000
+# progress of the migrations, to resume them after an interruption
+MIGRATE_CHECKPOINT_DIR = ASSETS_DIR / "data"
+
 # for name pattern allow alphabetical characters with 1 space betwen like 'John Doe'
 NAME_PATTERN = r'^[a-zA-Z]+ [a-zA-Z]+$'
 # for phone number pattern it must be 8 digits
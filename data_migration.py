@@ -0,0 +1,343 @@
+"""
+Resumable copy of the students table between the SQLite and MySQL databases.
+
+The students are read from the source in chunks of MIGRATE_CHUNK_SIZE rows ordered by
+id (keyset pagination, so every chunk costs the same whatever its position) and written
+to the target with executemany(), keeping their ids. Each chunk is verified before it
+is committed: the rows are read back from the target and their checksum must match the
+checksum of the source rows, otherwise the chunk is rolled back and the migration stops.
+Once every chunk is copied, the row counts of both tables are compared.
+
+After each chunk, the progress (last id copied, rows and chunks copied, running checksum)
+is saved to a checkpoint file. Running the same migration again resumes after the last
+committed chunk, so an interrupted migration never copies a row twice. The target must
+be empty when a migration starts; it gets the current schema (see migrations.py).
+
+The SQLite mobile column is an INTEGER (MySQL has a VARCHAR), so the checksums compare
+phone numbers as numbers: the leading zeros of numbers copied to SQLite are not kept.
+
+    python data_migration.py --from sqlite --to mysql
+    python data_migration.py --from mysql --to sqlite --sqlite-file assets/data/SQLite/copy.db
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from constants import (SQLITE_BACKEND, MYSQL_BACKEND, DB_FILE, MIGRATE_CHUNK_SIZE, MIGRATE_CHECKPOINT_DIR,
+                       SQLITE_PRAGMAS, SQLITE_STATEMENT_CACHE_SIZE,
+                       COUNT_STUDENTS_SQLITE_QUERY, COUNT_STUDENTS_MYSQL_QUERY,
+                       GET_STUDENTS_PAGE_SQLITE_QUERY, GET_STUDENTS_PAGE_MYSQL_QUERY)
+from importer import can_batch_fts, DEFER_FTS_SQLITE_QUERY, INDEX_FTS_SQLITE_QUERY, RESUME_FTS_SQLITE_QUERY
+import migrations
+
+
+# Chunk of the source, the rows after an id in id order
+READ_CHUNK_QUERIES = {
+    SQLITE_BACKEND: GET_STUDENTS_PAGE_SQLITE_QUERY,
+    MYSQL_BACKEND: GET_STUDENTS_PAGE_MYSQL_QUERY,
+}
+COUNT_QUERIES = {
+    SQLITE_BACKEND: COUNT_STUDENTS_SQLITE_QUERY,
+    MYSQL_BACKEND: COUNT_STUDENTS_MYSQL_QUERY,
+}
+# Insert keeping the ids of the source rows
+INSERT_QUERIES = {
+    SQLITE_BACKEND: "INSERT INTO students (id, name, course, mobile) VALUES (?, ?, ?, ?)",
+    MYSQL_BACKEND: "INSERT INTO students (id, name, course, mobile) VALUES (%s, %s, %s, %s)",
+}
+# Rows of a chunk read back from the target, to verify them
+VERIFY_CHUNK_QUERIES = {
+    SQLITE_BACKEND: "SELECT id, name, course, mobile FROM students WHERE id > ? AND id <= ? ORDER BY id",
+    MYSQL_BACKEND: "SELECT id, name, course, mobile FROM students WHERE id > %s AND id <= %s ORDER BY id",
+}
+# Rows of a chunk committed after the last checkpoint was saved (the process stopped in between)
+DELETE_AFTER_QUERIES = {
+    SQLITE_BACKEND: "DELETE FROM students WHERE id > ?",
+    MYSQL_BACKEND: "DELETE FROM students WHERE id > %s",
+}
+
+
+class MigrationError(Exception):
+    """
+    Raised when a migration cannot start or resume, or when the copied rows do not match the source.
+    """
+
+
+def canonical_value(value):
+    """
+    Return the text a field is compared as: phone numbers as numbers, the other values as text.
+    """
+    if value is None:
+        return "\\N"
+    if type(value) is int:
+        return str(value)
+    value = str(value)
+    # A phone number read from MySQL (text) equals the number SQLite stores for it
+    if value.isascii() and value.isdigit():
+        return str(int(value))
+    return value
+
+
+def checksum(rows):
+    """
+    Return the SHA-256 checksum of student rows, equal for the same rows read from either backend.
+    """
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update("\x1f".join(canonical_value(value) for value in row).encode())
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+def checkpoint_path_for(source_backend, target_backend):
+    """
+    Return the default checkpoint file of a migration, e.g. assets/data/migrate-sqlite-to-mysql.json.
+    """
+    return MIGRATE_CHECKPOINT_DIR / f"migrate-{source_backend}-to-{target_backend}.json"
+
+
+def load_checkpoint(path):
+    """
+    Return the saved progress of a migration, or None if there is no checkpoint file.
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(path, checkpoint):
+    """
+    Save the progress of a migration, replacing the checkpoint file atomically.
+    """
+    checkpoint["updated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    temp_path = Path(f"{path}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(checkpoint, file, indent=2)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+def fetch(connection, query, params=(), one=False):
+    """
+    Run a query and return its rows (or its first row).
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchone() if one else cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def copy_chunk(target, target_backend, rows, after_id, batch_fts):
+    """
+    Insert a chunk of source rows into the target, verify them and commit them.
+
+    Args:
+        target: The connection to the target database.
+        target_backend (str): SQLITE_BACKEND or MYSQL_BACKEND.
+        rows (list): The (id, name, course, mobile) rows of the chunk, in id order.
+        after_id (int): The last id of the previous chunk (every id of the chunk is greater).
+        batch_fts (bool): Whether to fill the SQLite full-text index once for the chunk.
+
+    Returns:
+        str: The checksum of the chunk.
+
+    Raises:
+        MigrationError: If the rows read back from the target do not match the chunk (it is rolled back).
+    """
+    expected = checksum(rows)
+    last_id = rows[-1][0]
+    cursor = target.cursor()
+    try:
+        if batch_fts:
+            # Same deferred full-text indexing as the importer: the chunk is indexed with one statement
+            cursor.execute(DEFER_FTS_SQLITE_QUERY)
+            cursor.executemany(INSERT_QUERIES[target_backend], rows)
+            cursor.execute(INDEX_FTS_SQLITE_QUERY, (after_id,))
+            cursor.execute(RESUME_FTS_SQLITE_QUERY)
+        else:
+            cursor.executemany(INSERT_QUERIES[target_backend], rows)
+        cursor.execute(VERIFY_CHUNK_QUERIES[target_backend], (after_id, last_id))
+        copied = cursor.fetchall()
+        actual = checksum(copied)
+        if actual != expected or len(copied) != len(rows):
+            raise MigrationError(f"Chunk of ids {after_id + 1} to {last_id} does not match the source after "
+                                 f"being copied ({len(copied)} of {len(rows)} rows, checksum {actual} "
+                                 f"instead of {expected}), it was rolled back")
+        target.commit()
+    except Exception:
+        target.rollback()
+        raise
+    finally:
+        cursor.close()
+    return expected
+
+
+def migrate_students(source, source_backend, target, target_backend, checkpoint_path,
+                     chunk_size=MIGRATE_CHUNK_SIZE, progress=None):
+    """
+    Copy the students table from the source database to the target database, or resume the copy.
+
+    A migration starts on an empty target table, and resumes from its checkpoint file
+    when there is one. Rows the target got after the last saved checkpoint (a chunk
+    committed just before the process stopped) are deleted and copied again.
+
+    Args:
+        source: An open SQLite or MySQL connection to read the students from.
+        source_backend (str): SQLITE_BACKEND or MYSQL_BACKEND.
+        target: An open SQLite or MySQL connection to copy the students to.
+        target_backend (str): SQLITE_BACKEND or MYSQL_BACKEND.
+        checkpoint_path (str or Path): The file saving the progress of the migration.
+        chunk_size (int): The number of rows copied per transaction. Defaults to MIGRATE_CHUNK_SIZE.
+        progress (callable): Called with (rows copied, source rows) after each chunk.
+
+    Returns:
+        dict: The rows and chunks copied by this run, the total rows of the target and of the
+              source, the id the run resumed after, the running checksum of all the chunks,
+              the duration in seconds and the number of rows per second.
+
+    Raises:
+        MigrationError: If the migration cannot start or resume, or the copy does not match the source.
+    """
+    migrations.migrate(target, target_backend)
+    batch_fts = can_batch_fts(target, target_backend)
+
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint is not None and (checkpoint["source"], checkpoint["target"]) != (source_backend, target_backend):
+        raise MigrationError(f"The checkpoint {checkpoint_path} belongs to a migration from "
+                             f"{checkpoint['source']} to {checkpoint['target']}")
+    if checkpoint is None:
+        if fetch(target, COUNT_QUERIES[target_backend], one=True)[0]:
+            raise MigrationError("The target students table is not empty, a migration must start on an empty table")
+        checkpoint = {"source": source_backend, "target": target_backend, "last_id": 0,
+                      "rows": 0, "chunks": 0, "checksum": "", "completed": False}
+    else:
+        # Rows committed after the checkpoint was last saved are copied again
+        cursor = target.cursor()
+        try:
+            cursor.execute(DELETE_AFTER_QUERIES[target_backend], (checkpoint["last_id"],))
+            if cursor.rowcount:
+                logging.warning(f"Deleted {cursor.rowcount} target rows copied after the last checkpoint")
+            target.commit()
+        finally:
+            cursor.close()
+
+    resumed_after = checkpoint["last_id"]
+    total = fetch(source, COUNT_QUERIES[source_backend], one=True)[0]
+    start = time.perf_counter()
+    rows_copied = 0
+    chunks_copied = 0
+
+    while True:
+        rows = fetch(source, READ_CHUNK_QUERIES[source_backend], (checkpoint["last_id"], chunk_size))
+        if not rows:
+            break
+        chunk_checksum = copy_chunk(target, target_backend, rows, checkpoint["last_id"], batch_fts)
+
+        rows_copied += len(rows)
+        chunks_copied += 1
+        checkpoint["last_id"] = rows[-1][0]
+        checkpoint["rows"] += len(rows)
+        checkpoint["chunks"] += 1
+        # Chained over the chunks, the same whether the migration ran at once or was resumed
+        checkpoint["checksum"] = hashlib.sha256(f"{checkpoint['checksum']}{chunk_checksum}".encode()).hexdigest()
+        save_checkpoint(checkpoint_path, checkpoint)
+        if progress is not None:
+            # Rows inserted in the source while copying make the count grow
+            progress(checkpoint["rows"], max(total, checkpoint["rows"]))
+        if len(rows) < chunk_size:
+            break
+
+    seconds = time.perf_counter() - start
+    source_rows = fetch(source, COUNT_QUERIES[source_backend], one=True)[0]
+    target_rows = fetch(target, COUNT_QUERIES[target_backend], one=True)[0]
+    if source_rows != target_rows:
+        raise MigrationError(f"The target has {target_rows} students and the source {source_rows} "
+                             f"(was the source written to during the migration?), run the migration "
+                             f"again to copy the rows added after id {checkpoint['last_id']}")
+
+    checkpoint["completed"] = True
+    save_checkpoint(checkpoint_path, checkpoint)
+    logging.info(f"Migrated {rows_copied} student records from {source_backend} to {target_backend} "
+                 f"({target_rows} in total)")
+    return {
+        "rows": rows_copied,
+        "chunks": chunks_copied,
+        "target_rows": target_rows,
+        "source_rows": source_rows,
+        "resumed_after_id": resumed_after,
+        "checksum": checkpoint["checksum"],
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows_copied / seconds) if seconds else 0,
+    }
+
+
+def connect(backend, sqlite_file=DB_FILE):
+    """
+    Open a connection to the configured database of the given backend (used by the command line).
+    """
+    if backend == SQLITE_BACKEND:
+        connection = sqlite3.connect(sqlite_file, cached_statements=SQLITE_STATEMENT_CACHE_SIZE)
+        for name, value in SQLITE_PRAGMAS.items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        return connection
+
+    return migrations.connect(backend)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from", dest="source", choices=(SQLITE_BACKEND, MYSQL_BACKEND), required=True,
+                        help="the database to copy the students from")
+    parser.add_argument("--to", dest="target", choices=(SQLITE_BACKEND, MYSQL_BACKEND), required=True,
+                        help="the database to copy the students to (its students table must be empty)")
+    parser.add_argument("--sqlite-file", type=Path, default=DB_FILE,
+                        help=f"the SQLite database (default: {DB_FILE})")
+    parser.add_argument("--chunk-size", type=int, default=MIGRATE_CHUNK_SIZE,
+                        help=f"rows copied, verified and committed at a time (default: {MIGRATE_CHUNK_SIZE})")
+    parser.add_argument("--checkpoint", type=Path, default=None,
+                        help="the file saving the progress (default: assets/data/migrate-<from>-to-<to>.json)")
+    args = parser.parse_args()
+    if args.source == args.target:
+        parser.error("--from and --to must be different backends")
+
+    checkpoint_path = args.checkpoint or checkpoint_path_for(args.source, args.target)
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint is not None and checkpoint.get("completed"):
+        print(f"The migration saved in {checkpoint_path} is complete ({checkpoint['rows']} rows), "
+              f"delete the file to migrate again")
+        return
+    if checkpoint is not None:
+        print(f"Resuming after id {checkpoint['last_id']} ({checkpoint['rows']} rows already copied)")
+
+    source = connect(args.source, args.sqlite_file)
+    try:
+        target = connect(args.target, args.sqlite_file)
+        try:
+            result = migrate_students(
+                source, args.source, target, args.target, checkpoint_path, args.chunk_size,
+                progress=lambda done, total: print(f"\r{done} of {total} rows copied", end="", flush=True))
+        finally:
+            target.close()
+    except MigrationError as e:
+        raise SystemExit(f"\nMigration failed: {e}")
+    finally:
+        source.close()
+
+    print(f"\n{result['rows']} rows copied in {result['chunks']} chunks in {result['seconds']} s "
+          f"({result['rows_per_second']} rows/s), {result['target_rows']} rows in the target, "
+          f"row counts and checksums verified")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,470 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque, OrderedDict
+
+
+class PoolTimeoutError(Exception):
+    """
+    Raised when no connection could be checked out of a pool within its timeout.
+    """
+
+
+class StatementCache:
+    """
+    The prepared statements of a database connection, kept for reuse by SQL text.
+
+    Each statement is prepared once on the server, through its own prepared cursor, and
+    then only executed with new parameters: the server no longer parses and plans the
+    query on every call. The least recently used statements are closed (deallocated on
+    the server) beyond `size`.
+
+    Attributes:
+    - create_cursor (callable): Returns a new prepared cursor on the connection.
+    - size (int): The maximum number of prepared statements kept.
+    - statements (OrderedDict): The (SQL text, prepared cursor) pairs by SQL text, the most recently used last.
+    - hits (int): The number of executions reusing a prepared statement.
+    - misses (int): The number of statements prepared.
+    """
+
+    def __init__(self, create_cursor, size):
+        """
+        Initialize the StatementCache object.
+
+        Args:
+        - create_cursor (callable): Returns a new prepared cursor on the connection.
+        - size (int): The maximum number of prepared statements kept.
+        """
+        self.create_cursor = create_cursor
+        self.size = size
+        self.statements = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def execute(self, sql, params=()):
+        """
+        Execute a query with its prepared statement, preparing it on first use.
+
+        The returned cursor stays open for the next executions of the query: its result
+        must be read entirely, and the cursor must not be closed.
+
+        Args:
+        - sql (str): The SQL text of the query.
+        - params (tuple): The query parameters.
+
+        Returns:
+        - The prepared cursor the query was executed on.
+        """
+        entry = self.statements.get(sql)
+        if entry is None:
+            self.misses += 1
+            entry = self.statements[sql] = (sql, self.create_cursor())
+            while len(self.statements) > self.size:
+                _, (_, cursor) = self.statements.popitem(last=False)
+                self.close_cursor(cursor)
+        else:
+            self.hits += 1
+            self.statements.move_to_end(sql)
+
+        # Prepared cursors only reuse their statement when given the very same SQL string object
+        prepared_sql, cursor = entry
+        try:
+            cursor.execute(prepared_sql, params)
+        except Exception:
+            # The statement may be left in an unknown state, prepare it again next time
+            del self.statements[sql]
+            self.close_cursor(cursor)
+            raise
+        return cursor
+
+    def close_cursor(self, cursor):
+        """
+        Close a prepared cursor, which deallocates its statement on the server.
+        """
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+
+class PooledConnection:
+    """
+    A connection checked out of a ConnectionPool.
+
+    The object forwards every attribute to the underlying database connection, so it
+    can be used exactly like it (cursor(), commit(), rollback(), ...). Leaving its
+    `with` block, or calling close(), gives the connection back to the pool instead
+    of closing it.
+
+    Attributes:
+    - pool (ConnectionPool): The pool the connection was checked out of.
+    - connection: The underlying database connection.
+    """
+
+    def __init__(self, pool, connection):
+        """
+        Initialize the PooledConnection object.
+
+        Args:
+        - pool (ConnectionPool): The pool the connection was checked out of.
+        - connection: The underlying database connection.
+        """
+        self.pool = pool
+        self.connection = connection
+
+    def __getattr__(self, name):
+        # Delegate everything else to the underlying connection
+        return getattr(self.connection, name)
+
+    def __enter__(self):
+        return self
+
+    def execute_prepared(self, sql, params=()):
+        """
+        Execute a query with the connection's prepared statement (see StatementCache.execute).
+
+        Returns:
+        - The prepared cursor the query was executed on, or None if the pool does not prepare statements.
+        """
+        statements = self.pool.statement_cache(self.connection)
+        if statements is None:
+            return None
+        return statements.execute(sql, params)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        # Never swallow exceptions raised inside the `with` block
+        return False
+
+    def close(self):
+        """
+        Give the connection back to the pool (only the first call has an effect).
+        """
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            self.pool.release(connection)
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of reusable database connections.
+
+    Connections are created lazily up to `size`, checked for health on checkout when
+    they have been idle for a while, and closed once they stay idle for longer than
+    `max_idle_time`. Hit/miss and wait-time counters are kept to help sizing the pool.
+
+    Attributes:
+    - size (int): The maximum number of open connections.
+    - timeout (float): The maximum number of seconds to wait for a free connection.
+    - max_idle_time (float): Idle connections older than this (seconds) are closed.
+    - health_check_interval (float): Connections idle for longer than this (seconds)
+      are health checked before being handed out.
+    - statement_cache_size (int): The number of prepared statements kept per connection, 0 for none.
+    """
+
+    def __init__(self, connect, size=5, timeout=10.0, max_idle_time=300.0,
+                 health_check_interval=5.0, is_healthy=None, prepared_cursor=None,
+                 statement_cache_size=0):
+        """
+        Initialize the ConnectionPool object.
+
+        Args:
+        - connect (callable): A function returning a new database connection.
+        - size (int): The maximum number of open connections. Defaults to 5.
+        - timeout (float): The maximum number of seconds to wait for a free connection. Defaults to 10.
+        - max_idle_time (float): Idle connections older than this (seconds) are closed. Defaults to 300.
+        - health_check_interval (float): Idle time (seconds) after which a connection is health
+          checked on checkout. Defaults to 5.
+        - is_healthy (callable): A function taking a connection and returning whether it is usable.
+          Defaults to considering every connection healthy.
+        - prepared_cursor (callable): A function taking a connection and returning a new prepared
+          cursor on it. Defaults to None (statements are not prepared).
+        - statement_cache_size (int): The number of prepared statements kept per connection,
+          for the lifetime of the connection. Defaults to 0 (statements are not prepared).
+        """
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.max_idle_time = max_idle_time
+        self.health_check_interval = health_check_interval
+        self.is_healthy = is_healthy or (lambda connection: True)
+        self.prepared_cursor = prepared_cursor
+        self.statement_cache_size = statement_cache_size if prepared_cursor is not None else 0
+        # Prepared statements of the open connections, by id() of the connection
+        self.statement_caches = {}
+
+        # Idle connections as (connection, last_used) pairs, the most recently used at the right end
+        self.idle = deque()
+        # Number of open connections, idle or checked out
+        self.open_count = 0
+        self.condition = threading.Condition()
+
+        # Counters used to size the pool
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.evictions = 0
+        self.health_check_failures = 0
+
+    def acquire(self):
+        """
+        Check a connection out of the pool, creating one if needed and allowed.
+
+        Returns:
+        - PooledConnection: The checked out connection.
+
+        Raises:
+        - PoolTimeoutError: If no connection became available within the timeout.
+        """
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        waited = False
+
+        while True:
+            candidate = None
+            with self.condition:
+                while True:
+                    self.evict_idle()
+                    if self.idle:
+                        # Reuse the most recently used connection, it is the least likely to be stale
+                        candidate = self.idle.pop()
+                        break
+                    if self.open_count < self.size:
+                        # Reserve a slot and open a new connection outside the lock
+                        self.open_count += 1
+                        break
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        self.record_wait(start, waited)
+                        raise PoolTimeoutError(
+                            f"No connection available after {self.timeout} seconds (pool size {self.size})")
+                    waited = True
+                    self.condition.wait(remaining)
+
+            if candidate is None:
+                try:
+                    connection = self.connect()
+                except Exception:
+                    # Give the reserved slot back
+                    with self.condition:
+                        self.open_count -= 1
+                        self.condition.notify()
+                    raise
+                with self.condition:
+                    self.misses += 1
+                    self.record_wait(start, waited)
+                return PooledConnection(self, connection)
+
+            connection, last_used = candidate
+            if (time.monotonic() - last_used < self.health_check_interval or
+                    self.check_health(connection)):
+                with self.condition:
+                    self.hits += 1
+                    self.record_wait(start, waited)
+                return PooledConnection(self, connection)
+
+            # The connection is broken, drop it and try again
+            with self.condition:
+                self.health_check_failures += 1
+            self.discard(connection)
+
+    def release(self, connection):
+        """
+        Give a connection back to the pool.
+
+        Any transaction left open is rolled back so the next user starts from a clean
+        state; connections failing to do so are discarded.
+
+        Args:
+        - connection: The underlying database connection to release.
+        """
+        try:
+            connection.rollback()
+        except Exception as e:
+            logging.warning(f"Discarding pooled connection that failed to roll back: {e}")
+            self.discard(connection)
+            return
+
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    def discard(self, connection):
+        """
+        Close a connection and free its slot in the pool.
+        """
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self.condition:
+            self.statement_caches.pop(id(connection), None)
+            self.open_count -= 1
+            self.condition.notify()
+
+    def check_health(self, connection):
+        """
+        Return whether a connection is still usable.
+        """
+        try:
+            return bool(self.is_healthy(connection))
+        except Exception:
+            return False
+
+    def evict_idle(self):
+        """
+        Close the connections that stayed idle for longer than max_idle_time.
+
+        Must be called with the pool's condition held.
+        """
+        now = time.monotonic()
+        # The least recently used connections are at the left end
+        while self.idle and now - self.idle[0][1] > self.max_idle_time:
+            connection, _ = self.idle.popleft()
+            self.statement_caches.pop(id(connection), None)
+            self.open_count -= 1
+            self.evictions += 1
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def statement_cache(self, connection):
+        """
+        Return the prepared statements of an open connection, or None if the pool does not prepare statements.
+
+        The statements stay prepared while the connection goes back and forth between the
+        pool and its users, until the connection is closed.
+        """
+        if not self.statement_cache_size:
+            return None
+        with self.condition:
+            statements = self.statement_caches.get(id(connection))
+            if statements is None:
+                statements = self.statement_caches[id(connection)] = StatementCache(
+                    lambda: self.prepared_cursor(connection), self.statement_cache_size)
+            return statements
+
+    def record_wait(self, start, waited):
+        """
+        Update the wait counters for a checkout started at `start`.
+
+        Must be called with the pool's condition held.
+        """
+        if waited:
+            wait_time = time.perf_counter() - start
+            self.waits += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+
+    def close_all(self):
+        """
+        Close every idle connection of the pool.
+        """
+        with self.condition:
+            while self.idle:
+                connection, _ = self.idle.pop()
+                self.statement_caches.pop(id(connection), None)
+                self.open_count -= 1
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+
+    def stats(self):
+        """
+        Return the pool counters.
+
+        Returns:
+        - dict: Size, open/idle/in use connections, hits, misses, waits, wait times,
+          evictions, health check failures, and prepared statements with their hits and misses.
+        """
+        with self.condition:
+            return {
+                "size": self.size,
+                "open": self.open_count,
+                "idle": len(self.idle),
+                "in_use": self.open_count - len(self.idle),
+                "hits": self.hits,
+                "misses": self.misses,
+                "waits": self.waits,
+                "wait_time_total": round(self.wait_time_total, 6),
+                "wait_time_max": round(self.wait_time_max, 6),
+                "evictions": self.evictions,
+                "health_check_failures": self.health_check_failures,
+                "prepared_statements": sum(len(cache.statements) for cache in self.statement_caches.values()),
+                "statement_hits": sum(cache.hits for cache in self.statement_caches.values()),
+                "statement_misses": sum(cache.misses for cache in self.statement_caches.values()),
+            }
+
+
+class SQLiteConnectionManager:
+    """
+    A manager of long-lived, tuned SQLite connections.
+
+    Opening a SQLite connection parses the schema and starts with a cold page cache,
+    so instead of connecting for every operation the manager keeps one connection per
+    thread open for the lifetime of the process. Each connection is tuned with WAL
+    journaling (readers never block on the writer), relaxed fsync, a larger page cache,
+    memory-mapped I/O and in-memory temporary storage, and caches its prepared statements.
+
+    Attributes:
+    - database_file (str): The path to the SQLite database file.
+    - pragmas (dict): The PRAGMA statements applied to every new connection.
+    - cached_statements (int): The number of prepared statements cached per connection.
+    - uri (bool): Whether database_file is a "file:" URI (e.g. to open the database read-only).
+    """
+
+    def __init__(self, database_file, pragmas, cached_statements=128, uri=False):
+        """
+        Initialize the SQLiteConnectionManager object.
+
+        Args:
+        - database_file (str): The path to the SQLite database file, or a "file:" URI.
+        - pragmas (dict): The PRAGMA names and values applied to every new connection.
+        - cached_statements (int): The number of prepared statements cached per connection. Defaults to 128.
+        - uri (bool): Whether database_file is a URI. Defaults to False.
+        """
+        self.database_file = database_file
+        self.pragmas = pragmas
+        self.cached_statements = cached_statements
+        self.uri = uri
+
+        # Each thread gets its own connection, sqlite3 connections must not be shared concurrently
+        self.local = threading.local()
+        # Every connection opened so far, so they can all be closed on exit
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def connection(self):
+        """
+        Return the calling thread's connection, opening and tuning it on first use.
+
+        Returns:
+        - connection (sqlite3.Connection): The long-lived connection of the calling thread.
+        """
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            # The connection never leaves its thread, check_same_thread is only disabled so close_all() can run at exit
+            connection = sqlite3.connect(self.database_file,
+                                         cached_statements=self.cached_statements,
+                                         uri=self.uri,
+                                         check_same_thread=False)
+            for name, value in self.pragmas.items():
+                connection.execute(f"PRAGMA {name} = {value}")
+            self.local.connection = connection
+            with self.lock:
+                self.connections.append(connection)
+        return connection
+
+    def close_all(self):
+        """
+        Close every connection opened by the manager.
+        """
+        with self.lock:
+            while self.connections:
+                self.connections.pop().close()
+        self.local = threading.local()
@@ -0,0 +1,239 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+import logging
+import threading
+from constants import DB_WORKER_THREADS
+
+
+class TaskSignals(QObject):
+    """
+    Signals used by a DatabaseTask to hand its outcome back to the GUI thread.
+    """
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    # (done, total) counts, the values are Python ints of any size
+    progressed = pyqtSignal(object, object)
+    # A partial result (e.g. a chunk of rows), delivered before the task ends
+    chunked = pyqtSignal(object)
+
+
+class DatabaseTask(QRunnable):
+    """
+    A database call run on a worker thread of the DatabaseWorker's thread pool.
+
+    Attributes:
+    - function (callable): The function doing the database work (it must not touch any widget).
+    - args (tuple): The positional arguments passed to the function.
+    - signals (TaskSignals): The signals emitted with the result or the raised exception.
+    - is_current (callable): Returns False once the task has been superseded or cancelled.
+    - kwargs (dict): The keyword arguments passed to the function.
+    """
+
+    def __init__(self, function, args, signals, is_current, kwargs=None):
+        """
+        Initialize the DatabaseTask object.
+        """
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.signals = signals
+        self.is_current = is_current
+        self.kwargs = kwargs or {}
+
+    def run(self):
+        """
+        Run the database call unless the task was superseded while waiting in the queue.
+        """
+        if not self.is_current():
+            # Still report back (the result is dropped) so the worker knows the task is over
+            self.signals.succeeded.emit(None)
+            return
+
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.succeeded.emit(result)
+
+
+class DatabaseWorker(QObject):
+    """
+    Runs database calls off the GUI thread and delivers their results through signals.
+
+    Each call is submitted with callbacks that are invoked on the GUI thread once the
+    call succeeded or failed. Calls submitted with the same key supersede each other:
+    a superseded call is skipped if it has not started yet, and its result is dropped
+    otherwise, so that only the outcome of the latest request is ever delivered.
+
+    Signals:
+    - status_changed (str): A message describing the running work, or an empty string once idle.
+    """
+    status_changed = pyqtSignal(str)
+
+    def __init__(self, max_threads=DB_WORKER_THREADS, parent=None):
+        """
+        Initialize the DatabaseWorker object.
+
+        Args:
+        - max_threads (int): The maximum number of database calls run concurrently. Defaults to DB_WORKER_THREADS.
+        - parent (QObject): The parent object of the worker.
+        """
+        super().__init__(parent)
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(max_threads)
+
+        # Latest generation number submitted for each key, bumped to supersede older calls
+        self.generations = {}
+        self.generations_lock = threading.Lock()
+        # Status messages of the calls submitted and not finished yet
+        self.running = {}
+        self.next_task_id = 0
+
+    def submit(self, function, *args, on_success=None, on_error=None, on_progress=None,
+               on_chunk=None, key=None, message=""):
+        """
+        Run function(*args) on a worker thread.
+
+        Args:
+            function (callable): The function doing the database work. It runs on a worker
+                thread, so it must not touch any widget.
+            *args: The positional arguments passed to the function.
+            on_success (callable): Called on the GUI thread with the function's return value.
+            on_error (callable): Called on the GUI thread with the exception raised by the function.
+            on_progress (callable): Called on the GUI thread with (done, total) counts. When given,
+                the function is passed a `progress` keyword argument, a callable taking
+                (done, total) that it may call from the worker thread as the work goes on.
+            on_chunk (callable): Called on the GUI thread with each partial result. When given,
+                the function is passed a `chunk` keyword argument, a callable taking a partial
+                result (e.g. a list of rows) that it may call from the worker thread. It returns
+                False once the call has been superseded, so the function can stop early.
+            key (str): Calls submitted with the same key supersede each other.
+            message (str): The status message shown while the call is running.
+        """
+        generation = None
+        if key is not None:
+            with self.generations_lock:
+                generation = self.generations.get(key, 0) + 1
+                self.generations[key] = generation
+
+        def is_current():
+            if key is None:
+                return True
+            with self.generations_lock:
+                return self.generations.get(key) == generation
+
+        task_id = self.next_task_id
+        self.next_task_id += 1
+
+        def succeeded(result):
+            self.task_done(task_id)
+            if is_current() and on_success is not None:
+                on_success(result)
+
+        def failed(error):
+            self.task_done(task_id)
+            if not is_current():
+                return
+            if on_error is not None:
+                on_error(error)
+            else:
+                logging.error(f"Unhandled error in background database call: {error}")
+
+        # The signals object is created on the GUI thread, so its slots run on the GUI thread
+        signals = TaskSignals(self)
+        signals.succeeded.connect(succeeded)
+        signals.failed.connect(failed)
+
+        kwargs = {}
+        if on_progress is not None:
+            signals.progressed.connect(
+                lambda done, total: is_current() and on_progress(done, total))
+            # Emitting the signal from the worker thread queues the call on the GUI thread
+            kwargs["progress"] = signals.progressed.emit
+        if on_chunk is not None:
+            signals.chunked.connect(lambda result: is_current() and on_chunk(result))
+
+            def chunk(result):
+                signals.chunked.emit(result)
+                return is_current()
+
+            kwargs["chunk"] = chunk
+
+        self.running[task_id] = (message, signals)
+        self.emit_status()
+        self.thread_pool.start(DatabaseTask(function, args, signals, is_current, kwargs))
+
+    def watch(self, future, on_success=None, on_error=None):
+        """
+        Deliver the outcome of a concurrent.futures.Future, resolved on any thread, on the GUI thread.
+
+        Used for the acknowledgements of a WriteBehindQueue, which are resolved by its
+        background thread. Unlike submitted calls, watched futures do not show in the status.
+
+        Args:
+            future (Future): The future to watch.
+            on_success (callable): Called on the GUI thread with the future's result.
+            on_error (callable): Called on the GUI thread with the future's exception.
+        """
+        # The signals object is created on the GUI thread, so its slots run on the GUI thread
+        signals = TaskSignals(self)
+
+        def succeeded(result):
+            signals.deleteLater()
+            if on_success is not None:
+                on_success(result)
+
+        def failed(error):
+            signals.deleteLater()
+            if on_error is not None:
+                on_error(error)
+            else:
+                logging.error(f"Unhandled error in background database write: {error}")
+
+        signals.succeeded.connect(succeeded)
+        signals.failed.connect(failed)
+
+        def done(future):
+            error = future.exception()
+            if error is not None:
+                signals.failed.emit(error)
+            else:
+                signals.succeeded.emit(future.result())
+
+        future.add_done_callback(done)
+
+    def cancel(self, key):
+        """
+        Supersede every call submitted with the given key, dropping their results.
+        """
+        with self.generations_lock:
+            self.generations[key] = self.generations.get(key, 0) + 1
+
+    def task_done(self, task_id):
+        """
+        Forget a finished call and update the status message.
+        """
+        message, signals = self.running.pop(task_id, ("", None))
+        if signals is not None:
+            signals.deleteLater()
+        self.emit_status()
+
+    def emit_status(self):
+        """
+        Emit the status message of the most recently submitted running call.
+        """
+        messages = [message for message, _ in self.running.values() if message]
+        if self.running:
+            self.status_changed.emit(messages[-1] if messages else "Working...")
+        else:
+            self.status_changed.emit("")
+
+    def shutdown(self):
+        """
+        Supersede every pending call and wait for the running ones to finish.
+        """
+        with self.generations_lock:
+            for key in self.generations:
+                self.generations[key] += 1
+        self.thread_pool.clear()
+        self.thread_pool.waitForDone()
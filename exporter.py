@@ -0,0 +1,299 @@
+"""
+Streaming export of the students table to CSV, JSONL, Parquet or SQLite files.
+
+Rows are read from the database in chunks of EXPORT_FETCH_SIZE with fetchmany() (on
+MySQL through an unbuffered cursor, so the server streams the result set instead of
+the client loading it whole) and written as they come, so the export runs in constant
+memory whatever the table size. Parquet files are written one row group per chunk and
+need the optional `pyarrow` package. SQLite files (.db, .sqlite) are read-only snapshots
+of the database, with the same ids, schema and search index (the mobile numbers are
+stored as text, keeping their leading zeros), meant to be opened with the sqlite-snapshot
+backend (see backends.py) for local reporting while the application runs on MySQL. They
+are built next to the target and moved over it once complete, so a snapshot can be
+refreshed in place.
+
+The format is picked from the file extension. The export is available from the File
+menu of the application, and from the command line:
+
+    python exporter.py students.csv --backend sqlite
+    python exporter.py students.parquet --backend mysql
+    python exporter.py assets/data/SQLite/snapshot.db --backend mysql
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+from constants import (SQLITE_BACKEND, MYSQL_BACKEND, EXPORT_FETCH_SIZE,
+                       COUNT_STUDENTS_SQLITE_QUERY, COUNT_STUDENTS_MYSQL_QUERY,
+                       EXPORT_STUDENTS_SQLITE_QUERY, EXPORT_STUDENTS_MYSQL_QUERY)
+import migrations
+
+
+EXPORT_FIELDS = ("id", "name", "course", "mobile")
+EXPORT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet",
+                  ".db": "sqlite", ".sqlite": "sqlite"}
+EXPORT_QUERIES = {
+    SQLITE_BACKEND: (COUNT_STUDENTS_SQLITE_QUERY, EXPORT_STUDENTS_SQLITE_QUERY),
+    MYSQL_BACKEND: (COUNT_STUDENTS_MYSQL_QUERY, EXPORT_STUDENTS_MYSQL_QUERY),
+}
+
+
+class ExportFormatError(Exception):
+    """
+    Raised when a file cannot be written: unknown extension, or Parquet without pyarrow.
+    """
+
+
+def file_format(path):
+    """
+    Return the format ("csv", "jsonl", "parquet" or "sqlite") of a file from its extension.
+    """
+    try:
+        return EXPORT_FORMATS[Path(path).suffix.lower()]
+    except KeyError:
+        raise ExportFormatError(
+            f"Unsupported file type: {path} (expected {', '.join(EXPORT_FORMATS)})") from None
+
+
+class FileWriter:
+    """
+    Base class of the writers: abort() closes the writer and removes the partially written file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def abort(self):
+        self.close()
+        Path(self.path).unlink(missing_ok=True)
+
+
+class CSVWriter(FileWriter):
+    """
+    Writes chunks of student rows to a CSV file with a header row.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(EXPORT_FIELDS)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class JSONLWriter(FileWriter):
+    """
+    Writes chunks of student rows to a JSONL file, one object per row.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, rows):
+        self.file.writelines(json.dumps(dict(zip(EXPORT_FIELDS, row))) + "\n" for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter(FileWriter):
+    """
+    Writes chunks of student rows to a Parquet file, one row group per chunk.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ExportFormatError("Exporting to Parquet requires the pyarrow package "
+                                    "(pip install pyarrow)") from None
+
+        self.pyarrow = pyarrow
+        # The mobile column is an INTEGER in SQLite and a VARCHAR in MySQL, it is exported as text
+        self.schema = pyarrow.schema([("id", pyarrow.int64()), ("name", pyarrow.string()),
+                                      ("course", pyarrow.string()), ("mobile", pyarrow.string())])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        ids, names, courses, mobiles = zip(*rows)
+        mobiles = [None if mobile is None else str(mobile) for mobile in mobiles]
+        self.writer.write_table(self.pyarrow.Table.from_arrays(
+            [self.pyarrow.array(column, type=field.type)
+             for column, field in zip((ids, names, courses, mobiles), self.schema)],
+            schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class SQLiteWriter(FileWriter):
+    """
+    Writes chunks of student rows to a new SQLite database, a snapshot keeping the ids of the rows.
+
+    The database is built in a temporary file next to the target, with the current schema
+    (see migrations.py), and replaces the target atomically once complete: an application
+    reading the previous snapshot keeps reading it until it reopens the file.
+
+    Unlike the SQLite application database, whose INTEGER column drops the leading zeros,
+    the snapshot stores the mobile numbers as 8-digit text, so a copy of a MySQL database
+    keeps them as they are.
+    """
+
+    def __init__(self, path):
+        # Imported here, the importer is only needed to write snapshots
+        from importer import DEFER_FTS_SQLITE_QUERY
+
+        super().__init__(path)
+        self.temp_path = Path(f"{path}.tmp")
+        self.temp_path.unlink(missing_ok=True)
+        self.connection = sqlite3.connect(self.temp_path)
+        # No journal: a failed build is thrown away anyway
+        self.connection.execute("PRAGMA journal_mode = OFF")
+        self.connection.execute("PRAGMA synchronous = OFF")
+        # Created before the migrations, the first one then leaves the table with its TEXT mobile column
+        self.connection.execute(SNAPSHOT_STUDENTS_TABLE_SQLITE_QUERY)
+        migrations.migrate(self.connection, SQLITE_BACKEND)
+        # Index the rows for the full-text search once at the end, instead of row by row
+        self.connection.execute(DEFER_FTS_SQLITE_QUERY)
+
+    def write(self, rows):
+        # Mobile numbers read from a SQLite database are ints, padded back to their 8 digits
+        self.connection.executemany(SNAPSHOT_INSERT_SQLITE_QUERY, (
+            (student_id, name, course, str(mobile).zfill(8) if isinstance(mobile, int) else mobile)
+            for student_id, name, course, mobile in rows))
+
+    def close(self):
+        from importer import RESUME_FTS_SQLITE_QUERY
+
+        self.connection.execute(REBUILD_FTS_SQLITE_QUERY)
+        self.connection.execute(RESUME_FTS_SQLITE_QUERY)
+        self.connection.commit()
+        # Statistics for the query planner, the snapshot is never modified afterwards
+        self.connection.execute("ANALYZE")
+        # A rollback journal (not WAL), so read-only connections need no -wal/-shm files
+        self.connection.execute("PRAGMA journal_mode = DELETE")
+        self.connection.close()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        # Keep the previous snapshot, only drop the one being built
+        self.connection.close()
+        self.temp_path.unlink(missing_ok=True)
+
+
+# Students table of the snapshots, the one of migration 1 with mobile numbers stored as text,
+# insert keeping the ids of the exported rows, and full-text index rebuild of the whole table
+SNAPSHOT_STUDENTS_TABLE_SQLITE_QUERY = """CREATE TABLE students(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    course TEXT,
+    mobile TEXT
+)"""
+SNAPSHOT_INSERT_SQLITE_QUERY = "INSERT INTO students (id, name, course, mobile) VALUES (?, ?, ?, ?)"
+REBUILD_FTS_SQLITE_QUERY = "INSERT INTO students_fts (students_fts) VALUES ('rebuild')"
+
+WRITERS = {"csv": CSVWriter, "jsonl": JSONLWriter, "parquet": ParquetWriter, "sqlite": SQLiteWriter}
+
+
+def export_students(connection, backend, path, fetch_size=EXPORT_FETCH_SIZE, progress=None):
+    """
+    Export the students table, ordered by id, to a CSV, JSONL, Parquet or SQLite file.
+
+    If the export fails, the partially written file is removed.
+
+    Args:
+        connection: An open SQLite or MySQL connection.
+        backend (str): SQLITE_BACKEND or MYSQL_BACKEND.
+        path (str or Path): The file to write.
+        fetch_size (int): The number of rows fetched and written at a time. Defaults to EXPORT_FETCH_SIZE.
+        progress (callable): Called with (rows written, total rows) after each chunk.
+
+    Returns:
+        dict: The number of rows exported, the duration in seconds and the number of rows per second.
+
+    Raises:
+        ExportFormatError: If the file type is not supported, or pyarrow is missing for Parquet.
+    """
+    writer_class = WRITERS[file_format(path)]
+    count_query, export_query = EXPORT_QUERIES[backend]
+
+    start = time.perf_counter()
+
+    # Count the rows first, for the progress of the export
+    cursor = connection.cursor()
+    try:
+        cursor.execute(count_query)
+        total = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+    writer = writer_class(path)
+    exported = 0
+    cursor = None
+    try:
+        # An unbuffered MySQL cursor streams the rows from the server as they are fetched
+        cursor = connection.cursor(buffered=False) if backend == MYSQL_BACKEND else connection.cursor()
+        cursor.execute(export_query)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            writer.write(rows)
+            exported += len(rows)
+            if progress is not None:
+                # Rows inserted while exporting make the count grow
+                progress(exported, max(total, exported))
+    except BaseException:
+        writer.abort()
+        raise
+    else:
+        writer.close()
+    finally:
+        if cursor is not None:
+            cursor.close()
+
+    seconds = time.perf_counter() - start
+    logging.info(f"Exported {exported} student records to {path}")
+    return {
+        "rows": exported,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(exported / seconds) if seconds else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help="the CSV, JSONL, Parquet or SQLite (snapshot) file to write")
+    parser.add_argument("--backend", choices=(SQLITE_BACKEND, MYSQL_BACKEND), required=True,
+                        help="the database to export from")
+    parser.add_argument("--fetch-size", type=int, default=EXPORT_FETCH_SIZE,
+                        help=f"rows fetched and written at a time (default: {EXPORT_FETCH_SIZE})")
+    args = parser.parse_args()
+
+    connection = migrations.connect(args.backend)
+    try:
+        result = export_students(
+            connection, args.backend, args.file, args.fetch_size,
+            progress=lambda done, total: print(f"\r{done} of {total} rows exported", end="", flush=True))
+    finally:
+        connection.close()
+
+    print(f"\n{result['rows']} rows exported to {args.file} in {result['seconds']} s "
+          f"({result['rows_per_second']} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""
+Bulk import of student records from CSV or JSONL files.
+
+The file is streamed row by row, so its size does not matter. Each row is validated
+with the same rules as the insert dialog (see validation.py), valid rows are inserted
+in batches with executemany(), one transaction per batch, and rejected rows are written
+to a separate file together with the reason they were rejected.
+
+CSV files need a header with the columns `name`, `course` and `mobile`; JSONL files
+hold one object with these keys per line. The import is available from the File menu
+of the application, and from the command line:
+
+    python importer.py students.csv --backend sqlite
+    python importer.py students.jsonl --backend mysql --batch-size 10000
+"""
+import argparse
+import csv
+import json
+import logging
+import time
+from pathlib import Path
+from constants import (SQLITE_BACKEND, MYSQL_BACKEND, IMPORT_BATCH_SIZE,
+                       INSERT_STUDENT_SQLITE_QUERY, INSERT_STUDENT_MYSQL_QUERY)
+from validation import validate_student
+import migrations
+
+
+IMPORT_FIELDS = ("name", "course", "mobile")
+IMPORT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+INSERT_QUERIES = {
+    SQLITE_BACKEND: INSERT_STUDENT_SQLITE_QUERY,
+    MYSQL_BACKEND: INSERT_STUDENT_MYSQL_QUERY,
+}
+
+# On SQLite, the full-text index is filled once per batch instead of by the per-row trigger
+# (see schema migration 4): a row in students_fts_deferred, only visible to the importing
+# transaction, disables the trigger until the batch is indexed
+FTS_DEFERRED_VERSION = 4
+DEFER_FTS_SQLITE_QUERY = "INSERT INTO students_fts_deferred DEFAULT VALUES"
+RESUME_FTS_SQLITE_QUERY = "DELETE FROM students_fts_deferred"
+GET_MAX_ID_SQLITE_QUERY = "SELECT COALESCE(MAX(id), 0) FROM students"
+INDEX_FTS_SQLITE_QUERY = "INSERT INTO students_fts (rowid, name, mobile) SELECT id, name, mobile FROM students WHERE id > ?"
+
+
+class ImportFormatError(Exception):
+    """
+    Raised when a file cannot be imported: unknown extension or missing CSV columns.
+    """
+
+
+def file_format(path):
+    """
+    Return the format ("csv" or "jsonl") of a file from its extension.
+    """
+    try:
+        return IMPORT_FORMATS[Path(path).suffix.lower()]
+    except KeyError:
+        raise ImportFormatError(
+            f"Unsupported file type: {path} (expected {', '.join(IMPORT_FORMATS)})") from None
+
+
+def rejects_path_for(path):
+    """
+    Return the default path of the rejects file of an import: students.csv -> students.rejects.csv.
+    """
+    path = Path(path)
+    return path.with_name(f"{path.stem}.rejects{path.suffix}")
+
+
+def read_csv(file):
+    """
+    Yield (line_number, values, error) tuples from a CSV file with a header row.
+
+    values are the (name, course, mobile) columns of the row.
+    """
+    reader = csv.reader(file)
+    header = next(reader, [])
+    missing = [field for field in IMPORT_FIELDS if field not in header]
+    if missing:
+        raise ImportFormatError(f"Missing CSV columns: {', '.join(missing)}")
+
+    positions = [header.index(field) for field in IMPORT_FIELDS]
+    width = max(positions) + 1
+    for row in reader:
+        if len(row) < width:
+            if row:
+                yield reader.line_num, tuple(row[i] if i < len(row) else "" for i in positions), "Missing columns"
+            continue
+        yield reader.line_num, (row[positions[0]], row[positions[1]], row[positions[2]]), None
+
+
+def read_jsonl(file):
+    """
+    Yield (line_number, values, error) tuples from a JSONL file.
+
+    values are the (name, course, mobile) keys of the object, or the raw line for lines
+    that are not a JSON object (these come with an error).
+    """
+    for line_number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if isinstance(record, dict):
+            yield line_number, tuple(record.get(field) for field in IMPORT_FIELDS), None
+        else:
+            yield line_number, line.rstrip("\n"), "Not a JSON object"
+
+
+class RejectsFile:
+    """
+    The file receiving the rejected rows of an import, in the format of the imported file.
+
+    Each rejected row is written with its line number in the imported file and the reason
+    it was rejected. The file is only created once a first row is rejected.
+
+    Attributes:
+    - path (Path): The path of the rejects file.
+    - format (str): "csv" or "jsonl".
+    - count (int): The number of rows written so far.
+    """
+
+    def __init__(self, path, format):
+        """
+        Initialize the RejectsFile object.
+
+        Args:
+        - path (str or Path): The path of the rejects file.
+        - format (str): "csv" or "jsonl".
+        """
+        self.path = Path(path)
+        self.format = format
+        self.count = 0
+        self.file = None
+        self.writer = None
+
+    def write(self, line_number, values, error):
+        """
+        Write a rejected row with its line number and the reason it was rejected.
+
+        Args:
+        - line_number (int): The line of the row in the imported file.
+        - values (tuple or str): The (name, course, mobile) values of the row, or the raw line.
+        - error (str): The reason the row was rejected.
+        """
+        if self.file is None:
+            self.file = open(self.path, "w", newline="", encoding="utf-8")
+            if self.format == "csv":
+                self.writer = csv.writer(self.file)
+                self.writer.writerow(("line", *IMPORT_FIELDS, "error"))
+
+        if isinstance(values, str):
+            # The raw line of a malformed row
+            fields = {"raw": values}
+        else:
+            fields = dict(zip(IMPORT_FIELDS, values))
+
+        if self.format == "csv":
+            self.writer.writerow((line_number, *(fields.get(field) for field in IMPORT_FIELDS), error))
+        else:
+            self.file.write(json.dumps({"line": line_number, **fields, "error": error}) + "\n")
+        self.count += 1
+
+    def close(self):
+        """
+        Close the file if it was created.
+        """
+        if self.file is not None:
+            self.file.close()
+
+
+def can_batch_fts(connection, backend):
+    """
+    Return whether the full-text index can be filled once per batch, which needs schema migration 4 on SQLite.
+    """
+    return (backend == SQLITE_BACKEND and
+            migrations.current_version(connection) >= FTS_DEFERRED_VERSION)
+
+
+def insert_batch(connection, backend, batch, batch_fts=None):
+    """
+    Insert a batch of (name, course, mobile) student records with executemany() in a single transaction.
+
+    Args:
+        connection: An open SQLite or MySQL connection.
+        backend (str): SQLITE_BACKEND or MYSQL_BACKEND.
+        batch (list): The student records to insert.
+        batch_fts (bool): Whether to fill the full-text index once for the whole batch
+            (see can_batch_fts). Defaults to None (checked on the connection).
+    """
+    if batch_fts is None:
+        batch_fts = can_batch_fts(connection, backend)
+
+    query = INSERT_QUERIES[backend]
+    cursor = connection.cursor()
+    try:
+        if batch_fts:
+            cursor.execute(DEFER_FTS_SQLITE_QUERY)
+            # Ids are generated in increasing order, the new rows are the ones after the current maximum
+            cursor.execute(GET_MAX_ID_SQLITE_QUERY)
+            max_id = cursor.fetchone()[0]
+            cursor.executemany(query, batch)
+            cursor.execute(INDEX_FTS_SQLITE_QUERY, (max_id,))
+            cursor.execute(RESUME_FTS_SQLITE_QUERY)
+        else:
+            cursor.executemany(query, batch)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def import_students(connection, backend, path, batch_size=IMPORT_BATCH_SIZE,
+                    rejects_path=None, progress=None):
+    """
+    Import the student records of a CSV or JSONL file into the database.
+
+    Names are stripped and title-cased like in the insert dialog. Batches are committed
+    one by one, so if a batch fails the rows of the previous batches stay imported.
+
+    Args:
+        connection: An open SQLite or MySQL connection.
+        backend (str): SQLITE_BACKEND or MYSQL_BACKEND.
+        path (str or Path): The CSV or JSONL file to import.
+        batch_size (int): The number of rows inserted per transaction. Defaults to IMPORT_BATCH_SIZE.
+        rejects_path (str or Path): The file receiving the rejected rows. Defaults to
+            <file name>.rejects.<extension> next to the imported file.
+        progress (callable): Called with (rows read, rows imported) after each batch.
+
+    Returns:
+        dict: Rows read, imported and rejected, the rejects file (None if no row was
+              rejected), the duration in seconds and the number of rows per second.
+
+    Raises:
+        ImportFormatError: If the file type is not supported or a CSV column is missing.
+    """
+    format = file_format(path)
+    read_records = read_csv if format == "csv" else read_jsonl
+    rejects = RejectsFile(rejects_path or rejects_path_for(path), format)
+    batch_fts = can_batch_fts(connection, backend)
+
+    start = time.perf_counter()
+    rows_read = 0
+    imported = 0
+    batch = []
+
+    try:
+        with open(path, newline="", encoding="utf-8") as file:
+            for line_number, values, error in read_records(file):
+                rows_read += 1
+
+                if error:
+                    rejects.write(line_number, values, error)
+                    continue
+
+                name, course, phone = values
+                name = str(name or "").strip().title()
+                course = str(course or "").strip()
+                phone = str(phone or "").strip()
+
+                valid, warning = validate_student(name, course, phone)
+                if not valid:
+                    # Keep the reason on a single line
+                    rejects.write(line_number, values, " ".join(warning.split()))
+                    continue
+
+                batch.append((name, course, phone))
+                if len(batch) >= batch_size:
+                    insert_batch(connection, backend, batch, batch_fts)
+                    imported += len(batch)
+                    batch = []
+                    if progress is not None:
+                        progress(rows_read, imported)
+
+            if batch:
+                insert_batch(connection, backend, batch, batch_fts)
+                imported += len(batch)
+                if progress is not None:
+                    progress(rows_read, imported)
+    finally:
+        rejects.close()
+        if imported:
+            logging.info(f"Imported {imported} student records from {path}")
+
+    seconds = time.perf_counter() - start
+    return {
+        "rows": rows_read,
+        "imported": imported,
+        "rejected": rejects.count,
+        "rejects_file": str(rejects.path) if rejects.count else None,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows_read / seconds) if seconds else 0,
+    }
+
+
+def connect(backend):
+    """
+    Open a connection to the configured database of the given backend (used by the command line).
+    """
+    if backend == SQLITE_BACKEND:
+        # Use the same tuned connection as the application
+        from constants import DB_FILE, SQLITE_PRAGMAS, SQLITE_STATEMENT_CACHE_SIZE
+        from database import SQLiteConnectionManager
+        return SQLiteConnectionManager(DB_FILE, SQLITE_PRAGMAS, SQLITE_STATEMENT_CACHE_SIZE).connection()
+
+    return migrations.connect(backend)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help="the CSV or JSONL file to import")
+    parser.add_argument("--backend", choices=(SQLITE_BACKEND, MYSQL_BACKEND), required=True,
+                        help="the database to import into")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE,
+                        help=f"rows inserted per transaction (default: {IMPORT_BATCH_SIZE})")
+    parser.add_argument("--rejects", default=None,
+                        help="file receiving the rejected rows (default: <file>.rejects.<extension>)")
+    args = parser.parse_args()
+
+    connection = connect(args.backend)
+    try:
+        # Make sure the students table exists and is up to date
+        migrations.migrate(connection, args.backend)
+        result = import_students(
+            connection, args.backend, args.file, args.batch_size, args.rejects,
+            progress=lambda rows, imported: print(f"\r{rows} rows read, {imported} imported", end="", flush=True))
+    finally:
+        connection.close()
+
+    print(f"\n{result['imported']} of {result['rows']} rows imported in {result['seconds']} s "
+          f"({result['rows_per_second']} rows/s), {result['rejected']} rejected")
+    if result["rejects_file"]:
+        print(f"Rejected rows written to {result['rejects_file']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Latency instrumentation of the database calls and UI actions, and the slow operation log.
+
+Hot paths are wrapped in `with timed("operation"):` blocks. Each block records its
+duration (and row count, when set) in a per-operation LatencyHistogram of the
+process-wide `metrics`. A block taking longer than its threshold also writes a
+structured (JSON) entry to the "slow_query" logger, with the SQL text and the shape
+of its parameters (their types, never their values):
+
+    with timed("db.execute.search", sql, params) as timer:
+        cursor.execute(sql, params)
+    with timed("db.fetch.search", sql, params) as timer:
+        rows = cursor.fetchall()
+        timer.rows = len(rows)
+
+    metrics.snapshot()  # {"db.execute.search": {"count": ..., "p95_ms": ..., ...}, ...}
+"""
+import bisect
+import json
+import logging
+import threading
+import time
+from constants import SLOW_QUERY_THRESHOLD_MS, SLOW_UI_ACTION_THRESHOLD_MS
+
+
+# Upper bounds of the histogram buckets, in milliseconds (the last bucket has no upper bound)
+HISTOGRAM_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+slow_query_logger = logging.getLogger("slow_query")
+
+
+class LatencyHistogram:
+    """
+    Counts of the durations of an operation in fixed, roughly logarithmic, buckets.
+
+    Attributes:
+    - buckets (list): The number of durations in each bucket of HISTOGRAM_BOUNDS_MS, plus the overflow bucket.
+    - count (int): The number of recorded durations.
+    - total (float): The sum of the recorded durations, in seconds.
+    - max (float): The longest recorded duration, in seconds.
+    - rows (int): The total number of rows read or written by the recorded operations.
+    """
+
+    def __init__(self):
+        """
+        Initialize the LatencyHistogram object.
+        """
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+
+    def record(self, seconds, rows=None):
+        """
+        Record the duration of an operation, and the number of rows it read or wrote.
+        """
+        self.buckets[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, seconds * 1000)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if rows is not None:
+            self.rows += rows
+
+    def percentile(self, fraction):
+        """
+        Return an upper estimate of a percentile of the durations (the bound of its bucket), in milliseconds.
+        """
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(HISTOGRAM_BOUNDS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max * 1000)
+        return self.max * 1000
+
+    def snapshot(self):
+        """
+        Return the statistics of the histogram.
+
+        Returns:
+            dict: Count, rows, mean, estimated median, 95th and 99th percentiles and maximum
+                  (in milliseconds), and the non-empty buckets by upper bound.
+        """
+        bounds = [str(bound) for bound in HISTOGRAM_BOUNDS_MS] + ["inf"]
+        return {
+            "count": self.count,
+            "rows": self.rows,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "max_ms": round(self.max * 1000, 3),
+            "buckets_ms": {bound: count for bound, count in zip(bounds, self.buckets) if count},
+        }
+
+
+class Metrics:
+    """
+    The latency histograms of the instrumented operations, shared by all threads.
+    """
+
+    def __init__(self):
+        """
+        Initialize the Metrics object.
+        """
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def record(self, operation, seconds, rows=None):
+        """
+        Record a duration (in seconds) and row count of an operation.
+        """
+        with self.lock:
+            histogram = self.histograms.get(operation)
+            if histogram is None:
+                histogram = self.histograms[operation] = LatencyHistogram()
+            histogram.record(seconds, rows)
+
+    def snapshot(self):
+        """
+        Return the statistics of every operation, by operation name.
+        """
+        with self.lock:
+            return {operation: histogram.snapshot()
+                    for operation, histogram in sorted(self.histograms.items())}
+
+    def reset(self):
+        """
+        Drop every recorded duration.
+        """
+        with self.lock:
+            self.histograms = {}
+
+
+# The metrics of the process
+metrics = Metrics()
+
+
+def params_shape(params):
+    """
+    Return the shape of query parameters: the type name of each one, without the values.
+    """
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {name: type(value).__name__ for name, value in params.items()}
+    return [type(value).__name__ for value in params]
+
+
+class Timer:
+    """
+    A context manager recording the duration of its block (see timed).
+
+    Attributes:
+    - operation (str): The name of the operation, e.g. "db.execute.search" or "ui.dialog_open.search".
+    - query (str): The SQL text of the operation, written to the slow operation log. None for UI actions.
+    - params: The query parameters, only their shape is logged.
+    - threshold_ms (float): Durations beyond this (milliseconds) are written to the slow operation log.
+      None never logs the operation (bulk operations, which are long by nature).
+    - rows (int): The number of rows read or written, may be set inside the block.
+    - seconds (float): The duration of the block, once it ended.
+    """
+
+    def __init__(self, operation, query=None, params=None, threshold_ms=SLOW_QUERY_THRESHOLD_MS):
+        self.operation = operation
+        self.query = query
+        self.params = params
+        self.threshold_ms = threshold_ms
+        self.rows = None
+        self.seconds = None
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.seconds = time.perf_counter() - self.start
+        metrics.record(self.operation, self.seconds, self.rows)
+
+        duration_ms = self.seconds * 1000
+        if self.threshold_ms is not None and duration_ms >= self.threshold_ms:
+            entry = {
+                "operation": self.operation,
+                "duration_ms": round(duration_ms, 3),
+                "threshold_ms": self.threshold_ms,
+                "rows": self.rows,
+                "sql": self.query,
+                "params": params_shape(self.params),
+                "failed": exc_type is not None,
+            }
+            slow_query_logger.warning(f"Slow operation: {json.dumps(entry)}")
+        # Do not swallow the exception of the block
+        return False
+
+
+def timed(operation, query=None, params=None, threshold_ms=SLOW_QUERY_THRESHOLD_MS):
+    """
+    Return a context manager recording the duration of a database call or UI action.
+
+    Args:
+        operation (str): The name of the operation, "db." prefixed for database calls and
+            "ui." prefixed for UI actions.
+        query (str): The SQL text, written to the slow operation log. Defaults to None.
+        params: The query parameters, only their types are logged. Defaults to None.
+        threshold_ms (float): Durations beyond this (milliseconds) are written to the slow
+            operation log, None to never log the operation. Defaults to SLOW_QUERY_THRESHOLD_MS.
+
+    Returns:
+        Timer: The context manager. Set its `rows` attribute inside the block to record a row count.
+    """
+    return Timer(operation, query, params, threshold_ms)
+
+
+def timed_ui(operation):
+    """
+    Return a context manager recording the duration of a UI action (see timed), with the UI threshold.
+    """
+    return Timer(operation, threshold_ms=SLOW_UI_ACTION_THRESHOLD_MS)
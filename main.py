@@ -1,16 +1,34 @@
+import argparse
 import sys
 from PyQt6.QtWidgets import QApplication
-# from legacy_ui import MainWindow    # using SQLite Database
-from ui import MainWindow   # using MySQL Database
+from app_logging import handle_logging
+from backends import BACKENDS, create_repository
+from constants import DB_BACKEND, WRITE_BEHIND
+from ui import MainWindow
 
 
 # Main function to create and run the application
 def main():
-    app = QApplication(sys.argv)
+    # Select the database backend: --backend option, else the DB_BACKEND environment variable (see backends.py)
+    parser = argparse.ArgumentParser(
+        description="Student Management System",
+        epilog="backends: " + "; ".join(f"{name}: {description}"
+                                        for name, (_, description) in BACKENDS.items()))
+    parser.add_argument("--backend", choices=BACKENDS, default=DB_BACKEND,
+                        help=f"the database the application runs on (default: {DB_BACKEND})")
+    # Opt-in batching of the inserts and updates, also enabled by WRITE_BEHIND=1 (see write_queue.py)
+    parser.add_argument("--write-behind", action="store_true", default=WRITE_BEHIND,
+                        help="queue the inserts and updates and commit them in batches")
+    # The other arguments are Qt options (-style, -platform, ...)
+    args, qt_args = parser.parse_known_args()
+
+    # Set up logging using the custom handler (not on import of the UI modules, so importing them has no side effect)
+    handle_logging()
+    app = QApplication(sys.argv[:1] + qt_args)
     # Set application style to Fusion
     app.setStyle("Fusion")
-    # Create an instance of the main window
-    main_window = MainWindow()
+    # Create an instance of the main window on the selected backend
+    main_window = MainWindow(create_repository(args.backend), write_behind=args.write_behind)
     # Show the main window
     main_window.show()
     # Start the application event loop
@@ -0,0 +1,236 @@
+"""
+Versioned schema migrations for the SQLite and MySQL databases.
+
+Each migration has a version number, a description and the SQL statements to run on
+each backend. Applied versions are recorded in the `schema_version` table, so running
+the migrations again only applies the new ones. The application runs them at startup;
+they can also be applied from the command line:
+
+    python migrations.py --backend sqlite
+    python migrations.py --backend mysql
+"""
+import argparse
+import logging
+from constants import SQLITE_BACKEND, MYSQL_BACKEND
+
+
+# (version, description, {backend: [statements]}), in increasing version order
+MIGRATIONS = [
+    (1, "Create students table", {
+        SQLITE_BACKEND: [
+            """CREATE TABLE IF NOT EXISTS students(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT,
+                course TEXT,
+                mobile INTEGER
+            )""",
+        ],
+        MYSQL_BACKEND: [
+            """CREATE TABLE IF NOT EXISTS students(
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                name VARCHAR(255),
+                course VARCHAR(255),
+                mobile VARCHAR(255)
+            )""",
+        ],
+    }),
+    (2, "Add indexes on name, course and mobile", {
+        SQLITE_BACKEND: [
+            "CREATE INDEX IF NOT EXISTS idx_students_name ON students (name)",
+            "CREATE INDEX IF NOT EXISTS idx_students_course ON students (course)",
+            "CREATE INDEX IF NOT EXISTS idx_students_mobile ON students (mobile)",
+        ],
+        MYSQL_BACKEND: [
+            "CREATE INDEX idx_students_name ON students (name)",
+            "CREATE INDEX idx_students_course ON students (course)",
+            "CREATE INDEX idx_students_mobile ON students (mobile)",
+        ],
+    }),
+    (3, "Add full-text search on name and mobile", {
+        SQLITE_BACKEND: [
+            # Trigram tokens make any substring of 3 characters or more searchable
+            """CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+                name, mobile, content='students', content_rowid='id', tokenize='trigram'
+            )""",
+            # Keep the full-text table in sync with the students table
+            """CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students BEGIN
+                INSERT INTO students_fts (rowid, name, mobile) VALUES (new.id, new.name, new.mobile);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students BEGIN
+                INSERT INTO students_fts (students_fts, rowid, name, mobile) VALUES ('delete', old.id, old.name, old.mobile);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE ON students BEGIN
+                INSERT INTO students_fts (students_fts, rowid, name, mobile) VALUES ('delete', old.id, old.name, old.mobile);
+                INSERT INTO students_fts (rowid, name, mobile) VALUES (new.id, new.name, new.mobile);
+            END""",
+            # Index the existing rows
+            "INSERT INTO students_fts (students_fts) VALUES ('rebuild')",
+            # Number of rows per trigram, used to pick the most selective trigrams of a fuzzy search
+            "CREATE VIRTUAL TABLE IF NOT EXISTS students_fts_vocab USING fts5vocab(students_fts, row)",
+        ],
+        MYSQL_BACKEND: [
+            # The ngram parser indexes every sequence of ngram_token_size (2 by default) characters
+            "ALTER TABLE students ADD FULLTEXT INDEX ftx_students_name_mobile (name, mobile) WITH PARSER ngram",
+        ],
+    }),
+    (4, "Let bulk imports fill the full-text index once per batch", {
+        SQLITE_BACKEND: [
+            # Indexing rows one by one from a trigger flushes the FTS5 index for every row, the
+            # importer instead inserts a row here for the duration of its transaction (so no other
+            # connection ever sees it) and indexes the whole batch with a single statement
+            "CREATE TABLE IF NOT EXISTS students_fts_deferred(id INTEGER PRIMARY KEY)",
+            "DROP TRIGGER IF EXISTS students_fts_insert",
+            """CREATE TRIGGER students_fts_insert AFTER INSERT ON students
+                WHEN NOT EXISTS (SELECT 1 FROM students_fts_deferred) BEGIN
+                INSERT INTO students_fts (rowid, name, mobile) VALUES (new.id, new.name, new.mobile);
+            END""",
+        ],
+        # The MySQL FULLTEXT index is maintained by the server
+        MYSQL_BACKEND: [],
+    }),
+    (5, "Add indexes sorting the students of a course by name and mobile", {
+        # The table filtered by course and sorted by a column reads these in order (the id, which
+        # breaks ties, is part of every index), sorting by id or course uses idx_students_course
+        SQLITE_BACKEND: [
+            "CREATE INDEX IF NOT EXISTS idx_students_course_name ON students (course, name)",
+            "CREATE INDEX IF NOT EXISTS idx_students_course_mobile ON students (course, mobile)",
+        ],
+        MYSQL_BACKEND: [
+            "CREATE INDEX idx_students_course_name ON students (course, name)",
+            "CREATE INDEX idx_students_course_mobile ON students (course, mobile)",
+        ],
+    }),
+]
+
+CREATE_SCHEMA_VERSION_TABLE = """CREATE TABLE IF NOT EXISTS schema_version(
+    version INTEGER PRIMARY KEY,
+    description VARCHAR(255),
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)"""
+# MySQL error ER_DUP_KEYNAME: the index already exists
+MYSQL_DUPLICATE_KEY_NAME_ERROR = 1061
+GET_SCHEMA_VERSION_QUERY = "SELECT MAX(version) FROM schema_version"
+INSERT_SCHEMA_VERSION_QUERY = {
+    SQLITE_BACKEND: "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+    MYSQL_BACKEND: "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+}
+
+
+def current_version(connection):
+    """
+    Return the latest schema version applied to the database (0 if none).
+
+    Args:
+        connection: An open SQLite or MySQL connection.
+
+    Returns:
+        int: The latest applied version.
+    """
+    cursor = connection.cursor()
+    cursor.execute(CREATE_SCHEMA_VERSION_TABLE)
+    cursor.execute(GET_SCHEMA_VERSION_QUERY)
+    version = cursor.fetchone()[0]
+    cursor.close()
+    return version or 0
+
+
+def execute_statement(cursor, backend, statement):
+    """
+    Run a migration statement, skipping MySQL indexes that already exist.
+
+    MySQL has no CREATE INDEX IF NOT EXISTS, and an index created by a migration that
+    failed afterwards stays (DDL is committed implicitly), so the rerun finds it already
+    there: the index is then treated as created.
+
+    Args:
+        cursor: A cursor of the migrated connection.
+        backend (str): SQLITE_BACKEND or MYSQL_BACKEND.
+        statement (str): The SQL statement.
+    """
+    try:
+        cursor.execute(statement)
+    except Exception as e:
+        if backend != MYSQL_BACKEND or getattr(e, "errno", None) != MYSQL_DUPLICATE_KEY_NAME_ERROR:
+            raise
+        logging.info(f"Skipped migration statement, the index already exists: {statement}")
+
+
+def migrate(connection, backend, target_version=None):
+    """
+    Apply the pending migrations to the database, in version order.
+
+    Each migration is committed, and its version recorded, before the next one starts.
+    MySQL commits DDL statements implicitly, so a failing MySQL migration may leave some
+    of its indexes created: running the migration again skips them (see execute_statement).
+
+    Args:
+        connection: An open SQLite or MySQL connection.
+        backend (str): SQLITE_BACKEND or MYSQL_BACKEND.
+        target_version (int): Stop after this version. Defaults to None (apply all migrations).
+
+    Returns:
+        list: The versions applied by this call.
+    """
+    applied = []
+    version = current_version(connection)
+
+    for migration_version, description, statements in MIGRATIONS:
+        if migration_version <= version:
+            continue
+        if target_version is not None and migration_version > target_version:
+            break
+
+        cursor = connection.cursor()
+        try:
+            for statement in statements[backend]:
+                execute_statement(cursor, backend, statement)
+            cursor.execute(INSERT_SCHEMA_VERSION_QUERY[backend],
+                           (migration_version, description))
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        logging.info(f"Applied {backend} schema migration {migration_version}: {description}")
+        applied.append(migration_version)
+
+    return applied
+
+
+def connect(backend):
+    """
+    Open a connection to the configured database of the given backend (used by the command line).
+    """
+    if backend == SQLITE_BACKEND:
+        import sqlite3
+        from constants import DB_FILE
+        return sqlite3.connect(DB_FILE)
+
+    import mysql.connector
+    from constants import HOST, PORT, USER, PASSWORD, DATABASE
+    return mysql.connector.connect(host=HOST, port=PORT, user=USER,
+                                   password=PASSWORD, database=DATABASE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=(SQLITE_BACKEND, MYSQL_BACKEND), required=True,
+                        help="the database to migrate")
+    parser.add_argument("--target-version", type=int, default=None,
+                        help="stop after this version (default: apply all migrations)")
+    args = parser.parse_args()
+
+    connection = connect(args.backend)
+    try:
+        applied = migrate(connection, args.backend, args.target_version)
+        print(f"Applied migrations: {applied or 'none'}, "
+              f"schema version is now {current_version(connection)}")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
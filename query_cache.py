@@ -0,0 +1,186 @@
+"""
+An in-memory cache of query results, used by StudentRepository.
+
+Read queries with identical parameters return identical results as long as their
+table is not written to, so their results are kept in a QueryCache keyed by the
+normalized query and its parameters, and dropped when a write reaches the table.
+"""
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_query(query):
+    """
+    Return the query with its whitespace collapsed, so formatting does not split cache entries.
+    """
+    return re.sub(r"\s+", " ", query).strip()
+
+
+def estimate_size(value):
+    """
+    Return an estimate of the memory taken by a query result, in bytes.
+
+    Args:
+        value: A result made of lists, tuples and scalar values (rows of a cursor).
+
+    Returns:
+        int: The size of the value and of everything it contains.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class QueryCache:
+    """
+    A thread-safe LRU cache of query results with a time to live and a memory cap.
+
+    Each entry is tagged with the table it was read from. Writing to a table calls
+    invalidate(table), which drops exactly that table's entries. To avoid storing a
+    result read concurrently with a write (and so already stale), each table has a
+    generation number bumped by invalidate(): put() ignores results read before the
+    last invalidation of their table.
+
+    Hit, miss, eviction, expiration and invalidation counters are kept to tune the cache.
+
+    Attributes:
+    - max_entries (int): The maximum number of cached results (0 disables the cache).
+    - max_bytes (int): The maximum estimated memory taken by the cached results.
+    - ttl (float): The number of seconds a result stays valid (None: until invalidated).
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=32 * 1024 * 1024, ttl=None):
+        """
+        Initialize the QueryCache object.
+
+        Args:
+        - max_entries (int): The maximum number of cached results (0 disables the cache). Defaults to 1024.
+        - max_bytes (int): The maximum estimated memory taken by the cached results. Defaults to 32 MB.
+        - ttl (float): The number of seconds a result stays valid, protecting against writes made by
+          other processes. Defaults to None (valid until its table is written to).
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        # key -> (result, table, size, expiry), the most recently used at the end
+        self.entries = OrderedDict()
+        self.size = 0
+        # table -> number of invalidations
+        self.generations = {}
+        self.lock = threading.Lock()
+
+        # Counters used to tune the cache
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(query, params=()):
+        """
+        Return the cache key of a query and its parameters.
+        """
+        return normalize_query(query), tuple(params)
+
+    def generation(self, table):
+        """
+        Return the generation of a table, to be passed to put() with the result read after this call.
+        """
+        with self.lock:
+            return self.generations.get(table, 0)
+
+    def get(self, key):
+        """
+        Return (True, result) if a valid result is cached for the key, otherwise (False, None).
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            result, _, size, expiry = entry
+            if expiry is not None and time.monotonic() >= expiry:
+                self.drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True, result
+
+    def put(self, key, table, generation, result):
+        """
+        Cache the result of a query read from a table.
+
+        Args:
+        - key (tuple): The cache key of the query (see make_key).
+        - table (str): The table the result was read from.
+        - generation (int): The table generation taken before running the query (see generation).
+        - result: The query result. It is shared by every hit, callers must not modify it.
+        """
+        if not self.max_entries:
+            return
+        size = estimate_size(result)
+        if size > self.max_bytes:
+            return
+        expiry = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self.lock:
+            if self.generations.get(table, 0) != generation:
+                # The table was written to while the query ran
+                return
+            if key in self.entries:
+                self.drop(key)
+            self.entries[key] = (result, table, size, expiry)
+            self.size += size
+
+            # Evict the least recently used results beyond the caps
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                self.drop(next(iter(self.entries)))
+                self.evictions += 1
+
+    def invalidate(self, table):
+        """
+        Drop every result read from a table, after a write to it.
+        """
+        with self.lock:
+            self.generations[table] = self.generations.get(table, 0) + 1
+            stale = [key for key, entry in self.entries.items() if entry[1] == table]
+            for key in stale:
+                self.drop(key)
+            self.invalidations += len(stale)
+
+    def drop(self, key):
+        """
+        Remove an entry. Must be called with the lock held.
+        """
+        _, _, size, _ = self.entries.pop(key)
+        self.size -= size
+
+    def stats(self):
+        """
+        Return the cache counters.
+
+        Returns:
+        - dict: Entries, estimated bytes, hits, misses, hit rate, evictions, expirations and invalidations.
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,271 @@
+"""
+Compact in-memory store of the student records shown in the table.
+
+Database cursors return each student record as a tuple of four Python objects (an
+int id, a name, a course and a mobile number), and the name lookups of the table
+need an index by name. Kept as is, that costs several heap objects per row (the
+tuple, the id, a course string repeated on every row, the mobile number and a set
+in the name index). StudentStore keeps the records column by column instead:
+
+- ids: an array of 64-bit ints (binary searches are done on it directly when in id order)
+- names: a list of interned strings, shared with the keys of the name index
+- courses: an array of 16-bit codes into a vocabulary starting with COURSES
+- mobiles: an array of 64-bit ints, the packed phone numbers (see pack_mobile)
+
+The name index maps each name to the id of its student, or to a list of ids for
+the names shared by several students.
+
+Records are rebuilt as (id, name, course, mobile) tuples, equal to the ones read
+from the database, only when they are asked for. Example:
+
+    store = StudentStore()
+    store.extend([(1, "John Smith", "Math", "11112233")])
+    store[0]                      # (1, "John Smith", "Math", "11112233")
+    store.value(0, 2)             # "Math"
+    store.ids_named("John Smith")  # [1]
+"""
+import bisect
+import sys
+from array import array
+from constants import COURSES
+
+
+# Packed mobile number whose value is kept apart, in StudentStore.other_mobiles
+UNPACKED_MOBILE = -(2 ** 63)
+# Longest digit string packed in a 64-bit int (with its length)
+MAX_PACKED_DIGITS = 15
+
+
+def pack_mobile(mobile):
+    """
+    Pack a mobile number in a 64-bit int.
+
+    Mobile numbers are ints on SQLite (INTEGER column) and digit strings on MySQL
+    (VARCHAR column). Non-negative ints are kept as they are. Digit strings are packed
+    as negative numbers holding their value and their length, so leading zeros survive.
+
+    Args:
+        mobile (int or str): The mobile number as read from the database.
+
+    Returns:
+        int: The packed number, or UNPACKED_MOBILE if the number cannot be packed
+             (None, other strings, out of range ints).
+    """
+    if type(mobile) is int:
+        if 0 <= mobile < 2 ** 62:
+            return mobile
+    elif type(mobile) is str:
+        if 0 < len(mobile) <= MAX_PACKED_DIGITS and mobile.isascii() and mobile.isdigit():
+            return -(int(mobile) * 16 + len(mobile)) - 1
+    return UNPACKED_MOBILE
+
+
+def unpack_mobile(packed):
+    """
+    Return the mobile number packed by pack_mobile (not for UNPACKED_MOBILE).
+    """
+    if packed >= 0:
+        return packed
+    digits, length = divmod(-packed - 1, 16)
+    return f"{digits:0{length}d}"
+
+
+class StudentStore:
+    """
+    The student records of the table, stored column by column, with an index by name.
+
+    The store behaves like a list of (id, name, course, mobile) tuples: len(), indexing,
+    item assignment and deletion, append(), extend() and insert(). Records are looked up
+    by id with a binary search when they are kept in id order, by a linear search otherwise.
+
+    Attributes:
+    - ordered (bool): Whether the records are kept in increasing id order.
+    - ids (array): The ids of the records.
+    - names (list): The names of the records (interned strings).
+    - courses (array): The course codes of the records, indexes in course_names.
+    - mobiles (array): The packed mobile numbers of the records.
+    - course_names (list): The vocabulary of the courses, COURSES followed by the other courses met.
+    - course_codes (dict): The code of each course of the vocabulary.
+    - other_mobiles (dict): The mobile numbers that cannot be packed, by id.
+    - name_index (dict): The id (or list of ids, in increasing order) of the records of each name.
+    """
+
+    def __init__(self, ordered=True):
+        """
+        Initialize the StudentStore object.
+
+        Args:
+            ordered (bool): Whether the records are kept in increasing id order. Defaults to True.
+        """
+        self.ordered = ordered
+        self.ids = array("q")
+        self.names = []
+        self.courses = array("H")
+        self.mobiles = array("q")
+        self.course_names = list(COURSES)
+        self.course_codes = {course: code for code, course in enumerate(self.course_names)}
+        self.other_mobiles = {}
+        self.name_index = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, row_i):
+        """
+        Return the student record (id, name, course, mobile) at the given row.
+        """
+        return (self.ids[row_i], self.names[row_i],
+                self.course_names[self.courses[row_i]], self.mobile_at(row_i))
+
+    def __setitem__(self, row_i, student):
+        """
+        Replace the student record at the given row (the id must not change the order of the rows).
+        """
+        student_id, name, course, mobile = student
+        self.unindex_name(self.ids[row_i], self.names[row_i])
+        self.other_mobiles.pop(self.ids[row_i], None)
+        name = sys.intern(name)
+        self.ids[row_i] = student_id
+        self.names[row_i] = name
+        self.courses[row_i] = self.course_code(course)
+        self.mobiles[row_i] = self.pack(student_id, mobile)
+        self.index_name(student_id, name)
+
+    def __delitem__(self, row_i):
+        """
+        Remove the student record at the given row.
+        """
+        self.unindex_name(self.ids[row_i], self.names[row_i])
+        self.other_mobiles.pop(self.ids[row_i], None)
+        del self.ids[row_i]
+        del self.names[row_i]
+        del self.courses[row_i]
+        del self.mobiles[row_i]
+
+    def value(self, row_i, column):
+        """
+        Return a single field of the record at the given row, without building the record.
+
+        Args:
+            row_i (int): The row of the record.
+            column (int): 0 for the id, 1 for the name, 2 for the course and 3 for the mobile number.
+        """
+        if column == 0:
+            return self.ids[row_i]
+        if column == 1:
+            return self.names[row_i]
+        if column == 2:
+            return self.course_names[self.courses[row_i]]
+        return self.mobile_at(row_i)
+
+    def mobile_at(self, row_i):
+        """
+        Return the mobile number of the record at the given row.
+        """
+        packed = self.mobiles[row_i]
+        if packed == UNPACKED_MOBILE:
+            return self.other_mobiles[self.ids[row_i]]
+        return unpack_mobile(packed)
+
+    def append(self, student):
+        """
+        Append a student record (whose id is greater than the ids of the store, if the store is ordered).
+        """
+        self.extend((student,))
+
+    def insert(self, row_i, student):
+        """
+        Insert a student record before the given row.
+        """
+        student_id, name, course, mobile = student
+        name = sys.intern(name)
+        self.ids.insert(row_i, student_id)
+        self.names.insert(row_i, name)
+        self.courses.insert(row_i, self.course_code(course))
+        self.mobiles.insert(row_i, self.pack(student_id, mobile))
+        self.index_name(student_id, name)
+
+    def extend(self, students):
+        """
+        Append student records (in id order, after the ids of the store, if the store is ordered).
+        """
+        for student_id, name, course, mobile in students:
+            name = sys.intern(name)
+            self.ids.append(student_id)
+            self.names.append(name)
+            self.courses.append(self.course_code(course))
+            self.mobiles.append(self.pack(student_id, mobile))
+            self.index_name(student_id, name)
+
+    def course_code(self, course):
+        """
+        Return the code of a course, adding it to the vocabulary if it is not part of it yet.
+        """
+        code = self.course_codes.get(course)
+        if code is None:
+            code = self.course_codes[course] = len(self.course_names)
+            self.course_names.append(course)
+        return code
+
+    def pack(self, student_id, mobile):
+        """
+        Return the packed mobile number of a record, keeping the numbers that cannot be packed apart.
+        """
+        packed = pack_mobile(mobile)
+        if packed == UNPACKED_MOBILE:
+            self.other_mobiles[student_id] = mobile
+        return packed
+
+    def index_of(self, student_id):
+        """
+        Return the row of the record with the given id, or None if it is not in the store.
+        """
+        if not self.ordered:
+            try:
+                return self.ids.index(student_id)
+            except ValueError:
+                return None
+        row_i = bisect.bisect_left(self.ids, student_id)
+        if row_i < len(self.ids) and self.ids[row_i] == student_id:
+            return row_i
+        return None
+
+    def ids_named(self, name):
+        """
+        Return the ids, in increasing order, of the records with the given name.
+        """
+        student_ids = self.name_index.get(name)
+        if student_ids is None:
+            return []
+        if type(student_ids) is int:
+            return [student_ids]
+        return list(student_ids)
+
+    def index_name(self, student_id, name):
+        """
+        Add a record to the name index.
+        """
+        student_ids = self.name_index.get(name)
+        if student_ids is None:
+            # Most names belong to a single student, their id is stored without a container
+            self.name_index[name] = student_id
+        elif type(student_ids) is int:
+            self.name_index[name] = sorted((student_ids, student_id))
+        else:
+            bisect.insort(student_ids, student_id)
+
+    def unindex_name(self, student_id, name):
+        """
+        Remove a record from the name index.
+        """
+        student_ids = self.name_index.get(name)
+        if student_ids is None:
+            return
+        if type(student_ids) is int:
+            if student_ids == student_id:
+                del self.name_index[name]
+            return
+        if student_id in student_ids:
+            student_ids.remove(student_id)
+        if len(student_ids) == 1:
+            self.name_index[name] = student_ids[0]
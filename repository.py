@@ -0,0 +1,818 @@
+"""
+GUI-independent access to the student records, shared by both user interfaces.
+
+StudentRepository holds all the data access logic (listing, lookups, searches, writes,
+bulk imports and exports) and runs it through a driver, which knows how to get a
+connection to one backend and which SQL dialect (query constants) it speaks:
+
+- SQLiteDriver: long-lived tuned connections, one per thread (see SQLiteConnectionManager).
+- SQLiteSnapshotDriver: the same, on a read-only snapshot of the database.
+- MySQLDriver: connections checked out of a process-wide pool (see ConnectionPool).
+
+The driver of the application is picked by name from the registry of backends.py.
+
+Read results are cached in a QueryCache and invalidated by the repository's own writes
+(see query_cache.py). The connect, execute and fetch phases of every query, and the bulk
+operations, are timed (see instrumentation.py).
+
+Nothing here depends on Qt, so the data access can be used, batched, cached and
+benchmarked from scripts. Example:
+
+    repository = StudentRepository(SQLiteDriver())
+    student_id = repository.insert("John Smith", "Math", "11112233")
+    repository.get(student_id)
+"""
+import atexit
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from constants import *
+from database import ConnectionPool, PoolTimeoutError, SQLiteConnectionManager
+from instrumentation import timed
+from query_cache import QueryCache
+from search_engine import EXACT_SEARCH, search_students
+import migrations
+
+
+# The table read and written by the repository, the cached results are tagged with it
+STUDENTS_TABLE = "students"
+
+
+class SQLiteDriver:
+    """
+    A driver giving access to a SQLite database.
+
+    Instead of opening a new connection for every operation, connections are taken
+    from a process-wide SQLiteConnectionManager (one per database file), which keeps
+    a tuned long-lived connection open per thread.
+
+    Attributes:
+    - backend (str): SQLITE_BACKEND.
+    - read_only (bool): False, the database can be written to.
+    - queries (dict): The SQL queries of the repository operations, in the SQLite dialect.
+    - placeholder (str): The query parameter placeholder of the dialect, for the queries built at run time.
+    - database_file (str): The path to the SQLite database file.
+    - statement_cache_size (int): The number of compiled statements cached per connection.
+    - managers (dict): The connection managers shared by all instances, keyed by database file.
+    """
+
+    backend = SQLITE_BACKEND
+    read_only = False
+    placeholder = "?"
+    queries = {
+        "page": GET_STUDENTS_PAGE_SQLITE_QUERY,
+        "page_before": GET_STUDENTS_PAGE_BEFORE_SQLITE_QUERY,
+        "id_range": GET_STUDENT_ID_RANGE_SQLITE_QUERY,
+        "get": GET_STUDENT_SQLITE_QUERY,
+        "search": SEARCH_STUDENT_SQLITE_QUERY,
+        "count": COUNT_STUDENTS_SQLITE_QUERY,
+        "insert": INSERT_STUDENT_SQLITE_QUERY,
+        "update": UPDATE_STUDENT_SQLITE_QUERY,
+        "delete": DELETE_STUDENT_SQLITE_QUERY,
+    }
+
+    managers = {}
+    managers_lock = threading.Lock()
+
+    def __init__(self, database_file=DB_FILE, statement_cache_size=SQLITE_STATEMENT_CACHE_SIZE):
+        """
+        Initialize the SQLiteDriver object.
+
+        Args:
+        - database_file (str): The path to the SQLite database file.
+          Defaults to the value of DB_FILE.
+        - statement_cache_size (int): The number of compiled statements cached per connection
+          (applies when the file's connections are first opened). Defaults to SQLITE_STATEMENT_CACHE_SIZE.
+        """
+        self.database_file = database_file
+        self.statement_cache_size = statement_cache_size
+
+    def connect(self):
+        """
+        Return the long-lived connection to the SQLite database of the calling thread.
+
+        Using the connection in a `with` block commits (or rolls back on error) the
+        current transaction but does not close the connection.
+
+        Returns:
+        - connection (sqlite3.Connection): A connection object representing the database connection.
+        """
+        return self.get_manager().connection()
+
+    def get_manager(self):
+        """
+        Return the connection manager of this driver's database file, creating it on first use.
+
+        Returns:
+        - manager (database.SQLiteConnectionManager): The shared connection manager.
+        """
+        key = self.manager_key()
+        with SQLiteDriver.managers_lock:
+            if key not in SQLiteDriver.managers:
+                manager = self.create_manager()
+                SQLiteDriver.managers[key] = manager
+                # Close the long-lived connections when the app exits
+                atexit.register(manager.close_all)
+            return SQLiteDriver.managers[key]
+
+    def manager_key(self):
+        """
+        Return the key of this driver's connection manager in the shared managers.
+        """
+        return str(self.database_file)
+
+    def create_manager(self):
+        """
+        Return a new connection manager for this driver's database file.
+        """
+        return SQLiteConnectionManager(self.database_file,
+                                       SQLITE_PRAGMAS,
+                                       cached_statements=self.statement_cache_size)
+
+    def execute(self, connection, sql, params=()):
+        """
+        Execute a query on a connection.
+
+        sqlite3 compiles each statement once per connection and reuses it whenever the same
+        SQL text runs again (up to statement_cache_size statements), and the connections are
+        long-lived, so a new cursor does not parse the query again.
+
+        Returns:
+        - tuple: The cursor the query was executed on, and False (the cursor is not reused, close it after use).
+        """
+        cursor = connection.cursor()
+        try:
+            cursor.execute(sql, params)
+        except Exception:
+            cursor.close()
+            raise
+        return cursor, False
+
+
+class SQLiteSnapshotDriver(SQLiteDriver):
+    """
+    A driver giving read-only access to a SQLite snapshot of the database.
+
+    Snapshots are written by the exporter (`python exporter.py snapshot.db --backend mysql`)
+    with the ids, schema and search index of the source database, so reports and searches
+    can run locally, on a copy that never changes, while the application runs on MySQL.
+    The file is opened read-only (and query_only), so any write fails.
+
+    Attributes:
+    - read_only (bool): True, the snapshot cannot be written to.
+    - database_file (str): The path to the snapshot file.
+    """
+
+    read_only = True
+
+    def __init__(self, database_file=SQLITE_SNAPSHOT_FILE):
+        """
+        Initialize the SQLiteSnapshotDriver object.
+
+        Args:
+        - database_file (str): The path to the snapshot file. Defaults to the value of SQLITE_SNAPSHOT_FILE.
+        """
+        super().__init__(database_file)
+
+    def connect(self):
+        """
+        Return the long-lived read-only connection to the snapshot of the calling thread.
+
+        Raises:
+        - sqlite3.OperationalError: If there is no snapshot file (opening it read-only would fail anyway).
+        """
+        if not Path(self.database_file).is_file():
+            raise sqlite3.OperationalError(
+                f"No snapshot at {self.database_file}, create it with: "
+                f"python exporter.py {self.database_file} --backend mysql")
+        return super().connect()
+
+    def manager_key(self):
+        return self.uri()
+
+    def uri(self):
+        """
+        Return the URI opening the snapshot file read-only.
+        """
+        return f"{Path(self.database_file).resolve().as_uri()}?mode=ro"
+
+    def create_manager(self):
+        return SQLiteConnectionManager(self.uri(),
+                                       SQLITE_SNAPSHOT_PRAGMAS,
+                                       cached_statements=self.statement_cache_size,
+                                       uri=True)
+
+
+class MySQLDriver:
+    """
+    A driver giving access to a MySQL database.
+
+    Connections are checked out of a process-wide pool (one per set of connection
+    parameters) instead of being opened for every operation, which saves a TCP and
+    authentication handshake per database call.
+
+    Attributes:
+    - backend (str): MYSQL_BACKEND.
+    - read_only (bool): False, the database can be written to.
+    - queries (dict): The SQL queries of the repository operations, in the MySQL dialect.
+    - placeholder (str): The query parameter placeholder of the dialect, for the queries built at run time.
+    - pools (dict): The connection pools shared by all instances, keyed by connection parameters.
+    """
+
+    backend = MYSQL_BACKEND
+    read_only = False
+    placeholder = "%s"
+    queries = {
+        "page": GET_STUDENTS_PAGE_MYSQL_QUERY,
+        "page_before": GET_STUDENTS_PAGE_BEFORE_MYSQL_QUERY,
+        "id_range": GET_STUDENT_ID_RANGE_MYSQL_QUERY,
+        "get": GET_STUDENT_MYSQL_QUERY,
+        "search": SEARCH_STUDENT_MYSQL_QUERY,
+        "count": COUNT_STUDENTS_MYSQL_QUERY,
+        "insert": INSERT_STUDENT_MYSQL_QUERY,
+        "update": UPDATE_STUDENT_MYSQL_QUERY,
+        "delete": DELETE_STUDENT_MYSQL_QUERY,
+    }
+
+    pools = {}
+    pools_lock = threading.Lock()
+
+    def __init__(self, host=HOST, port=PORT, user=USER, password=PASSWORD, database=DATABASE,
+                 statement_cache_size=MYSQL_STATEMENT_CACHE_SIZE):
+        """
+        Initialize the MySQLDriver object with default connection parameters.
+
+        Args:
+        - host (str): The hostname or IP address of the MySQL server.
+        - port (int): The port number of the MySQL server.
+        - user (str): The username used to authenticate with the MySQL server.
+        - password (str): The password used to authenticate with the MySQL server.
+        - database (str): The name of the MySQL database to connect to.
+        - statement_cache_size (int): The number of prepared statements kept per pooled connection
+          (applies when the pool is created), 0 to send the queries as text.
+          Defaults to MYSQL_STATEMENT_CACHE_SIZE.
+        """
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.database = database
+        self.statement_cache_size = statement_cache_size
+
+    def connect(self):
+        """
+        Check a connection to the MySQL database out of the connection pool.
+
+        The returned connection is given back to the pool (not closed) when its
+        `with` block ends.
+
+        Returns:
+        - connection (database.PooledConnection):
+            A pooled connection object representing the database connection.
+        """
+        import mysql.connector
+
+        try:
+            return self.get_pool().acquire()
+        except PoolTimeoutError as e:
+            # Surface pool exhaustion like any other MySQL error to the callers
+            raise mysql.connector.errors.PoolError(str(e)) from e
+
+    def new_connection(self):
+        """
+        Establish a new connection to the MySQL database.
+
+        Returns:
+        - connection (mysql.connector.connection.MySQLConnection):
+            A connection object representing the database connection.
+        """
+        # Only needed by the MySQL backend, SQLite users do not have to install it
+        import mysql.connector
+
+        # Establish a connection to the MySQL database using the specified parameters
+        connection = mysql.connector.connect(host=self.host,
+                                             port=self.port,
+                                             user=self.user,
+                                             password=self.password,
+                                             database=self.database)
+        return connection
+
+    def get_pool(self):
+        """
+        Return the connection pool for this driver's connection parameters, creating it on first use.
+
+        Returns:
+        - pool (database.ConnectionPool): The shared connection pool.
+        """
+        key = (self.host, self.port, self.user, self.database)
+        with MySQLDriver.pools_lock:
+            if key not in MySQLDriver.pools:
+                pool = ConnectionPool(self.new_connection,
+                                      size=MYSQL_POOL_SIZE,
+                                      timeout=MYSQL_POOL_TIMEOUT,
+                                      max_idle_time=MYSQL_POOL_MAX_IDLE_TIME,
+                                      health_check_interval=MYSQL_POOL_HEALTH_CHECK_INTERVAL,
+                                      is_healthy=lambda connection: connection.is_connected(),
+                                      prepared_cursor=lambda connection: connection.cursor(prepared=True),
+                                      statement_cache_size=self.statement_cache_size)
+                MySQLDriver.pools[key] = pool
+                # Log the pool counters (used to size the pool) and close it when the app exits
+                atexit.register(MySQLDriver.close_pool, pool)
+            return MySQLDriver.pools[key]
+
+    def execute(self, connection, sql, params=()):
+        """
+        Execute a query on a pooled connection, with its server-side prepared statement.
+
+        The statement is prepared the first time the connection runs the query, then only
+        executed with new parameters (see database.StatementCache), so the server does not
+        parse and plan the query again. Without a statement cache the query is sent as text.
+
+        Returns:
+        - tuple: The cursor the query was executed on, and whether it is a reused prepared
+          cursor (whose result must be read entirely and which must not be closed).
+        """
+        cursor = connection.execute_prepared(sql, params)
+        if cursor is not None:
+            return cursor, True
+        cursor = connection.cursor()
+        try:
+            cursor.execute(sql, params)
+        except Exception:
+            cursor.close()
+            raise
+        return cursor, False
+
+    @staticmethod
+    def close_pool(pool):
+        """
+        Log the counters of a connection pool and close its idle connections.
+        """
+        logging.info(f"MySQL connection pool stats: {pool.stats()}")
+        pool.close_all()
+
+
+class StudentRepository:
+    """
+    The data access API of the student records, independent of the user interface.
+
+    Every method opens (or checks out) a connection through the driver, runs its queries
+    and commits its writes before returning, so the methods can be called from any thread,
+    such as the worker threads of a DatabaseWorker.
+
+    Student records are (id, name, course, mobile) tuples.
+
+    Read results (pages, lookups, counts and searches) are served from a QueryCache until
+    a write of the repository invalidates them. Writes made by other processes are only
+    seen once the cached results expire (QUERY_CACHE_TTL).
+
+    Attributes:
+    - driver (SQLiteDriver or MySQLDriver): The driver giving access to the database.
+    - cache (QueryCache): The cache of the read results.
+    """
+
+    def __init__(self, driver, cache=None):
+        """
+        Initialize the StudentRepository object.
+
+        Args:
+        - driver (SQLiteDriver or MySQLDriver): The driver giving access to the database.
+        - cache (QueryCache): The cache of the read results. Defaults to None (a cache sized by the
+          QUERY_CACHE_* settings; pass QueryCache(max_entries=0) to disable caching).
+        """
+        self.driver = driver
+        if cache is None:
+            cache = QueryCache(max_entries=QUERY_CACHE_MAX_ENTRIES,
+                               max_bytes=int(QUERY_CACHE_MAX_MB * 1024 * 1024),
+                               ttl=QUERY_CACHE_TTL)
+        self.cache = cache
+
+    @property
+    def backend(self):
+        """
+        The backend of the driver, SQLITE_BACKEND or MYSQL_BACKEND.
+        """
+        return self.driver.backend
+
+    @property
+    def read_only(self):
+        """
+        Whether the database cannot be written to (a snapshot).
+        """
+        return self.driver.read_only
+
+    def run(self, query, params=(), fetch=None, commit=False, sql=None):
+        """
+        Run a single query on a connection of the driver.
+
+        Args:
+        - query (str): The name of the query in the driver's queries.
+        - params (tuple): The query parameters.
+        - fetch (str): "one" or "all" to return the fetched row(s). Defaults to None.
+        - commit (bool): Whether to commit the changes. Defaults to False.
+        - sql (str): The SQL text of a query built at run time, the name then only labels
+          its timings. Defaults to None (the driver's query of that name).
+
+        Returns:
+        - The fetched row(s) if fetch is given, otherwise the cursor's lastrowid.
+        """
+        sql = sql or self.driver.queries[query]
+        with timed("db.connect"):
+            connection = self.driver.connect()
+        with connection:
+            cursor = None
+            reused = False
+            try:
+                with timed(f"db.execute.{query}", sql, params):
+                    cursor, reused = self.driver.execute(connection, sql, params)
+                with timed(f"db.fetch.{query}", sql, params) as timer:
+                    if fetch == "one":
+                        # The whole result (a single row) is read, a reused prepared cursor must not keep unread rows
+                        rows = cursor.fetchall()
+                        result = rows[0] if rows else None
+                        timer.rows = int(result is not None)
+                    elif fetch == "all":
+                        result = cursor.fetchall()
+                        timer.rows = len(result)
+                    else:
+                        result = cursor.lastrowid
+                        timer.rows = cursor.rowcount
+                    if commit:
+                        connection.commit()
+                return result
+            finally:
+                if cursor is not None and not reused:
+                    cursor.close()
+
+    def cached(self, key, read):
+        """
+        Return the cached result for the key, or call read() and cache its result.
+
+        Args:
+        - key (tuple): The cache key (see QueryCache.make_key).
+        - read (callable): The function reading the result from the database.
+
+        Returns:
+        - The result. Lists are copied, so callers can modify them without altering the cache.
+        """
+        hit, result = self.cache.get(key)
+        if not hit:
+            # Taken before reading, so a result racing with a write is not cached
+            generation = self.cache.generation(STUDENTS_TABLE)
+            result = read()
+            self.cache.put(key, STUDENTS_TABLE, generation, result)
+        return list(result) if isinstance(result, list) else result
+
+    def read(self, query, params=(), fetch="all", sql=None):
+        """
+        Run a read query through the cache (see run).
+        """
+        sql = sql or self.driver.queries[query]
+        key = QueryCache.make_key(sql, params)
+        return self.cached(key, lambda: self.run(query, params, fetch=fetch, sql=sql))
+
+    def write(self, query, params):
+        """
+        Run and commit a write query, then invalidate the cached results (see run).
+        """
+        try:
+            return self.run(query, params, commit=True)
+        finally:
+            # After the commit: a read racing with the write is either dropped here or not cached at all
+            self.cache.invalidate(STUDENTS_TABLE)
+
+    def write_batch(self, writes):
+        """
+        Run many write queries in a single transaction, committed once (see write_queue.py).
+
+        Either every write is committed or, if one of them fails, none is.
+
+        Args:
+        - writes (list): The (query name, params) pairs of the writes, run in order.
+
+        Returns:
+        - list: The cursor's lastrowid after each write (the id of an inserted record).
+        """
+        with timed("db.connect"):
+            connection = self.driver.connect()
+        try:
+            with timed("db.write_batch", threshold_ms=None) as timer, connection:
+                timer.rows = len(writes)
+                results = []
+                for query, params in writes:
+                    cursor, reused = self.driver.execute(connection, self.driver.queries[query], params)
+                    try:
+                        results.append(cursor.lastrowid)
+                    finally:
+                        if not reused:
+                            cursor.close()
+                # A single commit (and disk sync) for the whole batch
+                connection.commit()
+                return results
+        finally:
+            self.cache.invalidate(STUDENTS_TABLE)
+
+    def cache_stats(self):
+        """
+        Return the counters of the result cache (hit rate, evictions, ...), to tune its settings.
+        """
+        return self.cache.stats()
+
+    def list(self, after_id=0, limit=TABLE_PAGE_SIZE):
+        """
+        Return a page of student records ordered by id (keyset pagination).
+
+        Args:
+        - after_id (int): The page starts right after this id. Defaults to 0 (the first page).
+        - limit (int): The maximum number of records. Defaults to TABLE_PAGE_SIZE.
+
+        Returns:
+        - list: The student records of the page.
+        """
+        return self.read("page", (after_id, limit))
+
+    def list_view(self, after=None, limit=TABLE_PAGE_SIZE, sort_column="id", descending=False, course=None):
+        """
+        Return a page of student records sorted by a column and filtered by course (keyset pagination).
+
+        Sorting and filtering run on the server, on indexed columns, so a page costs one
+        index range scan whatever the size of the table. Records with the same value of the
+        sort column are ordered by id. Sorted by id in increasing order without a filter,
+        this is list().
+
+        Args:
+        - after (tuple): The (sort column value, id) of the last record of the previous page.
+          Defaults to None (the first page).
+        - limit (int): The maximum number of records. Defaults to TABLE_PAGE_SIZE.
+        - sort_column (str): The column to sort by, one of SORT_COLUMNS. Defaults to "id".
+        - descending (bool): Whether to sort in decreasing order. Defaults to False.
+        - course (str): Only return the records of this course. Defaults to None (every course).
+
+        Returns:
+        - list: The student records of the page.
+
+        Raises:
+        - ValueError: If the column is not one of SORT_COLUMNS.
+        """
+        if sort_column not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort by {sort_column} (expected {', '.join(SORT_COLUMNS)})")
+        if sort_column == "id" and not descending and course is None:
+            return self.list(after[1] if after is not None else 0, limit)
+
+        placeholder = self.driver.placeholder
+        direction = "DESC" if descending else "ASC"
+        operator = "<" if descending else ">"
+        course_condition = STUDENTS_COURSE_CONDITION.format(placeholder=placeholder)
+        course_params = (course,) if course is not None else ()
+
+        if after is not None and sort_column != "id":
+            sql = GET_STUDENTS_VIEW_NEXT_PAGE_QUERY.format(
+                course=course_condition + " AND " if course is not None else "",
+                column=sort_column, operator=operator, direction=direction, placeholder=placeholder)
+            value, after_id = after
+            params = (*course_params, value, after_id, limit, *course_params, value, limit, limit)
+        else:
+            conditions = [course_condition] if course is not None else []
+            params = list(course_params)
+            if after is not None:
+                conditions.append(STUDENTS_AFTER_ID_CONDITION.format(operator=operator, placeholder=placeholder))
+                params.append(after[1])
+            params.append(limit)
+            sql = GET_STUDENTS_VIEW_PAGE_QUERY.format(
+                where=" WHERE " + " AND ".join(conditions) if conditions else "",
+                column=sort_column, direction=direction, placeholder=placeholder)
+        return self.read(f"view_page.{sort_column}", tuple(params), sql=sql)
+
+    def list_before(self, before_id=None, limit=TABLE_PAGE_SIZE):
+        """
+        Return the page of student records right before an id, ordered by id (keyset pagination backwards).
+
+        Together with list(), pages can be walked in both directions from any page, each
+        page costing one index range scan whatever its position:
+
+            next_page = repository.list(page[-1][0])
+            previous_page = repository.list_before(page[0][0])
+
+        Args:
+        - before_id (int): The page ends right before this id. Defaults to None (the last page).
+        - limit (int): The maximum number of records. Defaults to TABLE_PAGE_SIZE.
+
+        Returns:
+        - list: The student records of the page.
+        """
+        if before_id is None:
+            max_id = self.id_range()[1]
+            if max_id is None:
+                return []
+            before_id = max_id + 1
+        # Read backwards from the id, the page is returned in increasing id order like list()
+        page = self.read("page_before", (before_id, limit))
+        page.reverse()
+        return page
+
+    def list_at(self, position, limit=TABLE_PAGE_SIZE):
+        """
+        Return the page of student records at an approximate position in the table.
+
+        The position is turned into an id by interpolating between the smallest and the
+        largest id, instead of skipping rows with OFFSET, so jumping deep into the table
+        costs the same as reading the first page. Ids are given in increasing order, so the
+        position is exact as long as the deleted records are spread evenly. To jump to
+        page n of a table of `count` records, use the position n * limit / count.
+
+        Args:
+        - position (float): The position of the page, from 0.0 (the first page) to 1.0 (the last page).
+        - limit (int): The maximum number of records. Defaults to TABLE_PAGE_SIZE.
+
+        Returns:
+        - list: The student records of the page, a full page if the table has enough records.
+        """
+        min_id, max_id = self.id_range()
+        if min_id is None:
+            return []
+        position = min(max(position, 0.0), 1.0)
+        after_id = min_id - 1 + int(position * (max_id - min_id + 1))
+        page = self.list(after_id, limit)
+        if len(page) < limit and after_id >= min_id:
+            # Too close to the end for a full page: return the last page instead
+            page = self.list_before(max_id + 1, limit)
+        return page
+
+    def id_range(self):
+        """
+        Return the smallest and the largest id of the student records, (None, None) if there are none.
+        """
+        return tuple(self.read("id_range", fetch="one"))
+
+    def stream(self, after_id=0, limit=TABLE_PAGE_SIZE, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Yield the student records after an id, ordered by id, in chunks read as the caller iterates.
+
+        Unlike list(), the result set is never materialized: on MySQL the query runs on an
+        unbuffered cursor, so the server streams the rows and the client only holds the chunk
+        being read (a SQLite cursor steps through the rows on each fetchmany()). Streamed rows
+        are not cached. The connection is held until the generator is exhausted or closed.
+
+        Args:
+        - after_id (int): The records start right after this id. Defaults to 0 (the first record).
+        - limit (int): The maximum number of records. Defaults to TABLE_PAGE_SIZE.
+        - chunk_size (int): The maximum number of records per chunk. Defaults to STREAM_CHUNK_SIZE.
+
+        Yields:
+        - list: The next chunk of student records.
+        """
+        sql = self.driver.queries["page"]
+        params = (after_id, limit)
+        with timed("db.connect"):
+            connection = self.driver.connect()
+        with connection:
+            cursor = connection.cursor(buffered=False) if self.backend == MYSQL_BACKEND else connection.cursor()
+            exhausted = False
+            try:
+                with timed("db.execute.stream", sql, params):
+                    cursor.execute(sql, params)
+                while True:
+                    with timed("db.fetch.stream", sql, params) as timer:
+                        rows = cursor.fetchmany(chunk_size)
+                        timer.rows = len(rows)
+                    if not rows:
+                        exhausted = True
+                        break
+                    yield rows
+            finally:
+                if not exhausted and self.backend == MYSQL_BACKEND:
+                    # Closed early: the connection cannot run another query before the rest of the result is read
+                    connection.consume_results()
+                cursor.close()
+
+    def get(self, student_id):
+        """
+        Return the student record with the given id, or None if it does not exist.
+        """
+        return self.read("get", (student_id,), fetch="one")
+
+    def count(self):
+        """
+        Return the number of student records.
+        """
+        return self.read("count", fetch="one")[0]
+
+    def search(self, term, mode=EXACT_SEARCH, limit=SEARCH_RESULTS_LIMIT):
+        """
+        Search student records.
+
+        Args:
+        - term (str): The student name, or for the other modes a part of a name or phone number.
+        - mode (str): EXACT_SEARCH (records with this exact name, ordered by id), or PREFIX_SEARCH,
+          SUBSTRING_SEARCH or FUZZY_SEARCH (ranked, best match first). Defaults to EXACT_SEARCH.
+        - limit (int): The maximum number of ranked results. Defaults to SEARCH_RESULTS_LIMIT.
+
+        Returns:
+        - list: The matching student records.
+        """
+        if mode == EXACT_SEARCH:
+            return self.read("search", (term,))
+
+        def ranked_search():
+            with timed(f"db.search.{mode.lower()}", params=(term, limit)) as timer:
+                with self.driver.connect() as connection:
+                    students = search_students(connection, self.backend, term, mode, limit)
+                timer.rows = len(students)
+            return students
+
+        # The ranked searches run several queries, they are cached under the search parameters
+        return self.cached(("search", mode, term, limit), ranked_search)
+
+    def insert(self, name, course, mobile):
+        """
+        Insert a new student record.
+
+        Returns:
+        - int: The id generated by the database for the new student record.
+        """
+        return self.write("insert", (name, course, mobile))
+
+    def update(self, student_id, name, course, mobile):
+        """
+        Update the student record with the given id.
+        """
+        self.write("update", (name, course, mobile, student_id))
+
+    def delete(self, student_id):
+        """
+        Delete the student record with the given id.
+        """
+        self.write("delete", (student_id,))
+
+    def bulk_insert(self, students):
+        """
+        Insert many student records in a single transaction, without validating them.
+
+        Args:
+        - students (iterable): The (name, course, mobile) tuples to insert.
+
+        Returns:
+        - int: The number of inserted records.
+        """
+        # The bulk operations import their modules on first use, they are not needed to start the app
+        import importer
+
+        students = list(students)
+        try:
+            with timed("db.bulk_insert", threshold_ms=None) as timer, self.driver.connect() as connection:
+                timer.rows = len(students)
+                # Same batch insert as the importer (on SQLite, the full-text index is filled once for the batch)
+                importer.insert_batch(connection, self.backend, students)
+        finally:
+            self.cache.invalidate(STUDENTS_TABLE)
+        return len(students)
+
+    def bulk_import(self, path, batch_size=IMPORT_BATCH_SIZE, rejects_path=None, progress=None):
+        """
+        Validate and import the student records of a CSV or JSONL file (see importer.import_students).
+
+        Returns:
+        - dict: The import counters.
+        """
+        import importer
+
+        try:
+            with timed("db.bulk_import", threshold_ms=None) as timer, self.driver.connect() as connection:
+                result = importer.import_students(connection, self.backend, path,
+                                                  batch_size, rejects_path, progress)
+                timer.rows = result["rows"]
+                return result
+        finally:
+            self.cache.invalidate(STUDENTS_TABLE)
+
+    def bulk_export(self, path, fetch_size=EXPORT_FETCH_SIZE, progress=None):
+        """
+        Export all the student records to a CSV, JSONL, Parquet or SQLite snapshot file (see exporter.export_students).
+
+        Returns:
+        - dict: The export counters.
+        """
+        import exporter
+
+        with timed("db.bulk_export", threshold_ms=None) as timer, self.driver.connect() as connection:
+            result = exporter.export_students(connection, self.backend, path,
+                                              fetch_size, progress)
+            timer.rows = result["rows"]
+            return result
+
+    def migrate(self, target_version=None):
+        """
+        Apply the pending schema migrations (see migrations.migrate).
+
+        Returns:
+        - list: The schema versions applied.
+        """
+        if self.read_only:
+            # A snapshot is written with the latest schema and cannot be migrated
+            return []
+        try:
+            with timed("db.migrate", threshold_ms=None), self.driver.connect() as connection:
+                return migrations.migrate(connection, self.backend, target_version)
+        finally:
+            self.cache.invalidate(STUDENTS_TABLE)
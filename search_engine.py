@@ -0,0 +1,248 @@
+"""
+Prefix, substring and typo-tolerant (fuzzy) search of students by name and phone number.
+
+On SQLite the search is backed by the `students_fts` FTS5 table (trigram tokenizer),
+kept in sync with `students` by triggers; on MySQL by a FULLTEXT index using the ngram
+parser. Both are created by schema migration 3 (see migrations.py). Candidates found
+through the index are ranked in Python by how closely they match the search term.
+"""
+from difflib import SequenceMatcher
+from constants import (SQLITE_BACKEND, MYSQL_BACKEND, SEARCH_RESULTS_LIMIT,
+                       SEARCH_CANDIDATES_LIMIT, SEARCH_FUZZY_MIN_SCORE)
+
+
+EXACT_SEARCH = "Exact"
+PREFIX_SEARCH = "Prefix"
+SUBSTRING_SEARCH = "Substring"
+FUZZY_SEARCH = "Fuzzy"
+SEARCH_MODES = (EXACT_SEARCH, PREFIX_SEARCH, SUBSTRING_SEARCH, FUZZY_SEARCH)
+
+# The trigram tokenizer can only use its index for terms of at least 3 characters
+MIN_INDEXED_TERM_LENGTH = 3
+# Number of most selective trigrams of the term used to find fuzzy search candidates
+FUZZY_SELECTED_TRIGRAMS = 8
+# Length of the phone numbers (see validation.py)
+MOBILE_DIGITS = 8
+
+SEARCH_QUERIES = {
+    SQLITE_BACKEND: {
+        # Prefix of a name, through the b-tree index on name (names are stored title-cased)
+        "name_prefix": "SELECT * FROM students WHERE name >= ? AND name < ? ORDER BY name LIMIT ?",
+        # Prefix of a phone number, narrowed down by the trigram index of the mobile column
+        "mobile_prefix": """SELECT s.* FROM students_fts f JOIN students s ON s.id = f.rowid
+                            WHERE students_fts MATCH ? AND f.mobile LIKE ? LIMIT ?""",
+        # Prefix shorter than a trigram: ranges of the b-tree index on mobile, as numbers (the
+        # application database stores them as integers) and as text (snapshots, see exporter.py)
+        "short_mobile_prefix": """SELECT * FROM students
+                                  WHERE (mobile >= ? AND mobile < ?) OR (mobile >= ? AND mobile < ?) LIMIT ?""",
+        # Substring of a name or phone number (a quoted trigram phrase matches any substring)
+        "substring": """SELECT s.* FROM students_fts f JOIN students s ON s.id = f.rowid
+                        WHERE students_fts MATCH ? LIMIT ?""",
+        # Substring shorter than a trigram: the FTS table is scanned
+        "short_substring": """SELECT s.* FROM students_fts f JOIN students s ON s.id = f.rowid
+                              WHERE f.name LIKE ? OR f.mobile LIKE ? LIMIT ?""",
+        # Number of rows containing each trigram, to pick the most selective ones
+        "trigram_counts": "SELECT term, doc FROM students_fts_vocab WHERE term IN ({placeholders})",
+        # Rows sharing enough trigrams with the term
+        "fuzzy": """SELECT s.* FROM students_fts f JOIN students s ON s.id = f.rowid
+                    WHERE students_fts MATCH ? LIMIT ?""",
+    },
+    MYSQL_BACKEND: {
+        # LIKE 'term%' is resolved through the b-tree indexes on name and mobile
+        "name_prefix": "SELECT * FROM students WHERE name LIKE %s ORDER BY name LIMIT %s",
+        "mobile_prefix": "SELECT * FROM students WHERE mobile LIKE %s LIMIT %s",
+        # An ngram phrase match, false positives are removed in Python
+        "substring": """SELECT * FROM students
+                        WHERE MATCH(name, mobile) AGAINST (%s IN BOOLEAN MODE) LIMIT %s""",
+        "short_substring": "SELECT * FROM students WHERE name LIKE %s OR mobile LIKE %s LIMIT %s",
+        # Natural language mode returns the rows sharing the most ngrams first
+        "fuzzy": """SELECT * FROM students
+                    WHERE MATCH(name, mobile) AGAINST (%s IN NATURAL LANGUAGE MODE) LIMIT %s""",
+    },
+}
+
+
+def quote(term):
+    """
+    Return the term as a quoted FTS5 string (a phrase, matched literally).
+    """
+    return '"' + term.replace('"', '""') + '"'
+
+
+def escape_like(term):
+    """
+    Escape the LIKE wildcards of a term for MySQL, where the backslash is the default escape character.
+    """
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def trigrams(term):
+    """
+    Return the distinct trigrams of a term, lower-cased.
+    """
+    term = term.lower()
+    return sorted({term[i:i + 3] for i in range(len(term) - 2)})
+
+
+def similarity(term, field):
+    """
+    Return how closely a field matches a (lower-cased) search term.
+
+    Exact matches score 3, prefix matches between 2 and 3, substring matches between 1 and 2,
+    other strings their similarity ratio between 0 and 1 (0 when clearly below SEARCH_FUZZY_MIN_SCORE).
+    """
+    if field == term:
+        return 3.0
+    if field.startswith(term):
+        return 2.0 + len(term) / len(field)
+    if term in field:
+        return 1.0 + len(term) / len(field)
+
+    matcher = SequenceMatcher(None, term, field)
+    # Cheap upper bounds of the ratio first, the full ratio is the expensive part of the ranking
+    if (matcher.real_quick_ratio() < SEARCH_FUZZY_MIN_SCORE or
+            matcher.quick_ratio() < SEARCH_FUZZY_MIN_SCORE):
+        return 0.0
+    return matcher.ratio()
+
+
+def score(term, student):
+    """
+    Return how closely a student record matches a search term.
+
+    A term containing a space is compared with the whole name, a single word with each
+    word of the name too, and a term containing digits with the phone number.
+    """
+    term = term.lower()
+    name = str(student[1]).lower()
+    fields = [name] if " " in term else [name, *name.split()]
+    if any(char.isdigit() for char in term):
+        fields.append(str(student[3]))
+    return max(similarity(term, field) for field in fields)
+
+
+def prefix_candidates(cursor, backend, term):
+    """
+    Return the students whose name or phone number may start with the term.
+    """
+    queries = SEARCH_QUERIES[backend]
+    candidates = []
+
+    if backend == MYSQL_BACKEND:
+        cursor.execute(queries["name_prefix"], (escape_like(term) + "%", SEARCH_CANDIDATES_LIMIT))
+        candidates += cursor.fetchall()
+        if term.isdigit():
+            cursor.execute(queries["mobile_prefix"], (escape_like(term) + "%", SEARCH_CANDIDATES_LIMIT))
+            candidates += cursor.fetchall()
+        return candidates
+
+    # Names starting with the term are the range [term, term + highest character)
+    title_term = term.title()
+    cursor.execute(queries["name_prefix"], (title_term, title_term + "\U0010ffff", SEARCH_CANDIDATES_LIMIT))
+    candidates += cursor.fetchall()
+    if term.isdigit() and len(term) >= MIN_INDEXED_TERM_LENGTH:
+        cursor.execute(queries["mobile_prefix"], ("mobile : " + quote(term), term + "%", SEARCH_CANDIDATES_LIMIT))
+        candidates += cursor.fetchall()
+    elif term.isdigit():
+        # The numbers starting with the term, e.g. [71000000, 72000000) for "71", and the
+        # text starting with it, ["71", "72"): either range finds nothing more in the other column type
+        scale = 10 ** (MOBILE_DIGITS - len(term))
+        next_term = term[:-1] + chr(ord(term[-1]) + 1)
+        cursor.execute(queries["short_mobile_prefix"], (int(term) * scale, (int(term) + 1) * scale,
+                                                        term, next_term, SEARCH_CANDIDATES_LIMIT))
+        candidates += cursor.fetchall()
+    return candidates
+
+
+def fuzzy_candidates(cursor, backend, term):
+    """
+    Return the students whose name or phone number shares enough grams with the term.
+
+    On SQLite, the candidates must contain at least two of the most selective trigrams of the
+    term that exist in the index. A typo only breaks the (at most 3) trigrams it touches, and the
+    trigrams it creates are usually absent from the index or rare, so the record meant by the user
+    still shares two of the selected trigrams while most unrelated records do not.
+    """
+    queries = SEARCH_QUERIES[backend]
+
+    if backend == MYSQL_BACKEND:
+        cursor.execute(queries["fuzzy"], (term, SEARCH_CANDIDATES_LIMIT))
+        return cursor.fetchall()
+
+    grams = trigrams(term)
+    if not grams:
+        return []
+
+    cursor.execute(queries["trigram_counts"].format(placeholders=", ".join("?" * len(grams))), grams)
+    # Most selective trigrams first (trigrams absent from the index are not returned)
+    existing = [gram for gram, _ in sorted(cursor.fetchall(), key=lambda item: item[1])]
+    selected = existing[:FUZZY_SELECTED_TRIGRAMS]
+    if len(selected) < 2:
+        match = " OR ".join(quote(gram) for gram in selected)
+    else:
+        match = " OR ".join(f"({quote(first)} AND {quote(second)})"
+                            for i, first in enumerate(selected) for second in selected[i + 1:])
+    if not match:
+        return []
+
+    cursor.execute(queries["fuzzy"], (match, SEARCH_CANDIDATES_LIMIT))
+    return cursor.fetchall()
+
+
+def search_students(connection, backend, term, mode, limit=SEARCH_RESULTS_LIMIT):
+    """
+    Search students by name or phone number and return them ranked, best match first.
+
+    Args:
+        connection: An open SQLite or MySQL connection.
+        backend (str): SQLITE_BACKEND or MYSQL_BACKEND.
+        term (str): The search term.
+        mode (str): PREFIX_SEARCH, SUBSTRING_SEARCH or FUZZY_SEARCH.
+        limit (int): The maximum number of results. Defaults to SEARCH_RESULTS_LIMIT.
+
+    Returns:
+        list: The matching student records (id, name, course, mobile), best match first.
+    """
+    term = term.strip()
+    if not term:
+        return []
+
+    queries = SEARCH_QUERIES[backend]
+    indexed = len(term) >= MIN_INDEXED_TERM_LENGTH
+    cursor = connection.cursor()
+
+    try:
+        if mode == PREFIX_SEARCH:
+            candidates = prefix_candidates(cursor, backend, term)
+            lowered = term.lower()
+            candidates = [student for student in candidates
+                          if str(student[1]).lower().startswith(lowered) or str(student[3]).startswith(term)]
+
+        elif mode == SUBSTRING_SEARCH:
+            if indexed:
+                # A quoted phrase (FTS5 and MySQL boolean mode) matches the consecutive grams of the term
+                phrase = quote(term) if backend == SQLITE_BACKEND else '"' + term.replace('"', " ") + '"'
+                cursor.execute(queries["substring"], (phrase, SEARCH_CANDIDATES_LIMIT))
+            else:
+                pattern = "%" + (escape_like(term) if backend == MYSQL_BACKEND else term) + "%"
+                cursor.execute(queries["short_substring"], (pattern, pattern, SEARCH_CANDIDATES_LIMIT))
+            candidates = cursor.fetchall()
+            lowered = term.lower()
+            candidates = [student for student in candidates
+                          if lowered in str(student[1]).lower() or term in str(student[3])]
+
+        elif mode == FUZZY_SEARCH:
+            candidates = fuzzy_candidates(cursor, backend, term)
+
+        else:
+            raise ValueError(f"Unsupported search mode: {mode}")
+
+    finally:
+        cursor.close()
+
+    # Rank the candidates, fuzzy candidates must also be similar enough to the term
+    ranked = [(score(term, student), student) for student in candidates]
+    if mode == FUZZY_SEARCH:
+        ranked = [item for item in ranked if item[0] >= SEARCH_FUZZY_MIN_SCORE]
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    return [student for _, student in ranked[:limit]]
@@ -0,0 +1,536 @@
+import time
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QColor, QFont
+from constants import TABLE_HEADERS, TABLE_PAGE_SIZE, SORT_COLUMNS
+from instrumentation import metrics, timed_ui
+from record_store import StudentStore
+
+
+def read_chunks(stream_rows, last_id, limit, chunk):
+    """
+    Read streamed rows on a worker thread and hand each chunk to the GUI thread.
+
+    Args:
+        stream_rows (callable): The function yielding the chunks of rows (see StudentTableModel).
+        last_id (int): The rows start right after this id.
+        limit (int): The maximum number of rows.
+        chunk (callable): Delivers a chunk to the GUI thread, returns False once the fetch is superseded.
+
+    Returns:
+        int: The number of rows read.
+    """
+    fetched = 0
+    chunks = stream_rows(last_id, limit)
+    try:
+        for rows in chunks:
+            fetched += len(rows)
+            if not chunk(rows):
+                # Superseded (e.g. by a reload), stop reading
+                break
+    finally:
+        # Releases the database cursor and connection right away when stopped early
+        chunks.close()
+    return fetched
+
+
+class StudentTableModel(QAbstractTableModel):
+    """
+    Table model that lazily fetches student records from the database.
+
+    Instead of loading the whole students table at once, the model pulls rows
+    in pages (ordered by id) only when the view asks for more, i.e. when the
+    user scrolls towards the end of the rows already loaded. The first screen
+    therefore costs a single page query whatever the table size.
+
+    When a DatabaseWorker is given, pages are fetched on a worker thread and
+    appended once they arrive, so scrolling never blocks the GUI thread.
+
+    The rows can be sorted by any column (clicking a header of the view calls sort())
+    and filtered by course (set_course()). Both run on the database server: the model
+    drops its rows and only fetches the first page in the new order, the next pages
+    following as the user scrolls, so sorting and filtering cost a page query whatever
+    the size of the table.
+
+    Fetches of more than a page (fetch_through) are streamed when a stream_rows
+    function is given: the rows are read in chunks and each chunk is appended as
+    soon as it is read, so the rows show up progressively and the database client
+    never buffers the whole result.
+
+    Attributes:
+    - fetch_page (callable): A function taking (after, limit, sort_column, descending, course)
+      and returning the next page of student rows in that order after the (sort value, id)
+      key `after` (None for the first page), like StudentRepository.list_view.
+    - worker (DatabaseWorker): The worker running the page queries, or None to run them synchronously.
+    - page_size (int): The number of rows to fetch per page.
+    - stream_rows (callable): A function taking (last_id, limit) and yielding chunks of the
+      student rows with an id greater than last_id, or None to fetch them as a single page.
+    - sort_column (int): The column the rows are sorted by (0, the id, by default).
+    - descending (bool): Whether the rows are sorted in decreasing order.
+    - course (str): The course of the rows shown, or None for every course.
+    - pending (dict): The number of writes not committed yet (see write_queue.py) by student id,
+      their rows are shown in grey italics.
+
+    Signals:
+    - fetch_failed (object): Emitted with the exception raised while fetching a page.
+    - view_reset (): Emitted when the model went back to the unfiltered id order by itself (see fetch_through).
+    """
+    fetch_failed = pyqtSignal(object)
+    view_reset = pyqtSignal()
+
+    def __init__(self, fetch_page, worker=None, page_size=TABLE_PAGE_SIZE, stream_rows=None, parent=None):
+        """
+        Initialize the StudentTableModel object.
+
+        Args:
+        - fetch_page (callable): The function used to fetch a page of rows.
+        - worker (DatabaseWorker): The worker running the page queries. Defaults to None (synchronous).
+        - page_size (int): The number of rows to fetch per page. Defaults to TABLE_PAGE_SIZE.
+        - stream_rows (callable): The function used to stream many rows. Defaults to None (single page).
+        - parent (QObject): The parent object of the model.
+        """
+        super().__init__(parent)
+        self.fetch_page = fetch_page
+        self.worker = worker
+        self.page_size = page_size
+        self.stream_rows = stream_rows
+        # Key of the page queries in the worker, a reload supersedes the page query in flight
+        self.fetch_key = f"fetch_students_page_{id(self)}"
+
+        # Order and filter of the rows, applied by the database
+        self.sort_column = 0
+        self.descending = False
+        self.course = None
+
+        # Rows fetched so far, stored column by column with their index by name (see record_store.py)
+        self.rows = StudentStore()
+        # Id of the last fetched row (in id order, the streamed fetches continue after it)
+        self.last_id = 0
+        # (sort value, id) of the last fetched row, the key of the next page, None before the first page
+        self.last_key = None
+        # Students with queued writes, shown as pending until the writes are committed
+        self.pending = {}
+        # Becomes True once the database returned a page smaller than page_size
+        self.exhausted = False
+        # Becomes True when a page query fails, no more pages are fetched until the next reload
+        self.failed = False
+        # True while a page query is running on the worker
+        self.fetching = False
+        # When the page query in flight was requested, to time the page load from request to display
+        self.fetch_started = None
+
+    def rowCount(self, parent=QModelIndex()):
+        """
+        Return the number of rows fetched so far.
+        """
+        # Table models have no children, only the root index has rows
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        """
+        Return the number of columns of the table.
+        """
+        if parent.isValid():
+            return 0
+        return len(TABLE_HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        """
+        Return the data stored under the given role for the item at index.
+        """
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            # Cells are converted to text only when the view actually paints them
+            return str(self.rows.value(index.row(), index.column()))
+        if self.pending and self.rows.value(index.row(), 0) in self.pending:
+            if role == Qt.ItemDataRole.FontRole:
+                font = QFont()
+                font.setItalic(True)
+                return font
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return QColor(Qt.GlobalColor.gray)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        """
+        Return the header labels of the table.
+        """
+        if (role == Qt.ItemDataRole.DisplayRole and
+                orientation == Qt.Orientation.Horizontal):
+            return TABLE_HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        """
+        Return True if there may be more rows left in the database.
+        """
+        if parent.isValid():
+            return False
+        return not self.exhausted and not self.failed and not self.fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        """
+        Fetch the next page of rows from the database and append it to the model.
+        """
+        if parent.isValid() or self.exhausted or self.failed or self.fetching:
+            return
+
+        self.fetch_rows(self.page_size)
+
+    def fetch_rows(self, limit, on_done=None):
+        """
+        Fetch the next `limit` rows from the database and append them to the model.
+
+        Args:
+            limit (int): The maximum number of rows to fetch.
+            on_done (callable): Called without arguments once the rows have been appended.
+        """
+        self.fetching = True
+        self.fetch_started = time.perf_counter()
+
+        if self.stream_rows is not None and limit > self.page_size:
+            self.stream(limit, on_done)
+        elif self.worker is None:
+            try:
+                page = self.fetch_page(self.last_key, limit, *self.view())
+            except Exception as e:
+                self.page_failed(e)
+            else:
+                self.add_page(page, limit, on_done)
+        else:
+            self.worker.submit(self.fetch_page, self.last_key, limit, *self.view(),
+                               on_success=lambda page: self.add_page(
+                                   page, limit, on_done),
+                               on_error=self.page_failed,
+                               key=self.fetch_key,
+                               message="Loading students...")
+
+    def fetch_through(self, student_id, on_done):
+        """
+        Fetch rows until the row with the given id is part of the model, then call on_done.
+
+        Args:
+            student_id (int): The id of the student record that must be fetched.
+            on_done (callable): Called without arguments once the row is fetched (or the table is exhausted).
+        """
+        if not self.in_id_order():
+            # Rows can only be fetched up to an id in id order: show every student in id order first
+            self.set_view(0, False, None)
+            self.view_reset.emit()
+
+        if self.exhausted or student_id <= self.last_id:
+            on_done()
+            return
+
+        # Supersede a page query in flight, it would fetch from the same last_id
+        if self.fetching and self.worker is not None:
+            self.worker.cancel(self.fetch_key)
+
+        # There are at most (student_id - last_id) rows up to the wanted id
+        self.fetch_rows(student_id - self.last_id, on_done)
+
+    def stream(self, limit, on_done=None):
+        """
+        Stream the next `limit` rows from the database, appending each chunk as soon as it is read.
+        """
+        if self.worker is None:
+            try:
+                fetched = 0
+                for rows in self.stream_rows(self.last_id, limit):
+                    self.append_rows(rows)
+                    fetched += len(rows)
+            except Exception as e:
+                self.page_failed(e)
+            else:
+                self.stream_done(fetched, limit, on_done)
+        else:
+            self.worker.submit(read_chunks, self.stream_rows, self.last_id, limit,
+                               on_chunk=self.append_rows,
+                               on_success=lambda fetched: self.stream_done(
+                                   fetched, limit, on_done),
+                               on_error=self.page_failed,
+                               key=self.fetch_key,
+                               message="Loading students...")
+
+    def stream_done(self, fetched, limit, on_done=None):
+        """
+        Finish a streamed fetch once all its chunks have been appended.
+        """
+        self.fetching = False
+        # The database answered again, scrolling fetches the next pages
+        self.failed = False
+
+        # Fewer rows than asked for means the end of the table has been reached
+        if fetched < limit:
+            self.exhausted = True
+
+        # Whole streamed load, from the request to the last chunk in the model
+        metrics.record("ui.table_stream_load", time.perf_counter() - self.fetch_started, fetched)
+
+        if on_done is not None:
+            on_done()
+
+    def add_page(self, page, limit, on_done=None):
+        """
+        Append a page of rows fetched from the database to the model.
+        """
+        self.fetching = False
+        # The database answered again, scrolling fetches the next pages
+        self.failed = False
+
+        # A short page means the end of the table has been reached
+        if len(page) < limit:
+            self.exhausted = True
+
+        if page:
+            self.append_rows(page)
+            # Whole page load, from the request to the rows in the model
+            metrics.record("ui.table_page_load", time.perf_counter() - self.fetch_started, len(page))
+
+        if on_done is not None:
+            on_done()
+
+    def append_rows(self, rows):
+        """
+        Append rows fetched from the database (a page or a streamed chunk) to the model.
+        """
+        # Time spent on the GUI thread inserting the rows in the model (and laying them out in the view)
+        with timed_ui("ui.table_populate") as timer:
+            timer.rows = len(rows)
+            first_row = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first_row,
+                                 first_row + len(rows) - 1)
+            self.rows.extend(rows)
+            self.endInsertRows()
+
+        # The id is the first column of each row
+        self.last_id = rows[-1][0]
+        self.last_key = self.sort_key(rows[-1])
+
+    def page_failed(self, error):
+        """
+        Stop fetching after a failed page query and report the error.
+        """
+        self.fetching = False
+        # Do not retry on every scroll, the next reload() tries again. The table is not
+        # exhausted though: the rows after the last fetched one were never read
+        self.failed = True
+        self.fetch_failed.emit(error)
+
+    def reload(self):
+        """
+        Drop all fetched rows and fetch the first page again.
+        """
+        # Drop the result of a page query still in flight, it belongs to the rows being discarded
+        if self.worker is not None:
+            self.worker.cancel(self.fetch_key)
+
+        self.beginResetModel()
+        # Rows not fetched in id order are looked up by a linear search
+        self.rows = StudentStore(ordered=self.in_id_order())
+        self.last_id = 0
+        self.last_key = None
+        self.exhausted = False
+        self.failed = False
+        self.fetching = False
+        self.endResetModel()
+
+        # Fetch the first page right away so the first screen is filled
+        self.fetchMore()
+
+    def view(self):
+        """
+        Return the (sort column name, descending, course) order and filter of the rows, as passed to fetch_page.
+        """
+        return SORT_COLUMNS[self.sort_column], self.descending, self.course
+
+    def in_id_order(self):
+        """
+        Return True if the rows are every student record in increasing id order (the default view).
+        """
+        return self.sort_column == 0 and not self.descending and self.course is None
+
+    def set_view(self, sort_column, descending, course):
+        """
+        Sort and filter the rows on the database server, fetching the first page in the new order.
+
+        Args:
+            sort_column (int): The column to sort by.
+            descending (bool): Whether to sort in decreasing order.
+            course (str): Only show the records of this course, None for every course.
+        """
+        if (sort_column, descending, course) == (self.sort_column, self.descending, self.course):
+            return
+        self.sort_column = sort_column
+        self.descending = descending
+        self.course = course
+        self.reload()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """
+        Sort the rows by a column, called by the view when a header is clicked.
+        """
+        self.set_view(column, order == Qt.SortOrder.DescendingOrder, self.course)
+
+    def set_course(self, course):
+        """
+        Only show the records of a course, None for every course.
+        """
+        self.set_view(self.sort_column, self.descending, course)
+
+    def sort_key(self, student):
+        """
+        Return the (sort value, id) key of a student record in the order of the rows.
+        """
+        value = student[self.sort_column]
+        if self.sort_column == 3:
+            # Mobile numbers are ints on SQLite (the INTEGER column drops leading zeros, the
+            # server orders them numerically) and 8-digit strings on MySQL and in the records
+            # patched by the dialogs: padded back to 8 digits, their text has the server's order
+            value = str(value).zfill(8)
+        return value, student[0]
+
+    def student_at(self, row_i):
+        """
+        Return the student record (id, name, course, mobile) at the given row.
+        """
+        return self.rows[row_i]
+
+    def rows_named(self, name):
+        """
+        Return the indexes, in increasing order, of the fetched rows of the students with the given name.
+
+        The lookup is a hash lookup in the name index followed by a binary search per matching id.
+        """
+        return sorted(self.row_of(student_id) for student_id in self.rows.ids_named(name))
+
+    def append_student(self, student):
+        """
+        Add a newly inserted student record to the model.
+
+        In id order new records get the greatest id, so if the model has not reached the
+        end of the table yet the record is simply left to be fetched with the next pages.
+
+        Args:
+            student (tuple): The student record (id, name, course, mobile).
+        """
+        self.place_student(student)
+
+    def row_of(self, student_id):
+        """
+        Return the row index of the student record with the given id, or None if it is not fetched.
+
+        In id order (pages are fetched by increasing id and new records get the greatest
+        id) the lookup is a binary search, in the other orders a linear search of the ids.
+        """
+        return self.rows.index_of(student_id)
+
+    def update_student(self, student):
+        """
+        Replace the fetched student record having the same id and refresh only that row in the view.
+
+        If the update moves the record in the order of the rows (or out of the course
+        shown), the record is moved (or removed) instead.
+
+        Args:
+            student (tuple): The updated student record (id, name, course, mobile).
+        """
+        self.place_student(student)
+
+    def place_student(self, student):
+        """
+        Put a new or updated student record at its place in the order of the rows.
+        """
+        row_i = self.row_of(student[0])
+        new_row_i = self.insertion_row(student, skip=row_i)
+
+        if row_i is not None and new_row_i == row_i:
+            self.rows[row_i] = student
+            self.dataChanged.emit(self.index(row_i, 0),
+                                  self.index(row_i, self.columnCount() - 1))
+            return
+
+        if row_i is not None:
+            self.beginRemoveRows(QModelIndex(), row_i, row_i)
+            del self.rows[row_i]
+            self.endRemoveRows()
+        if new_row_i is not None:
+            self.beginInsertRows(QModelIndex(), new_row_i, new_row_i)
+            self.rows.insert(new_row_i, student)
+            self.endInsertRows()
+
+    def insertion_row(self, student, skip=None):
+        """
+        Return the row where a student record goes in the order of the rows, or None if it is not shown.
+
+        Records of another course than the one shown are not shown, nor are records sorted
+        after the last fetched row: the next pages will fetch them.
+
+        Args:
+            student (tuple): The student record (id, name, course, mobile).
+            skip (int): A row left out of the count (the current row of an updated record). Defaults to None.
+        """
+        if self.course is not None and student[2] != self.course:
+            return None
+        key = self.sort_key(student)
+        if not self.exhausted and (self.last_key is None or self.comes_before(self.last_key, key)):
+            return None
+
+        # Binary search of the fetched rows, which are in the order of the view
+        low, high = 0, len(self.rows) - (skip is not None)
+        while low < high:
+            middle = (low + high) // 2
+            row_i = middle + 1 if skip is not None and middle >= skip else middle
+            if self.comes_before(self.sort_key(self.rows[row_i]), key):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def comes_before(self, key, other_key):
+        """
+        Return True if the (sort value, id) key comes before the other one in the order of the rows.
+        """
+        return other_key < key if self.descending else key < other_key
+
+    def set_pending(self, student_id, pending):
+        """
+        Mark (or unmark) a write of a student record as not committed yet, and refresh its row.
+
+        A record stays pending until every write queued for it is committed.
+
+        Args:
+            student_id (int): The id of the student record.
+            pending (bool): True when a write is queued, False when a queued write is committed (or failed).
+
+        Returns:
+            int: The number of writes of the record still queued.
+        """
+        count = self.pending.get(student_id, 0) + (1 if pending else -1)
+        if count > 0:
+            self.pending[student_id] = count
+        else:
+            self.pending.pop(student_id, None)
+
+        row_i = self.row_of(student_id)
+        if row_i is not None:
+            self.dataChanged.emit(self.index(row_i, 0),
+                                  self.index(row_i, self.columnCount() - 1))
+        return max(count, 0)
+
+    def remove_student(self, student_id):
+        """
+        Remove the student record with the given id from the model.
+
+        Args:
+            student_id (int): The id of the deleted student record.
+        """
+        row_i = self.row_of(student_id)
+        if row_i is None:
+            return
+
+        self.beginRemoveRows(QModelIndex(), row_i, row_i)
+        del self.rows[row_i]
+        self.endRemoveRows()
@@ -1,60 +1,24 @@
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QItemSelection, QItemSelectionModel
 from PyQt6.QtWidgets import (QMainWindow, QLineEdit, QPushButton,
-                             QTableWidget, QTableWidgetItem, QDialog,
+                             QTableView, QDialog,
                              QComboBox, QVBoxLayout, QMessageBox,
                              QToolBar, QAbstractItemView, QStatusBar,
-                             QLabel, QGridLayout)
+                             QLabel, QGridLayout, QProgressBar,
+                             QListWidget, QListWidgetItem, QFileDialog)
 from PyQt6.QtGui import QAction, QIcon
-import mysql.connector
+import json
 import logging
-from app_logging import handle_logging
-import re
+from pathlib import Path
+from instrumentation import metrics, timed_ui
+from backends import create_repository
+from table_model import StudentTableModel
+from db_worker import DatabaseWorker
+from write_queue import WriteBehindQueue
+from search_engine import SEARCH_MODES, EXACT_SEARCH
+from validation import validate_student
 from constants import *
 
 
-# Set up logging using the custom handler
-handle_logging()
-
-
-class DatabaseConnection:
-    """
-    A class to manage MySQL database connections.
-    """
-
-    def __init__(self, host=HOST, port=PORT, user=USER, password=PASSWORD, database=DATABASE):
-        """
-        Initialize the DatabaseConnection object with default connection parameters.
-
-        Args:
-        - host (str): The hostname or IP address of the MySQL server.
-        - port (int): The port number of the MySQL server.
-        - user (str): The username used to authenticate with the MySQL server.
-        - password (str): The password used to authenticate with the MySQL server.
-        - database (str): The name of the MySQL database to connect to.
-        """
-        self.host = host
-        self.port = port
-        self.user = user
-        self.password = password
-        self.database = database
-
-    def connect(self):
-        """
-        Establish a connection to the MySQL database.
-
-        Returns:
-        - connection (mysql.connector.connection.MySQLConnection):
-            A connection object representing the database connection.
-        """
-        # Establish a connection to the MySQL database using the specified parameters
-        connection = mysql.connector.connect(host=self.host,
-                                             port=self.port,
-                                             user=self.user,
-                                             password=self.password,
-                                             database=self.database)
-        return connection
-
-
 # Define the main window class
 class MainWindow(QMainWindow):
     """
@@ -65,12 +29,17 @@ class MainWindow(QMainWindow):
 
     """
 
-    def __init__(self):
+    def __init__(self, repository=None, write_behind=WRITE_BEHIND):
         """
         Initialize the main window.
 
         This method initializes the main window and sets up the user interface.
 
+        Args:
+            repository (StudentRepository): The repository giving access to the student records.
+                Defaults to None (a repository on the configured backend, see backends.py).
+            write_behind (bool): Whether to queue the inserts and updates and commit them in
+                batches (see write_queue.py). Defaults to WRITE_BEHIND.
         """
         super().__init__()
 
@@ -81,7 +50,7 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Student Management System")
 
         # Create menu items for File and Help
-        file_menu_item = self.menuBar().addMenu("&File")        
+        file_menu_item = self.menuBar().addMenu("&File")
         edit_menu_item = self.menuBar().addMenu("&Edit")
         help_menu_item = self.menuBar().addMenu("&Help")
 
@@ -91,6 +60,14 @@ class MainWindow(QMainWindow):
         add_student_action.triggered.connect(self.insert)
         file_menu_item.addAction(add_student_action)
 
+        import_students_action = QAction("Import Students...", self)
+        import_students_action.triggered.connect(self.import_students)
+        file_menu_item.addAction(import_students_action)
+
+        export_students_action = QAction("Export Students...", self)
+        export_students_action.triggered.connect(self.export_students)
+        file_menu_item.addAction(export_students_action)
+
         about_action = QAction("About", self)
         about_action.triggered.connect(self.about)
         help_menu_item.addAction(about_action)
@@ -106,19 +83,43 @@ class MainWindow(QMainWindow):
         clear_selection_action.triggered.connect(self.clear_selection)
         edit_menu_item.addAction(clear_selection_action)
 
-        # Create a table widget for displaying student data
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(TABLE_HEADERS)
+        # Create the repository giving access to the student records of the configured database
+        self.repository = repository or create_repository()
+
+        # A read-only snapshot cannot be edited: disable the actions writing to the database
+        if self.repository.read_only:
+            add_student_action.setEnabled(False)
+            import_students_action.setEnabled(False)
+            self.setWindowTitle("Student Management System (read-only snapshot)")
+
+        # Create a worker running the database calls off the GUI thread
+        self.worker = DatabaseWorker(parent=self)
+
+        # In write-behind mode, queue the inserts and updates and commit them in batches
+        self.write_queue = None
+        if write_behind and not self.repository.read_only:
+            self.write_queue = WriteBehindQueue(self.repository)
+        # Number of queued writes not acknowledged yet
+        self.pending_writes = 0
+        # Ids of the student records with a failed queued write, re-read once they have no write queued
+        self.failed_writes = set()
+
+        # Create a table model fetching student data lazily page by page (in the background), and a table view displaying it
+        self.model = StudentTableModel(self.repository.list_view, worker=self.worker,
+                                       stream_rows=self.repository.stream, parent=self)
+        self.model.fetch_failed.connect(self.table_load_failed)
+        self.model.view_reset.connect(self.show_view)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.verticalHeader().setVisible(False)  # Hide the indexes column
+        # Sort by the clicked header on the database server (the model re-fetches the first page in the new order)
+        self.table.horizontalHeader().setSortIndicator(0, Qt.SortOrder.AscendingOrder)
+        self.table.setSortingEnabled(True)
         # Set the table to read-only and not editable
         self.table.setEditTriggers(
             QAbstractItemView.EditTrigger.NoEditTriggers)
         # Detect a cell clicked in the table
-        self.table.cellClicked.connect(self.cell_clicked)
-
-        # Load table data initially
-        self.load_table_data()
+        self.table.clicked.connect(self.cell_clicked)
 
         # Set the central widget of the main window to the table widget
         self.setCentralWidget(self.table)
@@ -130,6 +131,13 @@ class MainWindow(QMainWindow):
         toolbar.addAction(search_student_action)
         toolbar.addAction(clear_selection_action)
 
+        # Add a course filter to the toolbar, applied by the database server
+        self.course_filter = QComboBox()
+        self.course_filter.addItems([ALL_COURSES] + COURSES[1:])
+        self.course_filter.currentIndexChanged.connect(self.filter_course)
+        toolbar.addSeparator()
+        toolbar.addWidget(self.course_filter)
+
         # Add the toolbar to the main window
         self.addToolBar(toolbar)
 
@@ -137,77 +145,285 @@ class MainWindow(QMainWindow):
         self.statusbar = QStatusBar()
         self.setStatusBar(self.statusbar)
 
+        # Add a label and a busy indicator to the status bar, shown while database calls run in the background
+        self.progress_label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)  # A range of (0, 0) makes the progress bar a busy indicator
+        self.progress_bar.setFixedWidth(100)
+        self.statusbar.addPermanentWidget(self.progress_label)
+        self.statusbar.addPermanentWidget(self.progress_bar)
+        self.show_progress("")
+
+        # Add a label to the status bar counting the queued writes not committed yet (write-behind mode)
+        self.pending_label = QLabel()
+        self.statusbar.addPermanentWidget(self.pending_label)
+        self.show_pending_writes()
+        self.worker.status_changed.connect(self.show_progress)
+
+        # Bring the database schema up to date in the background, then load table data initially
+        self.worker.submit(self.repository.migrate,
+                           on_success=lambda applied: self.load_table_data(),
+                           on_error=self.migration_failed,
+                           message="Updating database schema...")
+
     def load_table_data(self):
         """
         Load data from the database and populate the table with it.
 
-        This method connects to the MySQL database, executes a query to retrieve
-        all student records, and populates the table widget with the fetched data.
+        This method resets the table model, which fetches the first page of student
+        records from the database. The next pages are fetched lazily by the
+        model only when the user scrolls down the table.
 
         """
-        # Create a DatabaseConnection instance
-        db_connection = DatabaseConnection()
+        # Drop the rows fetched so far and fetch the first page again
+        self.model.reload()
 
-        try:
-            # Establish a connection to the MySQL database (using class) and create a cursor object
-            with db_connection.connect() as connection:
-                cursor = connection.cursor()
+        # log success message
+        success_msg = "Table data loaded successfully."
+        logging.info(success_msg)
 
-                # Execute the SQL query to retrieve all student records
-                cursor.execute(GET_ALL_STUDENTS_MYSQL_QUERY)
+    def filter_course(self, index):
+        """
+        Show only the students of the course chosen in the course filter (or every student).
+        """
+        self.model.set_course(None if index == 0 else self.course_filter.currentText())
 
-                # Fetch all the rows returned by the query
-                all_students_rows = cursor.fetchall()
+    def show_view(self):
+        """
+        Show the order and filter of the table in the header and the course filter, after the model changed them.
+        """
+        self.table.horizontalHeader().setSortIndicator(
+            self.model.sort_column,
+            Qt.SortOrder.DescendingOrder if self.model.descending else Qt.SortOrder.AscendingOrder)
+        # Without emitting currentIndexChanged, the model is already showing every course
+        self.course_filter.blockSignals(True)
+        self.course_filter.setCurrentIndex(0 if self.model.course is None else self.course_filter.findText(self.model.course))
+        self.course_filter.blockSignals(False)
+
+    def import_students(self):
+        """
+        Imports student records in bulk from a CSV or JSONL file chosen by the user.
+        """
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Students", "", "Student records (*.csv *.jsonl *.ndjson)")
+        if not path:
+            return
+
+        # Import the file in the background, the table is reloaded once it is done
+        self.worker.submit(self.repository.bulk_import, path,
+                           on_success=self.students_imported,
+                           on_error=lambda e: self.import_failed(path, e),
+                           message=f"Importing students from {Path(path).name}...")
+
+    def students_imported(self, result):
+        """
+        Reloads the table and informs the user once a bulk import is done.
+        """
+        self.load_table_data()
 
-                # Reset the table to remove existing data
-                self.table.setRowCount(0)
+        success_msg = (f"{result['imported']} of {result['rows']} student records imported "
+                       f"in {result['seconds']} seconds ({result['rows_per_second']} rows/s).")
+        if result["rejects_file"]:
+            success_msg += f"\n{result['rejected']} rejected rows were written to {result['rejects_file']}."
+        QMessageBox.information(self, "Import Done", success_msg)
+        logging.info(success_msg)
 
-                # Iterate over each row fetched from the database
-                for row_i, row in enumerate(all_students_rows):
-                    # Insert a new row into the table
-                    self.table.insertRow(row_i)
+    def import_failed(self, path, error):
+        """
+        Handle an error raised while importing a file of student records.
+        """
+        # Imported on first use to keep the startup fast (the repository imported it to run the import)
+        from importer import ImportFormatError
 
-                    # Iterate over each column data in the current row
-                    for col_i, col_data in enumerate(row):
-                        # Create a QTableWidgetItem and set its value to the current column value
-                        table_item = QTableWidgetItem(str(col_data))
-                        # Set the QTableWidgetItem in the corresponding cell of the table
-                        self.table.setItem(row_i, col_i, table_item)
-            # log success message
-            success_msg = "Table data loaded successfully."
-            logging.info(success_msg)
+        if isinstance(error, ImportFormatError):
+            QMessageBox.warning(self, "Invalid File", str(error))
+            logging.warning(f"Cannot import {path}: {error}")
+        else:
+            self.database_error(self, f"Error importing student records from {path}", error)
+            # The batches committed before the error are already in the database
+            self.load_table_data()
+
+    def export_students(self):
+        """
+        Exports the students table to a CSV, JSONL, Parquet or SQLite snapshot file chosen by the user.
+        """
+        # File type filters of the dialog and the extension each one adds to a file name without one
+        filters = {"CSV (*.csv)": ".csv", "JSON Lines (*.jsonl)": ".jsonl", "Parquet (*.parquet)": ".parquet",
+                   "SQLite snapshot (*.db)": ".db"}
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Export Students", "students.csv", ";;".join(filters))
+        if not path:
+            return
+        if not Path(path).suffix:
+            path += filters.get(selected_filter, ".csv")
+
+        # Export in the background, showing the number of rows written in the status bar
+        self.worker.submit(self.repository.bulk_export, path,
+                           on_success=lambda result: self.students_exported(path, result),
+                           on_error=lambda e: self.export_failed(path, e),
+                           on_progress=self.show_task_progress,
+                           key="export_students",
+                           message=f"Exporting students to {Path(path).name}...")
+
+    def students_exported(self, path, result):
+        """
+        Informs the user once the students table has been exported.
+        """
+        success_msg = (f"{result['rows']} student records exported to {path} "
+                       f"in {result['seconds']} seconds ({result['rows_per_second']} rows/s).")
+        QMessageBox.information(self, "Export Done", success_msg)
+        logging.info(success_msg)
+
+    def export_failed(self, path, error):
+        """
+        Handle an error raised while exporting the students table.
+        """
+        # Imported on first use to keep the startup fast (the repository imported it to run the export)
+        from exporter import ExportFormatError
 
-        except mysql.connector.Error as e:
-            # log the error
-            error_msg = f"Error loading table data"
-            QMessageBox.critical(self, "Error", error_msg)
-            logging.error(f"{error_msg}: {e}")
+        if isinstance(error, ExportFormatError):
+            QMessageBox.warning(self, "Invalid File", str(error))
+            logging.warning(f"Cannot export to {path}: {error}")
+        else:
+            self.database_error(self, f"Error exporting student records to {path}", error)
+
+    def migration_failed(self, error):
+        """
+        Handle an error raised while migrating the database schema, then load the table data anyway.
+        """
+        self.database_error(self, "Error updating the database schema", error)
+        self.load_table_data()
+
+    def table_load_failed(self, error):
+        """
+        Handle an error raised while fetching a page of student records.
+        """
+        self.database_error(self, "Error loading table data", error)
+
+    def database_error(self, widget, error_msg, error):
+        """
+        Display and log an error raised by a database call.
+
+        Args:
+            widget (QWidget): The widget the error message box belongs to.
+            error_msg (str): The message displayed to the user.
+            error (Exception): The exception raised by the database call.
+        """
+        QMessageBox.critical(widget, "Error", error_msg)
+        logging.error(f"{error_msg}: {error}")
+
+    def show_progress(self, message):
+        """
+        Show the given progress message in the status bar, or hide the progress widgets if the message is empty.
+        """
+        self.progress_label.setText(message)
+        self.progress_label.setVisible(bool(message))
+        self.progress_bar.setVisible(bool(message))
+        if not message:
+            # Back to a busy indicator for the next calls
+            self.progress_bar.setRange(0, 0)
+
+    def show_task_progress(self, done, total):
+        """
+        Show the progress of a background call reporting its progress (such as an export) in the status bar.
+        """
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+
+    def track_write(self, ack, on_success, on_error):
+        """
+        Count a queued write as pending until it is acknowledged, then call on_success or on_error.
+
+        Args:
+            ack (Future): The acknowledgement of the write, returned by the WriteBehindQueue.
+            on_success (callable): Called on the GUI thread with the result once the write is committed.
+            on_error (callable): Called on the GUI thread with the exception if the write failed.
+        """
+        self.pending_writes += 1
+        self.show_pending_writes()
+
+        def done(callback, value):
+            self.pending_writes -= 1
+            self.show_pending_writes()
+            callback(value)
+
+        self.worker.watch(ack,
+                          on_success=lambda result: done(on_success, result),
+                          on_error=lambda error: done(on_error, error))
+
+    def student_write_done(self, student_id, error=None):
+        """
+        Unmark an acknowledged queued write of a student record (write-behind mode).
+
+        If one of the record's queued writes failed, the table shows values that are not in
+        the database: once the record has no write queued anymore, it is read again from the
+        database (any later write of the record is then part of what is read).
+
+        Args:
+            student_id (int): The id of the student record.
+            error (Exception): The exception raised by the write, None if it was committed.
+        """
+        if error is not None:
+            self.failed_writes.add(student_id)
+        if self.model.set_pending(student_id, False) == 0 and student_id in self.failed_writes:
+            self.failed_writes.discard(student_id)
+            self.worker.submit(self.repository.get, student_id,
+                               on_success=lambda student: self.student_reloaded(student_id, student),
+                               on_error=lambda e: self.database_error(
+                                   self, "Error reloading student record", e),
+                               message="Reloading student record...")
+
+    def student_reloaded(self, student_id, student):
+        """
+        Show a student record read again from the database after a failed queued write.
+        """
+        if self.model.pending.get(student_id):
+            # Written again meanwhile, the new write is shown until it is acknowledged
+            return
+        if student is None:
+            self.model.remove_student(student_id)
+        else:
+            self.model.update_student(student)
+
+    def show_pending_writes(self):
+        """
+        Show the number of queued writes not committed yet in the status bar, or hide it if there is none.
+        """
+        self.pending_label.setText(f"{self.pending_writes} unsaved change"
+                                   f"{'s' if self.pending_writes != 1 else ''}")
+        self.pending_label.setVisible(self.pending_writes > 0)
 
     def cell_clicked(self):
         """
         Handle the event when a cell is clicked in the table.
         """
-        # Create 'Edit Record' button and Connect its 'clicked' signal to 'edit' method
-        edit_button = QPushButton("Edit Record")
-        edit_button.clicked.connect(self.edit)
+        # Records of a read-only snapshot cannot be edited or deleted
+        if self.repository.read_only:
+            return
 
-        # Create 'Delete Record' button and Connect its 'clicked' signal to 'delete' method
-        delete_button = QPushButton("Delete Record")
-        delete_button.clicked.connect(self.delete)
+        with timed_ui("ui.cell_clicked"):
+            # Create 'Edit Record' button and Connect its 'clicked' signal to 'edit' method
+            edit_button = QPushButton("Edit Record")
+            edit_button.clicked.connect(self.edit)
 
-        # Reconfigure the status bar and clean it ti avoid duplicate buttons at each select
-        self.clear_statusbar()
+            # Create 'Delete Record' button and Connect its 'clicked' signal to 'delete' method
+            delete_button = QPushButton("Delete Record")
+            delete_button.clicked.connect(self.delete)
 
-        # Add 'Edit Record' and 'Delete Record' buttons to the status bar
-        self.statusbar.addWidget(edit_button)
-        self.statusbar.addWidget(delete_button)
+            # Reconfigure the status bar and clean it ti avoid duplicate buttons at each select
+            self.clear_statusbar()
+
+            # Add 'Edit Record' and 'Delete Record' buttons to the status bar
+            self.statusbar.addWidget(edit_button)
+            self.statusbar.addWidget(delete_button)
 
     def insert(self):
         """
         Opens a dialog for inserting a new student.
         """
         # Create an instance of InsertDialog and pass the parent
-        dialog = InsertDialog(parent=self)
+        with timed_ui("ui.dialog_open.insert"):
+            dialog = InsertDialog(parent=self)
         # Execute the dialog (blocks until the dialog is closed)
         dialog.exec()
 
@@ -216,7 +432,8 @@ class MainWindow(QMainWindow):
         Opens a dialog for searching a student.
         """
         # Create an instance of SearchDialog and pass the parent
-        dialog = SearchDialog(parent=self)
+        with timed_ui("ui.dialog_open.search"):
+            dialog = SearchDialog(parent=self)
         # Execute the dialog (blocks until the dialog is closed)
         dialog.exec()
 
@@ -225,7 +442,8 @@ class MainWindow(QMainWindow):
         Opens a dialog for editing a student record.
         """
         # Create an instance of EditDialog and pass the parent
-        dialog = EditDialog(parent=self)
+        with timed_ui("ui.dialog_open.edit"):
+            dialog = EditDialog(parent=self)
         # Execute the dialog (blocks until the dialog is closed)
         dialog.exec()
 
@@ -234,7 +452,8 @@ class MainWindow(QMainWindow):
         Opens a dialog for deleting a student record.
         """
         # Create an instance of DeleteDialog and pass the parent
-        dialog = DeleteDialog(parent=self)
+        with timed_ui("ui.dialog_open.delete"):
+            dialog = DeleteDialog(parent=self)
         # Execute the dialog (blocks until the dialog is closed)
         dialog.exec()
 
@@ -243,7 +462,8 @@ class MainWindow(QMainWindow):
         Opens a dialog for about the app info.
         """
         # Create an instance of AboutDialog
-        dialog = AboutDialog(self)
+        with timed_ui("ui.dialog_open.about"):
+            dialog = AboutDialog(self)
         # Execute the dialog (blocks until the dialog is closed)
         dialog.exec()
 
@@ -275,6 +495,20 @@ class MainWindow(QMainWindow):
             for child_btn in children_btns:
                 self.statusbar.removeWidget(child_btn)
 
+    def closeEvent(self, event):
+        """
+        Wait for the background database calls to finish before closing the main window.
+        """
+        if self.write_queue is not None:
+            # Commit the queued writes before the application exits
+            self.write_queue.close()
+        self.worker.shutdown()
+        # Log the result cache counters, used to tune the QUERY_CACHE_* settings
+        logging.info(f"Query cache stats: {self.repository.cache_stats()}")
+        # Log the latency histograms of the database calls and UI actions
+        logging.info(f"Latency metrics: {json.dumps(metrics.snapshot())}")
+        super().closeEvent(event)
+
     def close_dialog(self, dialog):
         """
         Close a dialog window and clear selections in the main window.
@@ -341,7 +575,7 @@ class InsertDialog(QDialog):
 
     def add_student(self):
         """
-        Adds a new student record to the MySQL database.
+        Adds a new student record to the database.
         """
         # Get inputs from the user
         name = self.student_name.text().strip().title()
@@ -364,36 +598,51 @@ class InsertDialog(QDialog):
                 case 3:
                     self.phone_number.setFocus()  # Set focus to phone number input field
 
+        elif self.parent_window.write_queue is not None:
+            # Write-behind: queue the insert and let the user enter the next record right away,
+            # the record is added to the table once it is committed
+            ack = self.parent_window.write_queue.insert(name, course, phone)
+            self.clear_inputs()
+            self.student_name.setFocus()
+            self.parent_window.track_write(
+                ack,
+                on_success=lambda student_id: self.student_saved(
+                    student_id, name, course, phone),
+                on_error=lambda e: self.parent_window.database_error(
+                    self.parent_window, f'Error adding student record for "{name}"', e))
+
         else:
-            # Create a DatabaseConnection instance
-            db_connection = DatabaseConnection()
-
-            try:
-                # Establish a connection to the MySQL database (using class) and create a cursor object within a with statement
-                with db_connection.connect() as connection:
-                    cursor = connection.cursor()
-
-                    # Execute the SQL query to insert a new student record
-                    cursor.execute(INSERT_STUDENT_MYSQL_QUERY,
-                                   (name, course, phone))
-                    # Commit changes to the database
-                    connection.commit()
-
-                    # Reset the inputs
-                    self.clear_inputs()
-                    # Reload the table data after the insert dialog is finished
-                    self.parent_window.load_table_data()
-                    # Log success message
-                    success_msg = f'Student record for "{
-                        name}" added successfully.'
-                    QMessageBox.information(self, "Success", success_msg)
-                    logging.info(success_msg)
-
-            except mysql.connector.Error as e:
-                # Rollback changes if an error occurs
-                error_msg = f'Error adding student record for "{name}"'
-                QMessageBox.critical(self, "Error", error_msg)
-                logging.error(f"{error_msg}: {e}")
+            # Insert the new student record in the background, the outcome is handled back on the GUI thread
+            self.parent_window.worker.submit(
+                self.parent_window.repository.insert, name, course, phone,
+                on_success=lambda student_id: self.student_added(
+                    student_id, name, course, phone),
+                on_error=lambda e: self.parent_window.database_error(
+                    self, f'Error adding student record for "{name}"', e),
+                message=f'Adding student record for "{name}"...')
+
+    def student_added(self, student_id, name, course, phone):
+        """
+        Updates the table and informs the user once a new student record has been inserted.
+        """
+        # Reset the inputs
+        self.clear_inputs()
+        # Append the new student record (with the id generated by the database) to the table
+        self.parent_window.model.append_student(
+            (student_id, name, course, phone))
+        # Log success message
+        success_msg = f'Student record for "{
+            name}" added successfully.'
+        QMessageBox.information(self, "Success", success_msg)
+        logging.info(success_msg)
+
+    def student_saved(self, student_id, name, course, phone):
+        """
+        Updates the table once a queued student record has been committed (write-behind mode).
+        """
+        self.parent_window.model.append_student(
+            (student_id, name, course, phone))
+        logging.info(f'Student record for "{name}" added successfully.')
 
     def validate_insert_inputs(self, name, course, phone):
         """
@@ -408,26 +657,8 @@ class InsertDialog(QDialog):
             tuple: A tuple containing a boolean indicating whether the inputs are valid 
                    and a warning message if any, otherwise None.
         """
-        warning_msg = ""
-
-        # Validate name
-        if not re.match(NAME_PATTERN, name):
-            warning_msg += "1- Name is invalid. Please use alphabet letters in the format:\n   <first_name last_name>. "
-
-        # Validate course
-        if course == 'Select Course':
-            warning_msg += "\n2- Please select a course. "
-
-        # Validate phone number
-        if not re.match(PHONE_NUMBER_PATTERN, phone):
-            warning_msg += "\n3- Phone number is invalid. It must be 8 digits in length. "
-
-        # Check if any warning messages were generated
-        if warning_msg:
-            return False, warning_msg.strip()  # Return False and the warning message
-
-        # Return True indicating all inputs are valid
-        return True, None
+        # Same rules as the bulk importer
+        return validate_student(name, course, phone)
 
     def clear_inputs(self):
         """
@@ -454,7 +685,7 @@ class SearchDialog(QDialog):
         self.parent_window = parent
 
         # Set the fixed size of the dialog
-        self.setFixedSize(200, 100)
+        self.setFixedSize(200, 130)
 
         self.setWindowTitle("Search Student")
 
@@ -465,27 +696,89 @@ class SearchDialog(QDialog):
         self.student_name = QLineEdit()
         self.student_name.setPlaceholderText("Name")
 
+        # Search mode: exact name, or ranked prefix, substring and fuzzy (typo-tolerant) search on name and phone
+        self.search_mode = QComboBox()
+        self.search_mode.addItems(SEARCH_MODES)
+
         button = QPushButton("Search")
         button.setFixedHeight(30)
         button.clicked.connect(self.search_student)
 
+        # List of the ranked results of a prefix, substring or fuzzy search, hidden until there are results
+        self.results_list = QListWidget()
+        self.results_list.itemDoubleClicked.connect(self.result_chosen)
+        self.results_list.hide()
+
         # Add widgets to layout
         layout.addWidget(self.student_name)
+        layout.addWidget(self.search_mode)
         layout.addWidget(button)
+        layout.addWidget(self.results_list)
 
         self.setLayout(layout)
 
     def search_student(self):
         """
-        Searches for a student in the MySQL database.
+        Searches for a student in the database.
         If found, highlights the records in the table and logs the success message.
         If not found, displays a warning message and clears the input field for new entry.
         """
+        # Prefix, substring and fuzzy searches return ranked results from the search index
+        search_mode = self.search_mode.currentText()
+        if search_mode != EXACT_SEARCH:
+            search_term = self.student_name.text().strip()
+            self.parent_window.worker.submit(
+                self.parent_window.repository.search, search_term, search_mode,
+                on_success=lambda students: self.show_ranked_results(
+                    search_term, students),
+                on_error=lambda e: self.parent_window.database_error(
+                    self, f"Error searching in database for {search_term}", e),
+                key="search_student",
+                message=f'Searching for "{search_term}"...')
+            return
+
         # Get the student name input
         this_name = self.student_name.text().title()
 
-        # Check if the student exists in the database
-        if not self.exists_in_db(this_name):
+        model = self.parent_window.model
+
+        # The rows already loaded in the table answer the question if they contain the student,
+        # or if every student is loaded (the last page of the unsorted, unfiltered table came
+        # back short): no database round trip is needed then
+        if model.rows_named(this_name) or (model.exhausted and model.in_id_order()):
+            self.show_search_result(this_name)
+            return
+
+        # Otherwise search the database in the background (a new search supersedes the previous one)
+        self.parent_window.worker.submit(
+            self.parent_window.repository.search, this_name,
+            on_success=lambda students: self.load_search_result(
+                this_name, [student[0] for student in students]),
+            on_error=lambda e: self.parent_window.database_error(
+                self, f"Error searching in database for {this_name}", e),
+            key="search_student",
+            message=f'Searching for "{this_name}"...')
+
+    def load_search_result(self, this_name, student_ids):
+        """
+        Makes sure the student records found in the database are loaded in the table, then shows them.
+        """
+        if not student_ids:
+            self.show_search_result(this_name)
+        else:
+            # Fetch the table rows up to the last record found before highlighting them
+            self.parent_window.model.fetch_through(
+                max(student_ids), lambda: self.show_search_result(this_name))
+
+    def show_search_result(self, this_name):
+        """
+        Highlights the records of the searched student in the table, or warns if the student was not found.
+        """
+        # Find the rows of the table with the student's name using the table model's name index
+        model = self.parent_window.model
+        rows_found = model.rows_named(this_name)
+
+        if not rows_found:
             # Display a warning message if the student is not found
             QMessageBox.warning(self, "Student Not Found",
                                 f"No records found for student: {this_name}")
@@ -493,20 +786,8 @@ class SearchDialog(QDialog):
             self.student_name.clear()
 
         else:
-            # Find all items in the table that match the student's name exactly (case-sensitive)
-            records_found = self.parent_window.table.findItems(
-                this_name, Qt.MatchFlag.MatchFixedString)
-
-            # Iterate over each matching record found in the table
-            for record in records_found:
-                # Get the row index of the current record
-                row_i = record.row()
-
-                # Iterate over each column in the table
-                for col_i in range(self.parent_window.table.columnCount()):
-                    # Set the current cell as selected, indicating it's part of the found record
-                    self.parent_window.table.item(
-                        row_i, col_i).setSelected(True)
+            # Highlight the rows of the records found
+            self.select_rows(rows_found)
 
             # Log a success message
             success_msg = f'Student record for "{
@@ -516,40 +797,73 @@ class SearchDialog(QDialog):
             # Close the dialog if the student is found
             self.close()
 
-    def exists_in_db(self, student_name):
+    def select_rows(self, rows_found):
         """
-        Checks if a student exists in the MySQL database.
+        Highlights the given rows in the table and scrolls to the first one.
         """
-        connection = None
-        this_student_rows = []
+        model = self.parent_window.model
 
-        try:
-            # Create a DatabaseConnection instance
-            db_connection = DatabaseConnection()
+        # Build a single selection with one range per matching row, indicating it's part of the found record
+        selection = QItemSelection()
+        last_col = model.columnCount() - 1
+        for row_i in rows_found:
+            selection.select(model.index(row_i, 0),
+                             model.index(row_i, last_col))
+        self.parent_window.table.selectionModel().select(
+            selection, QItemSelectionModel.SelectionFlag.Select)
 
-            # Establish connection (using class) and create a cursor
-            with db_connection.connect() as connection:
-                cursor = connection.cursor()
+        # Scroll to the first record found
+        self.parent_window.table.scrollTo(model.index(rows_found[0], 0))
 
-                # Execute the query to search for the student
-                cursor.execute(SEARCH_STUDENT_MYSQL_QUERY, (student_name, ))
+    def show_ranked_results(self, search_term, students):
+        """
+        Lists the ranked results of a prefix, substring or fuzzy search, best match first.
+        """
+        self.results_list.clear()
 
-                # Fetch all matching rows
-                this_student_rows = cursor.fetchall()
+        if not students:
+            # Display a warning message if no student matches
+            QMessageBox.warning(self, "Student Not Found",
+                                f"No records found for: {search_term}")
+            self.results_list.hide()
+            self.setFixedSize(200, 130)
+            return
+
+        for student in students:
+            item = QListWidgetItem(f"{student[1]} - {student[2]} - {student[3]}")
+            # Keep the student's id on the item to highlight its row when chosen
+            item.setData(Qt.ItemDataRole.UserRole, student[0])
+            self.results_list.addItem(item)
+
+        # Make room for the results list
+        self.results_list.show()
+        self.setFixedSize(320, 320)
+
+    def result_chosen(self, item):
+        """
+        Highlights the student record of the chosen search result in the table.
+        """
+        student_id = item.data(Qt.ItemDataRole.UserRole)
+        # Fetch the table rows up to the chosen record before highlighting it
+        self.parent_window.model.fetch_through(
+            student_id, lambda: self.show_chosen_result(student_id, item.text()))
 
-        except mysql.connector.Error as e:
-            # Log the error with details
-            error_msg = f"Error searching in database for {student_name}"
-            QMessageBox.critical(self, "Error", error_msg)
-            logging.error(f"{error_msg}: {e}")
+    def show_chosen_result(self, student_id, description):
+        """
+        Highlights the row of the chosen student record, or warns if it no longer exists.
+        """
+        row_i = self.parent_window.model.row_of(student_id)
+
+        if row_i is None:
+            QMessageBox.warning(self, "Student Not Found",
+                                f"The record {description} no longer exists.")
+            return
 
-        finally:
-            # Close the cursor and connection
-            if 'cursor' in locals() and cursor:  # or simply `if cursor:`
-                cursor.close()
+        self.select_rows([row_i])
+        logging.info(f'Student record "{description}" found and highlighted successfully.')
 
-        # Return True if student exists, False otherwise (in case of error list will be empty still so bool() returns False)
-        return bool(this_student_rows)
+        # Close the dialog once the record is highlighted
+        self.close()
 
 
 class EditDialog(QDialog):
@@ -573,15 +887,17 @@ class EditDialog(QDialog):
 
         # Get this selected user data
         # Get the index of the currently selected row in the table
-        row_i = self.parent_window.table.currentRow()
-        # Get the student's id of the item in the first column (index 0) of the currently selected row
-        self.student_id = self.parent_window.table.item(row_i, 0).text()
-        # Get the student's name of the item in the second column (index 1) of the currently selected row
-        self.initial_name = self.parent_window.table.item(row_i, 1).text()
-        # Get the student's course of the item in the third column (index 2) of the currently selected row
-        self.initial_course = self.parent_window.table.item(row_i, 2).text()
-        # Get the student's phone number of the item in the fourth column (index 3) of the currently selected row
-        self.initial_phone = self.parent_window.table.item(row_i, 3).text()
+        row_i = self.parent_window.table.currentIndex().row()
+        # Get the student record (id, name, course, mobile) of the currently selected row from the table model
+        student = self.parent_window.model.student_at(row_i)
+        # Get the student's id of the first column (index 0) of the currently selected row
+        self.student_id = str(student[0])
+        # Get the student's name of the second column (index 1) of the currently selected row
+        self.initial_name = str(student[1])
+        # Get the student's course of the third column (index 2) of the currently selected row
+        self.initial_course = str(student[2])
+        # Get the student's phone number of the fourth column (index 3) of the currently selected row
+        self.initial_phone = str(student[3])
 
         # Layout
         layout = QVBoxLayout()
@@ -609,7 +925,7 @@ class EditDialog(QDialog):
 
     def update_student(self):
         """
-        Updates a student record in the MySQL database.
+        Updates a student record in the database.
         """
         # Prompt the user for confirmation before updating
         if self.confirm_update():
@@ -640,38 +956,60 @@ class EditDialog(QDialog):
                     QMessageBox.information(
                         self, "Info", warning)
 
+                elif self.parent_window.write_queue is not None:
+                    # Write-behind: queue the update and show it in the table right away, as pending
+                    student = (int(self.student_id), name, course, phone)
+                    ack = self.parent_window.write_queue.update(*student)
+                    self.parent_window.close_dialog(self)
+                    self.parent_window.model.update_student(student)
+                    self.parent_window.model.set_pending(student[0], True)
+                    self.parent_window.track_write(
+                        ack,
+                        on_success=lambda _: self.update_saved(name),
+                        on_error=lambda e: self.update_failed(name, e))
+
                 else:
-                    # Once all inputs are valid, and new data entered (modified), Create a DatabaseConnection instance
-                    db_connection = DatabaseConnection()
-
-                    # Establish a connection to the MySQL db (using class) and create a cursor object within a with statement
-                    try:
-                        with db_connection.connect() as connection:
-                            cursor = connection.cursor()
-
-                            # Execute the SQL query to insert a new student record
-                            cursor.execute(UPDATE_STUDENT_MYSQL_QUERY,
-                                           (name, course, phone, self.student_id))
-                            # Commit changes to the database
-                            connection.commit()
-
-                            # Close the dialog if the student is updated
-                            self.parent_window.close_dialog(self)
-                            # Reload the table data after the update dialog is finished
-                            self.parent_window.load_table_data()
-                            # Log success message
-                            success_msg = f'Student record for "{
-                                name}" updated successfully.'
-                            QMessageBox.information(
-                                self, "Success", success_msg)
-                            logging.info(success_msg)
-
-                    except mysql.connector.Error as e:
-                        # Rollback changes if an error occurs
-                        error_msg = f'Error updating student record for "{
-                            name}"'
-                        QMessageBox.critical(self, "Error", error_msg)
-                        logging.error(f"{error_msg}: {e}")
+                    # Once all inputs are valid, and new data entered (modified), update the record in the background
+                    self.parent_window.worker.submit(
+                        self.parent_window.repository.update,
+                        int(self.student_id), name, course, phone,
+                        on_success=lambda _: self.student_updated(
+                            name, course, phone),
+                        on_error=lambda e: self.parent_window.database_error(
+                            self, f'Error updating student record for "{name}"', e),
+                        message=f'Updating student record for "{name}"...')
+
+    def student_updated(self, name, course, phone):
+        """
+        Updates the table and informs the user once the student record has been updated.
+        """
+        # Close the dialog if the student is updated
+        self.parent_window.close_dialog(self)
+        # Patch the updated student record in place in the table
+        self.parent_window.model.update_student(
+            (int(self.student_id), name, course, phone))
+        # Log success message
+        success_msg = f'Student record for "{
+            name}" updated successfully.'
+        QMessageBox.information(
+            self, "Success", success_msg)
+        logging.info(success_msg)
+
+    def update_saved(self, name):
+        """
+        Shows the updated student record as committed (write-behind mode).
+        """
+        # Still shown as pending if another update of the record is queued
+        self.parent_window.student_write_done(int(self.student_id))
+        logging.info(f'Student record for "{name}" updated successfully.')
+
+    def update_failed(self, name, error):
+        """
+        Informs the user when a queued update failed (write-behind mode), the record is then read again from the database.
+        """
+        self.parent_window.student_write_done(int(self.student_id), error)
+        self.parent_window.database_error(
+            self.parent_window, f'Error updating student record for "{name}"', error)
 
     def validate_update_inputs(self, name, course, phone):
         """
@@ -686,32 +1024,14 @@ class EditDialog(QDialog):
             tuple: A tuple containing a boolean indicating whether the inputs are valid 
                    and a warning message if any, otherwise None.
         """
-        warning_msg = ""
-
         # If no modifications recorded then return True (valid) with a message of no changes made
         if (name == self.initial_name and
             course == self.initial_course and
                 phone == self.initial_phone):
             return True, "No modifications have been made, no update required. "
 
-        # Validate name
-        if not re.match(NAME_PATTERN, name):
-            warning_msg += "1- Name is invalid. Please use alphabet letters in the format:\n   <first_name last_name>. "
-
-        # Validate course
-        if course == 'Select Course':
-            warning_msg += "\n2- Please select a course. "
-
-        # Validate phone number
-        if not re.match(PHONE_NUMBER_PATTERN, phone):
-            warning_msg += "\n3- Phone number is invalid. It must be 8 digits in length. "
-
-        # Check if any warning messages were generated
-        if warning_msg:
-            return False, warning_msg.strip()  # Return False and the warning message
-
-        # Return True indicating all inputs are valid
-        return True, None
+        # Same rules as for a new student record
+        return validate_student(name, course, phone)
 
     def confirm_update(self):
         """
@@ -772,11 +1092,15 @@ class DeleteDialog(QDialog):
 
         # Get this selected user data
         # Get the index of the currently selected row in the table
-        row_i = self.parent_window.table.currentRow()
-        # Get the student's id of the item in the first column (index 0) of the currently selected row
-        self.student_id = self.parent_window.table.item(row_i, 0).text()
-        # Get the student's name of the item in the second column (index 1) of the currently selected row
-        self.student_name = self.parent_window.table.item(row_i, 1).text()
+        row_i = self.parent_window.table.currentIndex().row()
+        # Get the student record (id, name, course, mobile) of the currently selected row from the table model
+        student = self.parent_window.model.student_at(row_i)
+        # Get the student's id of the first column (index 0) of the currently selected row
+        self.student_id = str(student[0])
+        # Get the student's name of the second column (index 1) of the currently selected row
+        self.student_name = str(student[1])
+        # Set once the record is removed from the table, so a second acknowledgement does nothing
+        self.deleted = False
 
         # Layout
         layout = QGridLayout()
@@ -809,38 +1133,66 @@ class DeleteDialog(QDialog):
 
     def delete_student(self):
         """
-        Deletes the current selected student record in the MySQL database.
+        Deletes the current selected student record in the database.
         """
-        # Create a DatabaseConnection instance
-        db_connection = DatabaseConnection()
-
-        # Establish a connection to the MySQL database (using class) and create a cursor object within a with statement
-        try:
-            with db_connection.connect() as connection:
-                cursor = connection.cursor()
+        if self.parent_window.write_queue is not None:
+            # Write-behind: queue the delete, so it is committed after the writes of the record already queued
+            student_id = int(self.student_id)
+            ack = self.parent_window.write_queue.delete(student_id)
+            # Closed right away, so the delete cannot be queued twice
+            self.parent_window.close_dialog(self)
+            self.parent_window.model.set_pending(student_id, True)
+            self.parent_window.track_write(
+                ack,
+                on_success=lambda _: self.delete_saved(),
+                on_error=lambda e: self.delete_failed(e))
+            return
+
+        # Delete the student record in the background, the outcome is handled back on the GUI thread
+        self.parent_window.worker.submit(
+            self.parent_window.repository.delete, int(self.student_id),
+            on_success=lambda _: self.student_deleted(),
+            on_error=lambda e: self.parent_window.database_error(
+                self, f'Error deleting student record for "{self.student_name}"', e),
+            message=f'Deleting student record for "{self.student_name}"...')
+
+    def delete_saved(self):
+        """
+        Updates the table once a queued delete has been committed (write-behind mode).
+        """
+        self.parent_window.student_write_done(int(self.student_id))
+        self.student_removed()
 
-                # Execute the SQL query to insert a new student record
-                cursor.execute(DELETE_STUDENT_MYSQL_QUERY,
-                               (self.student_id, ))
-                # Commit changes to the database
-                connection.commit()
+    def delete_failed(self, error):
+        """
+        Informs the user when a queued delete failed (write-behind mode), the record is then read again from the database.
+        """
+        self.parent_window.student_write_done(int(self.student_id), error)
+        self.parent_window.database_error(
+            self.parent_window, f'Error deleting student record for "{self.student_name}"', error)
 
-                # Close the dialog if the student is deleted
-                self.parent_window.close_dialog(self)
-                # Reload the table data after the delete dialog is finished
-                self.parent_window.load_table_data()
-                # Log success message
-                success_msg = f'Student record for "{
-                    self.student_name}" deleted successfully.'
-                QMessageBox.information(self, "Success", success_msg)
-                logging.info(success_msg)
+    def student_deleted(self):
+        """
+        Updates the table and informs the user once the student record has been deleted.
+        """
+        # Close the dialog if the student is deleted
+        self.parent_window.close_dialog(self)
+        self.student_removed()
 
-        except mysql.connector.Error as e:
-            # Rollback changes if an error occurs
-            error_msg = f'Error deleting student record for "{
-                self.student_name}"'
-            QMessageBox.critical(self, "Error", error_msg)
-            logging.error(f"{error_msg}: {e}")
+    def student_removed(self):
+        """
+        Removes the deleted student record from the table and informs the user, only the first time.
+        """
+        if self.deleted:
+            return
+        self.deleted = True
+        # Remove the deleted student record from the table
+        self.parent_window.model.remove_student(int(self.student_id))
+        # Log success message
+        success_msg = f'Student record for "{
+            self.student_name}" deleted successfully.'
+        QMessageBox.information(self, "Success", success_msg)
+        logging.info(success_msg)
 
 
 class AboutDialog(QMessageBox):
@@ -857,7 +1209,7 @@ class AboutDialog(QMessageBox):
         self.setWindowTitle("About")
         content = """
 <h3>About This App</h3>
-<p>Student Management System is a comprehensive Python application designed to streamline the management of student records within educational institutions. Built using PyQt6 for the graphical user interface and MySQL for data storage, this system offers a user-friendly interface for administrators to efficiently handle student data.
+<p>Student Management System is a comprehensive Python application designed to streamline the management of student records within educational institutions. Built using PyQt6 for the graphical user interface and MySQL or SQLite for data storage, this system offers a user-friendly interface for administrators to efficiently handle student data.
 </p>
 <p>
 The primary goal of this system is to simplify the process of managing student information, including their names, courses, and contact details. It provides a centralized platform where administrators can seamlessly perform tasks such as adding new students, searching for specific records, editing existing entries, and deleting outdated information.
@@ -0,0 +1,48 @@
+import re
+from constants import NAME_PATTERN, PHONE_NUMBER_PATTERN, COURSES
+
+
+# Compiled once, the rules are also applied to every row of a bulk import
+NAME_REGEX = re.compile(NAME_PATTERN)
+PHONE_NUMBER_REGEX = re.compile(PHONE_NUMBER_PATTERN)
+# Every course except the 'Select Course' placeholder
+VALID_COURSES = frozenset(COURSES[1:])
+
+
+def validate_student(name, course, phone):
+    """
+    Validates the fields of a student record.
+
+    The same rules are used by the insert and edit dialogs and by the bulk importer.
+    Warning lines start with the number of the invalid field (1: name, 2: course,
+    3: phone number), so the dialogs can focus the respective input field.
+
+    Args:
+        name (str): The name of the student.
+        course (str): The course of the student.
+        phone (str): The phone number of the student.
+
+    Returns:
+        tuple: A tuple containing a boolean indicating whether the fields are valid
+               and a warning message if any, otherwise None.
+    """
+    warning_msg = ""
+
+    # Validate name
+    if not NAME_REGEX.match(name):
+        warning_msg += "1- Name is invalid. Please use alphabet letters in the format:\n   <first_name last_name>. "
+
+    # Validate course
+    if course not in VALID_COURSES:
+        warning_msg += "\n2- Please select a course. "
+
+    # Validate phone number
+    if not PHONE_NUMBER_REGEX.match(phone):
+        warning_msg += "\n3- Phone number is invalid. It must be 8 digits in length. "
+
+    # Check if any warning messages were generated
+    if warning_msg:
+        return False, warning_msg.strip()  # Return False and the warning message
+
+    # Return True indicating all fields are valid
+    return True, None
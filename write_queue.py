@@ -0,0 +1,242 @@
+"""
+A write-behind queue batching the student inserts and updates of a StudentRepository.
+
+Every repository write commits its own transaction, and each commit waits for the
+database to reach the disk. When records are entered continuously, a WriteBehindQueue
+takes the inserts and updates instead: a background thread writes them in a single
+transaction (StudentRepository.write_batch) once WRITE_BEHIND_BATCH_SIZE writes are
+queued, or once the oldest queued write has waited WRITE_BEHIND_MAX_DELAY seconds.
+Deletes go through the queue too while it is used, so they are committed after the
+writes queued before them.
+
+Each queued write returns a concurrent.futures.Future, its durability acknowledgement:
+the future is resolved once the transaction holding the write is committed (with the
+id of an inserted record), or fails with the exception raised by the write. The writes
+still queued are committed when the queue is closed, and at exit. Example:
+
+    queue = WriteBehindQueue(repository)
+    ack = queue.insert("John Smith", "Math", "11112233")
+    student_id = ack.result()  # waits for the commit
+    queue.close()
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from constants import WRITE_BEHIND_BATCH_SIZE, WRITE_BEHIND_MAX_DELAY
+
+
+class WriteBehindQueue:
+    """
+    A thread-safe queue of student writes, committed in batches by a background thread.
+
+    Writes are committed in the order they were queued. When a batch fails, its writes
+    are retried one by one, so only the failing writes fail their acknowledgement.
+
+    Attributes:
+    - repository (StudentRepository): The repository the writes are committed to.
+    - batch_size (int): The maximum number of writes committed in a single transaction.
+    - max_delay (float): The maximum number of seconds a write waits before its batch is committed.
+    - writes (deque): The queued (query name, params, acknowledgement, time queued) writes, oldest first.
+    - flushing (int): The number of writes of the batch being committed.
+    - closed (bool): Whether the queue was closed (no more writes are accepted).
+    - batches (int): The number of batches committed.
+    - written (int): The number of writes committed.
+    - failed (int): The number of writes that failed.
+    """
+
+    def __init__(self, repository, batch_size=WRITE_BEHIND_BATCH_SIZE, max_delay=WRITE_BEHIND_MAX_DELAY):
+        """
+        Initialize the WriteBehindQueue object and start its background thread.
+
+        Args:
+        - repository (StudentRepository): The repository the writes are committed to.
+        - batch_size (int): The maximum number of writes per transaction. Defaults to WRITE_BEHIND_BATCH_SIZE.
+        - max_delay (float): The maximum seconds a write waits. Defaults to WRITE_BEHIND_MAX_DELAY.
+        """
+        self.repository = repository
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+
+        self.writes = deque()
+        self.flushing = 0
+        self.flush_requested = False
+        self.closed = False
+        self.condition = threading.Condition()
+
+        self.batches = 0
+        self.written = 0
+        self.failed = 0
+
+        self.flusher = threading.Thread(target=self.run, name="write-behind", daemon=True)
+        self.flusher.start()
+        # Commit the writes still queued when the process exits without closing the queue
+        atexit.register(self.close)
+
+    def insert(self, name, course, mobile):
+        """
+        Queue the insert of a new student record.
+
+        Returns:
+            Future: Resolved with the id generated by the database once the record is committed.
+        """
+        return self.queue("insert", (name, course, mobile))
+
+    def update(self, student_id, name, course, mobile):
+        """
+        Queue the update of the student record with the given id.
+
+        Returns:
+            Future: Resolved with None once the update is committed.
+        """
+        return self.queue("update", (name, course, mobile, student_id))
+
+    def delete(self, student_id):
+        """
+        Queue the delete of the student record with the given id, after the writes already queued.
+
+        Returns:
+            Future: Resolved with None once the delete is committed.
+        """
+        return self.queue("delete", (student_id,))
+
+    def queue(self, query, params):
+        """
+        Queue a write query of the repository's driver.
+
+        Args:
+            query (str): The name of the query in the driver's queries.
+            params (tuple): The query parameters.
+
+        Returns:
+            Future: The acknowledgement of the write.
+
+        Raises:
+            RuntimeError: If the queue is closed.
+        """
+        ack = Future()
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("The write-behind queue is closed")
+            self.writes.append((query, params, ack, time.monotonic()))
+            self.condition.notify_all()
+        return ack
+
+    @property
+    def pending(self):
+        """
+        The number of writes not committed yet (queued or being committed).
+        """
+        with self.condition:
+            return len(self.writes) + self.flushing
+
+    def run(self):
+        """
+        Commit the queued writes in batches until the queue is closed and empty (background thread).
+        """
+        while True:
+            with self.condition:
+                batch = self.next_batch()
+                if batch is None:
+                    return
+                self.flushing = len(batch)
+            try:
+                self.write(batch)
+            finally:
+                with self.condition:
+                    self.flushing = 0
+                    self.condition.notify_all()
+
+    def next_batch(self):
+        """
+        Wait (holding the condition) until a batch is due and take it off the queue.
+
+        Returns:
+            list: The writes of the batch, or None once the queue is closed and empty.
+        """
+        while True:
+            if not self.writes:
+                self.flush_requested = False
+                if self.closed:
+                    return None
+                self.condition.wait()
+                continue
+            if self.closed or self.flush_requested or len(self.writes) >= self.batch_size:
+                break
+            delay = self.writes[0][3] + self.max_delay - time.monotonic()
+            if delay <= 0:
+                break
+            self.condition.wait(delay)
+        return [self.writes.popleft() for _ in range(min(len(self.writes), self.batch_size))]
+
+    def write(self, batch):
+        """
+        Commit a batch of writes in one transaction and acknowledge them.
+
+        If the transaction fails, the writes are committed one by one, so a single
+        invalid write does not fail the others.
+        """
+        try:
+            results = self.repository.write_batch([(query, params) for query, params, _, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                self.failed += 1
+                batch[0][2].set_exception(e)
+                return
+            logging.warning(f"Write-behind batch of {len(batch)} writes failed ({e}), "
+                            f"committing them one by one")
+            for write in batch:
+                self.write([write])
+            return
+
+        self.batches += 1
+        self.written += len(batch)
+        for (query, _, ack, _), result in zip(batch, results):
+            # The last row id is only meaningful for inserts
+            ack.set_result(result if query == "insert" else None)
+
+    def flush(self, timeout=None):
+        """
+        Commit every queued write now, without waiting for the batch size or delay.
+
+        Args:
+            timeout (float): The maximum number of seconds to wait. Defaults to None (no limit).
+
+        Returns:
+            bool: True if every write queued before the call is committed (or failed).
+        """
+        with self.condition:
+            self.flush_requested = True
+            self.condition.notify_all()
+            return self.condition.wait_for(lambda: not self.writes and not self.flushing, timeout)
+
+    def close(self, timeout=None):
+        """
+        Commit the writes still queued and stop the background thread (only the first call has an effect).
+
+        Args:
+            timeout (float): The maximum number of seconds to wait. Defaults to None (no limit).
+        """
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify_all()
+        self.flusher.join(timeout)
+        atexit.unregister(self.close)
+        logging.info(f"Write-behind queue stats: {self.stats()}")
+
+    def stats(self):
+        """
+        Return the counters of the queue, to tune its batch size and delay.
+        """
+        with self.condition:
+            return {
+                "pending": len(self.writes) + self.flushing,
+                "batches": self.batches,
+                "written": self.written,
+                "failed": self.failed,
+                "mean_batch_size": round(self.written / self.batches, 1) if self.batches else 0,
+            }